@@ -7,11 +7,16 @@ import sys
 import time
 
 from TTiP.cli.gen_conf import gen_conf
+from TTiP.core.checkpoint import load_checkpoint_mesh
 from TTiP.core.problem import create_problem_class
 from TTiP.core.read_config import Config
 from TTiP.core.solver import Solver
 from TTiP.util.logger import setup_logger
 
+# The solver settings that only apply to time dependant problems.
+TIME_DEPENDANT_SETTINGS = ('adaptive', 'retries', 'steady_stop',
+                           'checkpointing')
+
 
 def get_argparser():
     """
@@ -23,6 +28,7 @@ def get_argparser():
     epilog = '''Usage Examples:
     $ ttip my_problem.ini
     $ ttip -d myproblem.ini
+    $ ttip --restart results/checkpoint.h5 myproblem.ini
     '''
 
     parser = argparse.ArgumentParser(
@@ -39,28 +45,26 @@ def get_argparser():
                         action='store_true',
                         help='Generate a clean config file with documented'
                              ' options.')
+    parser.add_argument('-r', '--restart',
+                        metavar='CHECKPOINT',
+                        help='Restart an interrupted time dependant run from'
+                             ' a checkpoint file.')
 
     return parser
 
 
-def run(config_file, debug=False):
+def build_problem(config, logger):
     """
-    Run the solve on the given problem definition config file.
+    Create the problem defined in the config on the config's current mesh.
 
     Args:
-        config_file (string): The path to the config file to run.
-        debug (bool, optional): Print debug output. Defaults to False.
+        config (Config): The config defining the problem.
+        logger (Logger): The logger to report progress to.
+
+    Returns:
+        Problem, bool: The problem and whether it is time dependant.
     """
     # pylint: disable=too-many-locals
-    logger = setup_logger(debug=debug)
-
-    logger.info('Running TTiP on %s', config_file)
-    config = Config(config_file)
-
-    logger.info('Setting up the problem.')
-    start_time = time.time()
-    logger.debug('Building mesh..')
-    # Setup mesh and function space
     mesh, V = config.get_mesh()
 
     # Get parameters
@@ -81,26 +85,35 @@ def run(config_file, debug=False):
         limit_flux=limit_flux,
         limit_conductivity=limit_conductivity)
 
+    problem_settings = config.get_problem_settings()
     problem = ProblemClass(mesh, V)
+    problem.set_quadrature_degree(problem_settings['quadrature_degree'])
 
     if time_dep:
         problem.set_timescale(steps=steps, dt=dt, max_t=max_t)
 
-    # Set up parameters
-    ignored = []
-    for name, value in params.items():
-        try:
-            problem.set_function(name, value)
-        except AttributeError:
-            ignored.append(name)
-
-    if ignored:
-        logger.info('Ignoring unnecesary parameters: %s', ', '.join(ignored))
-
     logger.debug('Building sources..')
     # Set up source
     source = config.get_sources()
-    problem.set_function('S', source)
+    time_series = config.pop_time_series()
+
+    # Set up parameters and source in a single pass over the forms
+    functions = dict(params, S=source)
+    reuse_kernels = problem_settings['reuse_kernels']
+    if reuse_kernels and time_series:
+        # Copies would not see the in place updates to the functions.
+        logger.warning('reuse_kernels is not supported with time dependant '
+                       'files, substituting the functions instead.')
+        reuse_kernels = False
+    if reuse_kernels:
+        ignored = problem.assign_functions(functions, ignore_unknown=True)
+    else:
+        ignored = problem.set_functions(functions, ignore_unknown=True)
+
+    if ignored:
+        logger.info('Ignoring unnecesary parameters: %s', ', '.join(ignored))
+    logger.debug('Replaced functions with %d form traversals.',
+                 problem.replace_traversals)
 
     logger.debug('Building boundary conditions..')
     # Set up boundary conditions
@@ -110,27 +123,123 @@ def run(config_file, debug=False):
     if not bcs:
         problem.set_no_boundary()
 
+    for series in time_series + config.pop_time_series():
+        problem.add_time_series(series)
+
     logger.debug('Building initial value..')
     # Set up initial value
     initial_val = config.get_initial_val()
     problem.T.assign(initial_val)
 
+    _, method, params = config.get_solver_params()
+    try:
+        problem.set_method(method, **params)
+    except AttributeError:
+        pass
+
+    return problem, time_dep
+
+
+def build_coarse_problems(config, time_dep, logger):
+    """
+    Create the problem on each coarse level of the mesh hierarchy for grid
+    sequencing.
+
+    Args:
+        config (Config): The config defining the problem.
+        time_dep (bool): Whether the problem is time dependant.
+        logger (Logger): The logger to report progress to.
+
+    Returns:
+        list<Problem>: The problems from coarsest to finest, or an empty list
+            if grid sequencing is not used.
+    """
+    hierarchy = config.get_mesh_hierarchy()
+    if (time_dep or hierarchy is None
+            or not config.get_problem_settings()['grid_sequencing']):
+        return []
+
+    logger.debug('Building coarse problems..')
+    mesh, _ = config.get_mesh()
+    coarse_problems = []
+    for level_mesh in hierarchy[:-1]:
+        config.set_mesh(level_mesh)
+        coarse_problems.append(build_problem(config, logger)[0])
+    config.set_mesh(mesh)
+    return coarse_problems
+
+
+def configure_solver(solver, config, time_dep):
+    """
+    Apply the solver settings from the config.
+
+    Args:
+        solver (Solver): The solver to set up.
+        config (Config): The config defining the problem.
+        time_dep (bool): Whether the problem is time dependant.
+    """
+    settings = config.get_solver_settings()
+    if time_dep:
+        settings.pop('pseudo_transient')
+    else:
+        for name in TIME_DEPENDANT_SETTINGS:
+            settings.pop(name)
+
+    # The preset comes first as it replaces the solver parameters.
+    for name, kwargs in settings.items():
+        if kwargs is not None:
+            getattr(solver, 'set_' + name)(**kwargs)
+
+
+def run(config_file, debug=False, restart=None):
+    """
+    Run the solve on the given problem definition config file.
+
+    Args:
+        config_file (string): The path to the config file to run.
+        debug (bool, optional): Print debug output. Defaults to False.
+        restart (string, optional):
+            The path to a checkpoint to restart from. Defaults to None.
+    """
+    logger = setup_logger(debug=debug)
+
+    logger.info('Running TTiP on %s', config_file)
+    config = Config(config_file)
+
+    logger.info('Setting up the problem.')
+    start_time = time.time()
+    logger.debug('Building mesh..')
+    # Setup mesh and function space
+    if restart is not None:
+        config.set_mesh(load_checkpoint_mesh(restart))
+
+    problem, time_dep = build_problem(config, logger)
+    coarse_problems = build_coarse_problems(config, time_dep, logger)
+
     logger.info('Problem set up (%.1fs)', time.time() - start_time)
     logger.info('Running the solve.')
     start_time = time.time()
 
     # Solve
-    file_path, method, params = config.get_solver_params()
-    try:
-        problem.set_method(method, **params)
-    except AttributeError:
-        pass
+    file_path, _, _ = config.get_solver_params()
 
     solver = Solver(problem)
+    configure_solver(solver, config, time_dep)
+    if coarse_problems:
+        solver.set_grid_sequence(coarse_problems)
+    if restart is not None:
+        logger.info('Restarting from %s', restart)
+        solver.load_checkpoint(restart)
     solver.solve(file_path=file_path)
     logger.info('Success (%.1fs) - Results are stored in: %s',
                 time.time() - start_time, file_path)
 
+    report = problem.memory_report()
+    logger.debug('%d problem functions allocated (%.1f MB), %d never '
+                 'allocated (%.1f MB saved).', report['allocated'],
+                 report['allocated_bytes'] / 1e6, report['placeholders'],
+                 report['saved_bytes'] / 1e6)
+
 
 def main():
     """
@@ -148,7 +257,7 @@ def main():
         gen_conf()
         return
 
-    run(config_file=args.config, debug=args.debug)
+    run(config_file=args.config, debug=args.debug, restart=args.restart)
 
 
 if __name__ == '__main__':
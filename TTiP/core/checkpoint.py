@@ -0,0 +1,106 @@
+"""
+This file holds functions to save and load checkpoints of time dependant runs.
+
+A checkpoint is a HDF5 file containing the mesh, T, T_, and the state of the
+time loop (the current time, the number of steps taken, and dt).
+"""
+import os
+
+from firedrake import CheckpointFile
+
+STATE_PATH = '/ttip'
+
+
+def save_checkpoint(path, problem, t, step, dt=None):
+    """
+    Save the state of a time dependant problem.
+    The checkpoint is written to a temporary file and then moved to path so
+    that an interrupted write does not destroy the previous checkpoint.
+
+    Args:
+        path (string):
+            The path to save the checkpoint to.
+        problem (TimeMixin, Problem):
+            The problem to save the state of.
+        t (float):
+            The current simulated time.
+        step (int):
+            The number of steps that have been taken.
+        dt (float, optional):
+            The step size the next step would use. This can differ from the
+            problem's dt, which holds the last step taken (e.g. if it was
+            shortened to land on an output time). Defaults to the problem's
+            dt.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    with CheckpointFile(tmp_path, 'w', comm=problem.mesh.comm) as afile:
+        afile.save_mesh(problem.mesh)
+        afile.save_function(problem.T, name='T')
+        afile.save_function(problem.T_, name='T_')
+        afile.set_attr(STATE_PATH, 'time', t)
+        afile.set_attr(STATE_PATH, 'step', step)
+        afile.set_attr(STATE_PATH, 'dt',
+                       problem.dt if dt is None else dt)
+
+    problem.mesh.comm.barrier()
+    if problem.mesh.comm.rank == 0:
+        os.replace(tmp_path, path)
+    problem.mesh.comm.barrier()
+
+
+def load_checkpoint_mesh(path):
+    """
+    Load the mesh from a checkpoint.
+    Problems must be built on this mesh to load the rest of the checkpoint.
+
+    Args:
+        path (string): The path to the checkpoint.
+
+    Raises:
+        ValueError: If the checkpoint does not exist.
+
+    Returns:
+        Mesh: The mesh stored in the checkpoint.
+    """
+    if not os.path.exists(path):
+        raise ValueError('Checkpoint file does not exist.')
+
+    with CheckpointFile(path, 'r') as afile:
+        mesh = afile.load_mesh()
+        mesh.init()
+    return mesh
+
+
+def load_checkpoint(path, problem):
+    """
+    Load the state of a time dependant problem from a checkpoint.
+    This sets T and T_ on the problem.
+
+    Args:
+        path (string):
+            The path to the checkpoint.
+        problem (TimeMixin, Problem):
+            The problem to load the state into. This must be defined on the
+            mesh from load_checkpoint_mesh.
+
+    Raises:
+        ValueError: If the checkpoint does not exist.
+
+    Returns:
+        float, int, float: The time, number of steps taken, and dt.
+    """
+    if not os.path.exists(path):
+        raise ValueError('Checkpoint file does not exist.')
+
+    with CheckpointFile(path, 'r', comm=problem.mesh.comm) as afile:
+        problem.T.assign(afile.load_function(problem.mesh, 'T'))
+        problem.T_.assign(afile.load_function(problem.mesh, 'T_'))
+        t = afile.get_attr(STATE_PATH, 'time')
+        step = afile.get_attr(STATE_PATH, 'step')
+        dt = afile.get_attr(STATE_PATH, 'dt')
+
+    return float(t), int(step), float(dt)
@@ -0,0 +1,182 @@
+"""
+This file holds the Lagging class which reuses the jacobian and
+preconditioner across Newton iterations and time steps.
+"""
+from TTiP.util.logger import get_logger
+
+LOGGER = get_logger()
+
+
+class Lagging:
+    """
+    A class to lag rebuilding the jacobian and preconditioner of a solver.
+
+    The lag persists across solves, so a jacobian or preconditioner can be
+    reused over several time steps. After each step the solve is checked and
+    both are rebuilt at the start of the next solve if:
+        - The average number of linear iterations per Newton iteration has
+          grown by more than ksp_growth since the last rebuild.
+        - The average reduction in the nonlinear residual per Newton
+          iteration is worse than max_rate.
+
+    A Lagging without any lag does nothing, so it can always be used.
+
+    Attributes:
+        jacobian (int):
+            Rebuild the jacobian every this many times it is needed.
+            -1 to never rebuild unless the solve degrades.
+        preconditioner (int):
+            Rebuild the preconditioner every this many times it is needed.
+            -1 to never rebuild unless the solve degrades.
+        ksp_growth (float):
+            The growth in linear iterations that triggers a rebuild.
+        max_rate (float):
+            The worst acceptable nonlinear convergence rate.
+        _baseline (float):
+            The linear iterations per Newton iteration after the last rebuild.
+            None if there has not been a solve since the last rebuild.
+        _refreshing (bool):
+            Whether a rebuild has been requested for the next solve.
+    """
+
+    def __init__(self, jacobian=1, preconditioner=1, ksp_growth=2.0,
+                 max_rate=0.5):
+        """
+        Initialiser for Lagging.
+
+        Args:
+            jacobian (int, optional):
+                Rebuild the jacobian every this many times it is needed.
+                -1 to only rebuild when the solve degrades. Defaults to 1.
+            preconditioner (int, optional):
+                Rebuild the preconditioner every this many times it is
+                needed. -1 to only rebuild when the solve degrades.
+                Defaults to 1.
+            ksp_growth (float, optional):
+                The factor by which the linear iterations per Newton iteration
+                can grow before rebuilding. Defaults to 2.0.
+            max_rate (float, optional):
+                The largest acceptable ratio between consecutive nonlinear
+                residuals. Defaults to 0.5.
+
+        Raises:
+            ValueError: If a lag is 0 or less than -1.
+        """
+        for lag in (jacobian, preconditioner):
+            if lag == 0 or lag < -1:
+                raise ValueError('Lags must be positive or -1 (never).')
+
+        self.jacobian = jacobian
+        self.preconditioner = preconditioner
+        self.ksp_growth = ksp_growth
+        self.max_rate = max_rate
+
+        self._baseline = None
+        self._refreshing = False
+
+    @property
+    def enabled(self):
+        """
+        Whether anything is being lagged.
+
+        Returns:
+            bool: True if the jacobian or preconditioner is lagged.
+        """
+        return self.jacobian != 1 or self.preconditioner != 1
+
+    def solver_parameters(self):
+        """
+        Get the PETSc parameters to lag the solver.
+
+        Returns:
+            dict: The solver parameters.
+        """
+        if not self.enabled:
+            return {}
+        return {'snes_lag_jacobian': self.jacobian,
+                'snes_lag_jacobian_persists': True,
+                'snes_lag_preconditioner': self.preconditioner,
+                'snes_lag_preconditioner_persists': True}
+
+    def attach(self, solver):
+        """
+        Prepare a NonlinearVariationalSolver to record the statistics used to
+        decide when to rebuild.
+
+        Args:
+            solver (NonlinearVariationalSolver): The solver to attach to.
+        """
+        if not self.enabled:
+            return
+        solver.snes.setConvergenceHistory(reset=True)
+
+    def step_done(self, solver):
+        """
+        Check the last solve and request a rebuild if it has degraded.
+
+        Args:
+            solver (NonlinearVariationalSolver): The solver that was used.
+        """
+        if not self.enabled:
+            return
+
+        snes = solver.snes
+        if self._refreshing:
+            snes.setLagJacobian(self.jacobian)
+            snes.setLagPreconditioner(self.preconditioner)
+            self._refreshing = False
+
+        its = snes.getIterationNumber()
+        ksp_per_it = snes.getLinearSolveIterations() / max(its, 1)
+
+        if self._baseline is None:
+            self._baseline = ksp_per_it
+            return
+
+        reason = None
+        if ksp_per_it > self.ksp_growth * max(self._baseline, 1):
+            reason = 'linear iterations grew to {:.1f}'.format(ksp_per_it)
+        else:
+            rate = self._convergence_rate(snes)
+            if rate > self.max_rate:
+                reason = 'nonlinear convergence rate was {:.2g}'.format(rate)
+
+        if reason is not None:
+            LOGGER.debug('Rebuilding jacobian and preconditioner (%s).',
+                         reason)
+            self.refresh(solver)
+
+    def refresh(self, solver):
+        """
+        Rebuild the jacobian and preconditioner at the start of the next
+        solve.
+
+        Args:
+            solver (NonlinearVariationalSolver): The solver to refresh.
+        """
+        if not self.enabled:
+            return
+
+        # A lag of -2 rebuilds at the next opportunity. The configured lags
+        # are restored after the next solve.
+        solver.snes.setLagJacobian(-2)
+        solver.snes.setLagPreconditioner(-2)
+        self._refreshing = True
+        self._baseline = None
+
+    @staticmethod
+    def _convergence_rate(snes):
+        """
+        Calculate the average ratio between consecutive nonlinear residuals in
+        the last solve.
+
+        Args:
+            snes (PETSc.SNES): The nonlinear solver.
+
+        Returns:
+            float: The average ratio, or 0 if there were no iterations.
+        """
+        norms, _ = snes.getConvergenceHistory()
+        if len(norms) < 2 or norms[0] <= 0:
+            return 0.0
+        return float((norms[-1] / norms[0]) ** (1 / (len(norms) - 1)))
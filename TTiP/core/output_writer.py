@@ -0,0 +1,356 @@
+"""
+This file holds the OutputWriter class which controls when results are saved.
+"""
+from queue import Queue
+from threading import Thread
+
+from firedrake import H1, File, Function, FunctionSpace
+
+from TTiP.util.logger import get_logger
+
+LOGGER = get_logger()
+
+# The options for an OutputWriter and their defaults.
+DEFAULT_OPTIONS = {'every': None,
+                   'interval': None,
+                   'times': None,
+                   'final_only': False,
+                   'asynchronous': False,
+                   'buffers': 2}
+
+
+class OutputWriter:
+    """
+    A class to write the result of a solve to file at a given cadence.
+
+    Only one of every, interval, and times can be used. If none are given the
+    result is written after every step.
+    The final state is always written.
+
+    Attributes:
+        file_path (string):
+            The path to save the pvd file to.
+        every (int):
+            Write every this many steps.
+        times (list<float>):
+            The simulated times to write at.
+        interval (float):
+            Write every time this much simulated time has passed.
+        final_only (bool):
+            Only write the final state.
+        asynchronous (bool):
+            Write files in a background thread so that the solve can continue
+            while the previous result is written. The thread calls
+            firedrake's File.write, so this is turned off in parallel and a
+            writer must not be shared between MPI ranks or threads.
+        buffers (int):
+            The number of copies of the result that can be waiting to be
+            written when writing asynchronously.
+        _outfile (firedrake.File):
+            The file that is being written to.
+        _steps (int):
+            The number of steps since the output was opened.
+        _next_time (int):
+            The index of the next time to write at in times.
+        _written (bool):
+            Whether the latest state has been written.
+        _thread (threading.Thread):
+            The background thread that writes files.
+        _free (queue.Queue):
+            The buffers that are available to copy results into.
+        _pending (queue.Queue):
+            The buffers (and times) that are waiting to be written.
+        _error (Exception):
+            Any error raised in the background thread.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, file_path, options=None):
+        """
+        Initialiser for the OutputWriter.
+
+        Args:
+            file_path (string):
+                The path to save the pvd file to.
+                vtk files will be generated in the same directory as the pvd.
+            options (dict, optional):
+                Any of every, interval, times, final_only, asynchronous, and
+                buffers (see the attributes). Missing options take their
+                value from DEFAULT_OPTIONS. Defaults to None.
+
+        Raises:
+            ValueError: If an option is not known.
+            ValueError: If more than one output cadence is given.
+            ValueError: If buffers is less than 1.
+        """
+        unknown = set(options or {}) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError('Unknown output options: {}'.format(
+                ', '.join(sorted(unknown))))
+        options = dict(DEFAULT_OPTIONS, **(options or {}))
+
+        num_set = sum(options[x] is not None and options[x] is not False
+                      for x in ['every', 'interval', 'times', 'final_only'])
+        if num_set > 1:
+            raise ValueError('Only one of every, interval, times, and '
+                             'final_only can be set.')
+
+        if options['buffers'] < 1:
+            raise ValueError('Must have at least 1 buffer.')
+
+        times = options['times']
+        if times is not None and not isinstance(times, list):
+            times = [times]
+
+        self.file_path = file_path
+        self.every = options['every']
+        self.interval = options['interval']
+        self.times = sorted(t for t in times if t > 0) if times else times
+        self.final_only = options['final_only']
+        self.asynchronous = options['asynchronous']
+        self.buffers = options['buffers']
+
+        self._outfile = None
+        self._steps = 0
+        self._next_time = 0
+        self._written = False
+
+        self._thread = None
+        self._free = None
+        self._pending = None
+        self._error = None
+
+    def open(self, append=False, steps=0):
+        """
+        Open the output file.
+
+        Args:
+            append (bool, optional):
+                Append to an existing output instead of overwriting it.
+                Defaults to False.
+            steps (int, optional):
+                The number of steps that have already been taken.
+                Defaults to 0.
+        """
+        self._outfile = File(self.file_path, mode='a' if append else 'w')
+        self._steps = steps
+        self._next_time = 0
+        self._written = False
+
+    def write_initial(self, u):
+        """
+        Write the initial value.
+
+        Args:
+            u (Function): The function to write.
+        """
+        if not self.final_only:
+            self._write(u)
+
+    def step_done(self, u, t=None):
+        """
+        Record that a step has been taken and write the result if required.
+
+        Args:
+            u (Function): The function to write.
+            t (float, optional):
+                The simulated time after the step. Defaults to None.
+        """
+        self._steps += 1
+        self._written = False
+
+        if self.final_only:
+            return
+
+        if self.every is not None:
+            if self._steps % self.every == 0:
+                self._write(u, t)
+        elif self.interval is not None or self.times is not None:
+            if t is None:
+                return
+            target = self._pending_time()
+            if target is not None and t >= target * (1 - 1e-9):
+                self._write(u, t)
+            self._skip_passed_times(t)
+        else:
+            self._write(u, t)
+
+    def write_final(self, u, t=None):
+        """
+        Write the final state if it has not already been written.
+
+        Args:
+            u (Function): The function to write.
+            t (float, optional):
+                The simulated time of the final state. Defaults to None.
+        """
+        if not self._written:
+            self._write(u, t)
+
+    def next_output_time(self, t):
+        """
+        Get the next time that should be written at.
+        This can be used to shorten steps so that outputs land exactly on the
+        requested times.
+
+        Args:
+            t (float): The current simulated time.
+
+        Returns:
+            float: The next output time, or None if outputs are not timed.
+        """
+        self._skip_passed_times(t)
+        return self._pending_time()
+
+    def _pending_time(self):
+        """
+        Get the next output time that has not been passed.
+
+        Returns:
+            float: The output time, or None if there is none.
+        """
+        if self.interval is not None:
+            return self.interval * (self._next_time + 1)
+        if self.times is not None and self._next_time < len(self.times):
+            return self.times[self._next_time]
+        return None
+
+    def _skip_passed_times(self, t):
+        """
+        Move the next output time past any that are not after t.
+
+        Args:
+            t (float): The current simulated time.
+        """
+        target = self._pending_time()
+        while target is not None and target <= t * (1 + 1e-9):
+            self._next_time += 1
+            target = self._pending_time()
+
+    def close(self, raise_error=True):
+        """
+        Wait for any outstanding writes to finish.
+
+        Args:
+            raise_error (bool, optional):
+                Raise an error if writing in the background thread failed,
+                otherwise only log it. Defaults to True.
+
+        Raises:
+            RuntimeError: If writing in the background thread failed.
+        """
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            if not raise_error:
+                LOGGER.error('Failed to write output: %s', error)
+                return
+            raise RuntimeError('Failed to write output.') from error
+
+    def _write(self, u, t=None):
+        """
+        Write the function to the output file.
+
+        Args:
+            u (Function): The function to write.
+            t (float, optional):
+                The simulated time of the state. Defaults to None.
+        """
+        if self._outfile is None:
+            self._outfile = File(self.file_path)
+
+        if self.asynchronous and u.comm.size > 1:
+            LOGGER.warning('Asynchronous output is not supported in parallel,'
+                           ' writing synchronously.')
+            self.asynchronous = False
+
+        if self.asynchronous:
+            self._write_async(u, t)
+        else:
+            self._write_now(u, t)
+        self._written = True
+
+    def _write_now(self, u, t=None):
+        """
+        Write the function to the output file in the current thread.
+
+        Args:
+            u (Function): The function to write.
+            t (float, optional):
+                The simulated time of the state. Defaults to None.
+        """
+        kwargs = {} if t is None else {'time': t}
+        self._outfile.write(u,
+                            target_degree=1,
+                            target_continuity=H1,
+                            **kwargs)
+
+    def _write_async(self, u, t=None):
+        """
+        Copy the function into a free buffer and pass it to the background
+        thread to write.
+        If all buffers are waiting to be written this blocks until one is
+        free.
+
+        Args:
+            u (Function): The function to write.
+            t (float, optional):
+                The simulated time of the state. Defaults to None.
+        """
+        if self._thread is None:
+            self._start_thread(u)
+
+        if self._error is not None:
+            self.close()
+
+        buf = self._free.get()
+        # Buffers are in the output space so that the background thread does
+        # not need to interpolate. It still calls File.write, which uses
+        # firedrake and PETSc, so this is only done in serial.
+        if buf.function_space() == u.function_space():
+            buf.dat.data[:] = u.dat.data_ro
+        else:
+            buf.interpolate(u)
+        self._pending.put((buf, t))
+
+    def _start_thread(self, u):
+        """
+        Create the buffers and start the background thread.
+
+        Args:
+            u (Function): A function to create the buffers for.
+        """
+        V = u.function_space()
+        if V.ufl_element().degree() != 1:
+            V = FunctionSpace(V.mesh(), 'CG', 1)
+
+        self._free = Queue()
+        self._pending = Queue()
+        for _ in range(self.buffers):
+            self._free.put(Function(V, name=u.name()))
+
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """
+        Write buffers from the queue until None is received.
+        """
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+
+            buf, t = item
+            try:
+                if self._error is None:
+                    self._write_now(buf, t)
+            except Exception as e:  # pylint: disable=broad-except
+                self._error = e
+            finally:
+                self._free.put(buf)
@@ -1,10 +1,15 @@
 """
 This file stores the base problem and any created by adding mixins.
 """
-from firedrake import (Function, TestFunction, as_tensor, dot, dx, grad,
-                       replace, sqrt)
+import numpy as np
+from firedrake import (Constant, Function, TestFunction, as_tensor, dot, dx,
+                       grad, replace, sqrt)
+from firedrake.utils import ScalarType
 from scipy.constants import e, m_e
-from ufl import Form, Integral
+from ufl import Coefficient, Form, Integral
+from ufl.algorithms import (estimate_total_polynomial_degree,
+                            extract_coefficients)
+from ufl.constantvalue import Zero
 from ufl.core.expr import Expr
 
 from TTiP.problem_mixins.boundaries_mixin import BoundaryMixin
@@ -14,6 +19,12 @@ from TTiP.problem_mixins.flux_limit_mixin import FluxLimiterMixin
 from TTiP.problem_mixins.specific_heat_capacity_mixin import (
     ConstantIonisationSHCMixin, NonConstantIonisationSHCMixin)
 from TTiP.problem_mixins.time_mixin import TimeMixin
+from TTiP.util.logger import get_logger
+
+LOGGER = get_logger()
+
+# Problem classes created by create_problem_class, keyed by their flags.
+_PROBLEM_CLASSES = {}
 
 
 class Problem:
@@ -32,8 +43,10 @@ class Problem:
             A function to hold the result. This is usually a trial function
             however in this case we expect the problem to be non-linear, in
             which case firedrake uses a Function.
-        S (firedrake.Function):
-            A function to hold any sources. This may be moved to a mixin.
+        S (ufl.Coefficient):
+            A placeholder to hold any sources. This may be moved to a mixin.
+            Like the other placeholders, this has no storage until a Function
+            is needed (see get_function).
         K (firedrake.Function):
             A function to hold the heat conductivity. This defines how the heat
             flows through the mesh.
@@ -46,8 +59,25 @@ class Problem:
             Used to solve the problem of finding a - L = 0.
         L (firedrake.Function):
             A function used to combine parts not in 'a' (see above).
+        quadrature_degree (int):
+            The largest quadrature degree to integrate with. None to cap the
+            degree automatically from the element order.
+        _truncation_logged (bool):
+            Whether truncating the quadrature degree has been logged.
+        replace_traversals (int):
+            The number of forms and expressions that have been traversed to
+            replace functions.
+        time_series (list):
+            Objects with an update(t) method that update functions used by
+            the problem in place for the simulated time t.
+        _placeholders (dict):
+            The placeholder for each function. These are symbolic
+            coefficients until storage is allocated for them.
     """
     # pylint: disable=too-few-public-methods, no-member
+    # The forms and functions are attributes so that replacements reach all
+    # of them.
+    # pylint: disable=too-many-instance-attributes
 
     def __init__(self, mesh, V):
         """
@@ -61,15 +91,20 @@ class Problem:
                 The function space to define the solution on.
         """
         self._functions = []
+        self._placeholders = {}
+        self.replace_traversals = 0
+        self.time_series = []
 
         # Store the function space details.
         self.mesh = mesh
         self.V = V
+        self.quadrature_degree = None
+        self._truncation_logged = False
 
         # Initialise functions for problem.
         self.v = TestFunction(V)
 
-        self._add_function('T')
+        self._add_function('T', allocate=True)
         self._add_function('S')
         self._add_function('K')
         self._add_function('q')
@@ -96,9 +131,282 @@ class Problem:
             value (Function):
                 The value to replace the named function with.
         """
-        if name not in self._functions:
-            raise AttributeError('Could not set "{}"'.format(name))
-        self._update_func(name=name, val=value)
+        self.set_functions({name: value})
+
+    def set_functions(self, mapping, ignore_unknown=False):
+        """
+        Replace several named functions in all formulas at once.
+        Each formula is traversed once for the whole mapping rather than once
+        per function. The values are substituted simultaneously, so functions
+        appearing inside the new values are not themselves replaced.
+
+        Args:
+            mapping (dict):
+                The names of the functions to replace and the values to
+                replace them with.
+            ignore_unknown (bool, optional):
+                Skip names that are not functions of the problem instead of
+                raising an error. Defaults to False.
+
+        Raises:
+            AttributeError:
+                If a name is not a function of the problem and ignore_unknown
+                is False.
+
+        Returns:
+            list<str>: The names that were skipped.
+        """
+        unknown = [name for name in mapping if name not in self._functions]
+        if unknown and not ignore_unknown:
+            raise AttributeError('Could not set "{}"'.format(
+                '", "'.join(unknown)))
+
+        self._update_funcs({name: value for name, value in mapping.items()
+                            if name not in unknown})
+        return unknown
+
+    def assign_functions(self, mapping, ignore_unknown=False):
+        """
+        Copy values into the named placeholder functions instead of replacing
+        them in the formulas.
+        The formulas keep the same structure whatever the values are, so
+        problems built this way have matching form signatures and reuse
+        compiled kernels.
+
+        Names that are no longer placeholder functions (e.g. they have been
+        replaced by an expression) and zero constants (so that prune can
+        remove them) are replaced as in set_functions.
+
+        Args:
+            mapping (dict):
+                The names of the functions to set and their values.
+            ignore_unknown (bool, optional):
+                Skip names that are not functions of the problem instead of
+                raising an error. Defaults to False.
+
+        Raises:
+            AttributeError:
+                If a name is not a function of the problem and ignore_unknown
+                is False.
+
+        Returns:
+            list<str>: The names that were skipped.
+        """
+        to_replace = {}
+        for name, value in mapping.items():
+            placeholder = self._placeholders.get(name)
+            if (name in self._functions
+                    and placeholder is not None
+                    and getattr(self, name) is placeholder
+                    and not _is_zero_constant(value)):
+                self.get_function(name).interpolate(value)
+            else:
+                to_replace[name] = value
+
+        return self.set_functions(to_replace, ignore_unknown=ignore_unknown)
+
+    def get_function(self, name):
+        """
+        Get a named function, allocating storage for its placeholder if it
+        has not been allocated yet. The placeholder is replaced by the new
+        Function in all formulas.
+
+        Args:
+            name (str): The name of the function.
+
+        Raises:
+            AttributeError: If name is not in self.
+
+        Returns:
+            Function or Expr:
+                The function, or the value it has been replaced with.
+        """
+        placeholder = self._placeholders.get(name)
+        if placeholder is not None and not isinstance(placeholder, Function):
+            f = Function(self.V, name=name)
+            self._replace_all({placeholder: f})
+            self._placeholders[name] = f
+        return getattr(self, name)
+
+    def allocate_placeholders(self, form):
+        """
+        Allocate storage for any placeholders in a form so that it can be
+        assembled. Placeholders that were never set hold zero.
+
+        Args:
+            form (Form or Expr): The form to prepare.
+
+        Returns:
+            Form or Expr: The form using the allocated functions.
+        """
+        names = {p: name for name, p in self._placeholders.items()}
+        mapping = {}
+        for coefficient in extract_coefficients(form):
+            name = names.get(coefficient)
+            if name is not None and not isinstance(coefficient, Function):
+                self.get_function(name)
+                mapping[coefficient] = self._placeholders[name]
+
+        if not mapping:
+            return form
+        return replace(form, mapping)
+
+    def memory_report(self):
+        """
+        Report the memory used by the problem functions and the memory saved
+        by placeholders that have not been allocated.
+
+        Returns:
+            dict: The number of 'allocated' functions and unallocated
+                'placeholders', and the 'allocated_bytes' and 'saved_bytes'.
+        """
+        nbytes = self.V.dim() * np.dtype(ScalarType).itemsize
+        allocated = sum(isinstance(p, Function)
+                        for p in self._placeholders.values())
+        placeholders = len(self._placeholders) - allocated
+        return {'allocated': allocated,
+                'placeholders': placeholders,
+                'allocated_bytes': allocated * nbytes,
+                'saved_bytes': placeholders * nbytes}
+
+    def add_time_series(self, series):
+        """
+        Add a time series to update with the simulated time.
+        The functions it updates should already be set in the problem.
+
+        Args:
+            series (object):
+                An object with an update(t) method which updates functions in
+                place (e.g. file_builder.FileSeries).
+        """
+        self.time_series.append(series)
+
+    def update_time(self, t):
+        """
+        Update all time series to the simulated time.
+
+        Args:
+            t (float): The simulated time.
+        """
+        for series in self.time_series:
+            series.update(t)
+
+    def set_quadrature_degree(self, degree=None):
+        """
+        Set the largest quadrature degree to integrate with.
+
+        Args:
+            degree (int, optional):
+                The largest degree. Defaults to None, which caps the degree
+                automatically from the element order.
+
+        Raises:
+            ValueError: If the degree is negative.
+        """
+        if degree is not None and degree < 0:
+            raise ValueError('The quadrature degree must not be negative.')
+        self.quadrature_degree = degree
+        self._truncation_logged = False
+
+    def max_quadrature_degree(self):
+        """
+        Get the largest quadrature degree to integrate with.
+        If not set, this is enough to integrate the product of three functions
+        from V exactly (e.g. the mass term C*T*v).
+
+        Returns:
+            int: The largest quadrature degree.
+        """
+        if self.quadrature_degree is not None:
+            return self.quadrature_degree
+        return 3 * self.V.ufl_element().degree()
+
+    def limit_quadrature(self, form):
+        """
+        Set the quadrature degree of each integral (every dx and ds measure)
+        in a form.
+
+        UFL estimates very high degrees for the non-polynomial terms (e.g.
+        T**(5/2) and the abs in the bounds) which creates very large, slow
+        kernels. Each integral keeps its estimated degree up to the maximum
+        and is truncated above it.
+        Integrals that already set a quadrature degree are left unchanged.
+
+        Args:
+            form (Form): The form to limit.
+
+        Returns:
+            Form: The form with a quadrature degree on every integral.
+        """
+        max_degree = self.max_quadrature_degree()
+        order = self.V.ufl_element().degree()
+
+        integrals = []
+        truncated = []
+        for integral in form.integrals():
+            metadata = dict(integral.metadata())
+            if 'quadrature_degree' not in metadata:
+                estimated = estimate_total_polynomial_degree(
+                    integral.integrand(), default_degree=order)
+                if estimated > max_degree:
+                    truncated.append(estimated)
+                metadata['quadrature_degree'] = min(estimated, max_degree)
+            integrals.append(integral.reconstruct(metadata=metadata))
+
+        # The automatic cap truncates most forms, so this is only worth a
+        # warning if the user chose the degree.
+        if truncated and not self._truncation_logged:
+            log = (LOGGER.debug if self.quadrature_degree is None
+                   else LOGGER.warning)
+            log('Truncating the quadrature degree of %d integral(s) from up '
+                'to %d to %d.', len(truncated), max(truncated), max_degree)
+            self._truncation_logged = True
+
+        return Form(integrals)
+
+    def prune(self):
+        """
+        Remove terms that are identically zero from a and L so that they are
+        not assembled.
+        This should be called once the problem is fully defined, just before
+        solving. Mixins extend this to remove their own terms.
+
+        The base problem removes the source term if it is a zero constant.
+        """
+        if _is_zero_constant(self.S):
+            self._prune_integrals('zero source', mapping={self.S: Zero()})
+
+    def _prune_integrals(self, description, mapping=None, condition=None):
+        """
+        Remove integrals from a and L and log how many were removed.
+
+        Args:
+            description (str):
+                A description of the removed terms for the log.
+            mapping (dict, optional):
+                Replace the keys with the values (e.g. a placeholder with
+                Zero()). Integrals that simplify to zero are removed.
+                Defaults to None.
+            condition (callable, optional):
+                Remove integrals for which this returns True.
+                Defaults to None.
+        """
+        removed = 0
+        for name in ('a', 'L'):
+            form = getattr(self, name)
+            if not isinstance(form, Form):
+                continue
+            num_integrals = len(form.integrals())
+            if mapping is not None:
+                form = self._replace(form, mapping)
+            if condition is not None:
+                form = Form([i for i in form.integrals()
+                             if not condition(i)])
+            removed += num_integrals - len(form.integrals())
+            setattr(self, name, form)
+
+        if removed:
+            LOGGER.info('Pruned %d %s integral(s).', removed, description)
 
     def _A(self):
         """
@@ -140,24 +448,72 @@ class Problem:
         Raises:
             AttributeError: If name is not in self.
         """
-        if not hasattr(self, name):
-            raise AttributeError('Cannot update {}'.format(name))
+        self._update_funcs({name: val})
+
+    def _update_funcs(self, vals):
+        """
+        Utility function to update several functions in the main attributes
+        with a single replacement per attribute.
 
+        Args:
+            vals (dict): The names of the functions and their new values.
+
+        Raises:
+            AttributeError: If a name is not in self.
+        """
+        for name in vals:
+            if not hasattr(self, name):
+                raise AttributeError('Cannot update {}'.format(name))
+
+        if not vals:
+            return
+
+        self._replace_all({getattr(self, name): val
+                           for name, val in vals.items()})
+
+    def _replace_all(self, replacements):
+        """
+        Replace terms in all of the main attributes with a single replacement
+        per attribute.
+
+        Args:
+            replacements (dict): The terms to replace and their replacements.
+        """
         attrs = vars(self).copy()
-        old_val = getattr(self, name)
         for attr_name, attr_val in attrs.items():
             if isinstance(attr_val, (Form, Integral, Expr)):
-                updated_val = replace(attr_val, {old_val: val})
+                updated_val = self._replace(attr_val, replacements)
                 setattr(self, attr_name, updated_val)
 
-    def _add_function(self, name):
+    def _replace(self, expr, mapping):
+        """
+        Replace terms in a form or expression, counting the traversal.
+
+        Args:
+            expr (Form, Integral, or Expr): The form or expression.
+            mapping (dict): The terms to replace and their replacements.
+
+        Returns:
+            Form, Integral, or Expr: The updated form or expression.
+        """
+        self.replace_traversals += 1
+        return replace(expr, mapping)
+
+    def _add_function(self, name, allocate=False):
         """
         Ensure the problem has required attribute.
         If attribute already exists, do nothing.
-        Otherwise create a new function to hold it and add a setter method.
+        Otherwise create a new placeholder to hold it and add a setter method.
+
+        Most functions are replaced by an expression or a parameter before
+        solving, so the placeholder is a symbolic coefficient without storage
+        unless allocate is set.
 
         Args:
             name (str): The name of the attribute to create.
+            allocate (bool, optional):
+                Create a Function with storage straight away.
+                Defaults to False.
         """
         if name in self._functions:
             return
@@ -166,9 +522,13 @@ class Problem:
             raise AttributeError('"{}" already exists and is not a function.'
                                  ''.format(name))
 
-        f = Function(self.V, name=name)
+        if allocate:
+            f = Function(self.V, name=name)
+        else:
+            f = Coefficient(self.V.ufl_function_space())
         setattr(self, name, f)
 
+        self._placeholders[name] = f
         self._functions.append(name)
 
     def bound(self, name, lower=None, upper=None):
@@ -290,7 +650,12 @@ def create_problem_class(time_dep=False,
 
     Returns:
         class: A problem class with the required functionality.
+            The same class is returned for the same arguments.
     """
+    key = (bool(time_dep), bool(sh_conductivity), bool(constant_ionisation),
+           bool(limit_flux), bool(limit_conductivity))
+    if key in _PROBLEM_CLASSES:
+        return _PROBLEM_CLASSES[key]
 
     dependancies = [BoundaryMixin, Problem]
 
@@ -313,4 +678,18 @@ def create_problem_class(time_dep=False,
         - {}
         """.format('\n- '.join([d.__name__ for d in dependancies]))
 
+    _PROBLEM_CLASSES[key] = CustomProblem
     return CustomProblem
+
+
+def _is_zero_constant(value):
+    """
+    Check if a value is a constant that is zero everywhere.
+
+    Args:
+        value (any): The value to check.
+
+    Returns:
+        bool: True if value is a zero Constant.
+    """
+    return isinstance(value, Constant) and not value.values().any()
@@ -25,6 +25,9 @@ class Config:
     Attributes:
         conf_parser (ConfigParser):
             The dict-like object that is returned from configparser.
+        _time_series (list):
+            The time series of time dependant functions that have been
+            created and not yet collected by pop_time_series.
     """
     def __init__(self, filename):
         """
@@ -48,6 +51,8 @@ class Config:
 
         self._mesh = None
         self._V = None
+        self._hierarchy = None
+        self._time_series = []
 
     def get_boundary_conds(self):
         """
@@ -60,6 +65,7 @@ class Config:
             self.get_mesh()
         parser = BoundaryCondsParser(self._mesh, self._V)
         parser.parse(self.conf_parser['BOUNDARIES'])
+        self._time_series.extend(parser.factory.time_series)
         return parser.bcs
 
     def get_sources(self):
@@ -73,8 +79,22 @@ class Config:
             self.get_mesh()
         parser = SourcesParser(self._mesh, self._V)
         parser.parse(self.conf_parser['SOURCES'])
+        self._time_series.extend(parser.factory.time_series)
         return parser.source
 
+    def pop_time_series(self):
+        """
+        Get the time series of any time dependant functions created by
+        get_sources, get_parameters, or get_boundary_conds since the last
+        call.
+
+        Returns:
+            list: The time series (see FunctionBuilder.time_series).
+        """
+        time_series = self._time_series
+        self._time_series = []
+        return time_series
+
     def get_time(self):
         """
         Get the time stepping data.
@@ -100,9 +120,34 @@ class Config:
             parser.parse(self.conf_parser['MESH'])
             self._mesh = parser.mesh
             self._V = parser.func_space
+            self._hierarchy = parser.hierarchy
 
         return self._mesh, self._V
 
+    def get_mesh_hierarchy(self):
+        """
+        Get the mesh hierarchy that the problem mesh is the finest level of.
+
+        Returns:
+            MeshHierarchy: The hierarchy, or None if there are no coarse
+                levels.
+        """
+        self.get_mesh()
+        return self._hierarchy
+
+    def set_mesh(self, mesh):
+        """
+        Use an existing mesh for the problem instead of the one defined in the
+        config. The function space is still defined by the config.
+
+        Args:
+            mesh (Mesh): The mesh to use.
+        """
+        parser = MeshParser()
+        parser.parse(self.conf_parser['MESH'], mesh=mesh)
+        self._mesh = parser.mesh
+        self._V = parser.func_space
+
     def get_parameters(self):
         """
         Get the parameters for the problem.
@@ -120,6 +165,7 @@ class Config:
             self.get_mesh()
         parser = ParametersParser(self._mesh, self._V)
         parser.parse(self.conf_parser['PARAMETERS'])
+        self._time_series.extend(parser.factory.time_series)
         return parser.parameters
 
     def get_initial_val(self):
@@ -146,6 +192,39 @@ class Config:
         parser.parse(self.conf_parser['SOLVER'])
         return parser.file_path, parser.method, parser.params
 
+    def get_solver_settings(self):
+        """
+        Get the settings for the solver from the SOLVER and TIME sections.
+
+        Returns:
+            dict: The keyword arguments for each of the Solver set_ methods,
+                keyed by the name of the method without "set_" (e.g. "output"
+                for set_output). None for any that are not enabled.
+        """
+        parser = SolverParser()
+        parser.parse(self.conf_parser['SOLVER'])
+        time_parser = TimeParser()
+        time_parser.parse(self.conf_parser['TIME'])
+
+        settings = dict(parser.solver_settings)
+        settings.update(adaptive=time_parser.adaptive,
+                        retries=time_parser.retries,
+                        steady_stop=time_parser.steady_stop)
+        return settings
+
+    def get_problem_settings(self):
+        """
+        Get the settings from the SOLVER section that change how the problem
+        is built.
+
+        Returns:
+            dict: The quadrature_degree, reuse_kernels, and grid_sequencing
+                settings (see SolverParser.problem_settings).
+        """
+        parser = SolverParser()
+        parser.parse(self.conf_parser['SOLVER'])
+        return parser.problem_settings
+
     def get_physics_settings(self):
         """
         Get the values from the physics section.
@@ -1,11 +1,24 @@
 """
 This file holds the solver class which is used to run the FEM solve.
 """
-from firedrake import (H1, File, NonlinearVariationalProblem,
-                       NonlinearVariationalSolver)
+import os
 
+from firedrake import (Constant, ConvergenceError, Function,
+                       NonlinearVariationalProblem, NonlinearVariationalSolver,
+                       assemble, dx, inner, prolong, replace)
+from numpy import sqrt
+
+from TTiP.core.checkpoint import load_checkpoint, save_checkpoint
+from TTiP.core.lagging import Lagging
+from TTiP.core.output_writer import OutputWriter
+from TTiP.core.solver_presets import (DEFAULT_PRESET, get_preset,
+                                      select_preset)
+from TTiP.core.telemetry import Telemetry
 from TTiP.problem_mixins.boundaries_mixin import BoundaryMixin
 from TTiP.problem_mixins.time_mixin import TimeMixin
+from TTiP.util.logger import get_logger
+
+LOGGER = get_logger()
 
 
 class Solver:
@@ -17,9 +30,48 @@ class Solver:
             The problem to solve.
         u (firedrake.Function):
             The variable to solve for in the problem.
+        preset (string):
+            The name of the preset the solver parameters are based on.
         params (dict):
             The parameters passed to the solver.
+        adaptive (dict):
+            The settings for adaptive time stepping.
+            None if using fixed steps.
+        max_retries (int):
+            The number of times to retry a step with half the step size if the
+            nonlinear solve diverges.
+        regrow_after (int):
+            The number of successful steps after which to double dt back
+            towards the configured value.
+        output (dict):
+            The keyword arguments for the OutputWriter that controls how
+            often results are written.
+        checkpoint_every (int):
+            Write a checkpoint every this many steps.
+            None if checkpointing is disabled.
+        checkpoint_path (string):
+            The path to write checkpoints to.
+            None to use checkpoint.h5 next to the results.
+        coarse_problems (list<Problem>):
+            The problem on each coarser level of a mesh hierarchy, coarsest
+            first, to solve before steady state solves.
+        pseudo_transient (dict):
+            The settings for pseudo transient continuation of steady state
+            solves. None to solve steady state problems directly.
+        steady_stop (dict):
+            The criteria to stop a time dependant run early once it reaches a
+            steady state. None to always run to the end.
+        lagging (dict):
+            The keyword arguments for the Lagging that controls how often the
+            jacobian and preconditioner are rebuilt.
+        telemetry (dict):
+            The keyword arguments for the Telemetry that records statistics
+            for each step. None if telemetry is disabled.
+        _start (tuple<float, int, float>):
+            The time, number of steps, and dt to start the time loop from.
+            None if not restarting.
     """
+    # pylint: disable=too-many-instance-attributes
 
     def __init__(self, problem):
         """
@@ -32,29 +84,294 @@ class Solver:
         self.problem = problem
         self.u = problem.T
 
-        self.params = {
-            'snes_type': 'newtonls',
-            'mat_type': 'matfree',
-            'ksp_type': 'gmres',  # 'preonly',
-            'pc_type': 'python',
-            'pc_python_type': 'firedrake.AssembledPC',
-            'assembled_pc_type': 'hypre',  # 'lu',
-            'assembled_pc_factor_mat_solver_type': 'mumps',
-            'assembled_pc_hypre_type': 'boomeramg',
-            'assembled_pc_hypre_boomeramg_max_iter': 10,
-            'assembled_pc_hypre_boomeramg_tol': 1e-9,
-            # 'snes_monitor': None,
-            # 'snes_view': None,
-            # 'ksp_monitor_true_residual': None,
-            # 'snes_converged_reason': None,
-            # 'ksp_converged_reason': None,
-            'snes_linesearch_type': 'l2',
-            'snes_linesearch_maxstep': 1.0,
-            # 'snes_atol': 1e-6,
-            # 'snes_rtol': 0,
-            # 'snes_stol': 1e-16,
-            'snes_max_L_solve_fail': 10,
-            'snes_max_it': 1000}
+        self.preset = DEFAULT_PRESET
+        self.params = get_preset(self.preset)
+
+        self.adaptive = None
+        self.max_retries = 0
+        self.regrow_after = 5
+        self.output = {}
+        self.checkpoint_every = None
+        self.checkpoint_path = None
+        self.coarse_problems = []
+        self.pseudo_transient = None
+        self.steady_stop = None
+        self.lagging = {}
+        self.telemetry = None
+        self._start = None
+
+    def set_preset(self, preset=None, overrides=None):
+        """
+        Set the solver parameters from a named preset.
+        See TTiP.core.solver_presets for the available presets.
+
+        Args:
+            preset (string, optional):
+                The name of the preset. 'auto' chooses a preset from the size
+                of the problem. Defaults to None (keep the current preset).
+            overrides (dict, optional):
+                PETSc parameters to set on top of the preset.
+                Defaults to None.
+        """
+        if preset == 'auto':
+            preset = select_preset(self.problem.V)
+            LOGGER.info('Using the %s solver preset.', preset)
+        if preset is not None:
+            self.params = get_preset(preset)
+            self.preset = preset
+        if overrides:
+            self.params.update(overrides)
+
+    def set_grid_sequence(self, coarse_problems):
+        """
+        Solve steady state problems on coarser meshes first.
+        Each coarse solution is prolonged to the next level as the initial
+        guess, and the finest coarse solution is the initial guess for the
+        problem, so that the final Newton solve starts close to the solution.
+
+        Args:
+            coarse_problems (list<Problem>):
+                The same problem on each coarser level of the MeshHierarchy
+                that the problem's mesh belongs to, coarsest first.
+        """
+        self.coarse_problems = list(coarse_problems)
+
+    def set_pseudo_transient(self, dt, dt_max=None, max_growth=10.0,
+                             tolerance=1e-3, max_steps=200):
+        """
+        Use pseudo transient continuation to approach the solution of steady
+        state problems before the final Newton solve.
+
+        The heat capacity term C*(T - T_)/dt is added to the steady residual
+        and a single Newton step is taken per pseudo time step. The pseudo
+        time step grows by switched evolution/relaxation (dt is scaled by the
+        ratio of the previous and current steady residual norms) until the
+        steady residual has dropped by tolerance, after which the steady
+        problem is solved as usual from the result.
+
+        Args:
+            dt (float):
+                The first pseudo time step.
+            dt_max (float, optional):
+                The largest pseudo time step. Defaults to None (unlimited).
+            max_growth (float, optional):
+                The largest factor to grow the step by at once.
+                Defaults to 10.0.
+            tolerance (float, optional):
+                The reduction in the steady residual norm at which to switch to
+                the steady solve. Defaults to 1e-3.
+            max_steps (int, optional):
+                The largest number of pseudo time steps to take.
+                Defaults to 200.
+        """
+        # pylint: disable=too-many-arguments
+        self.pseudo_transient = {'dt': dt,
+                                 'dt_max': dt_max,
+                                 'max_growth': max_growth,
+                                 'tolerance': tolerance,
+                                 'max_steps': max_steps}
+
+    def set_steady_stop(self, tolerance=1e-6, energy_rate=None):
+        """
+        Stop the time loop early once the solution stops changing.
+        After each step the relative change ||T - T_||/||T|| is compared to
+        tolerance and, if given, the relative rate of change of the total
+        thermal energy (int C*T dx) is compared to energy_rate.
+        The run stops when all criteria are met and the final state is
+        written as usual.
+
+        Args:
+            tolerance (float, optional):
+                The largest relative change in a step. Defaults to 1e-6.
+            energy_rate (float, optional):
+                The largest relative rate of change of the thermal energy
+                (|dE/dt|/|E|, in 1/s). Defaults to None (not checked).
+        """
+        self.steady_stop = {'tolerance': tolerance,
+                            'energy_rate': energy_rate}
+
+    def set_lagging(self, jacobian=1, preconditioner=1, ksp_growth=2.0,
+                    max_rate=0.5):
+        """
+        Reuse the jacobian and/or preconditioner across Newton iterations and
+        time steps.
+        Both are rebuilt at the start of the next step if the number of linear
+        iterations grows or the nonlinear convergence slows.
+
+        Args:
+            jacobian (int, optional):
+                Rebuild the jacobian every this many times it is needed.
+                -1 to only rebuild when the solve degrades. Defaults to 1.
+            preconditioner (int, optional):
+                Rebuild the preconditioner every this many times it is
+                needed. -1 to only rebuild when the solve degrades.
+                Defaults to 1.
+            ksp_growth (float, optional):
+                The factor by which the linear iterations per Newton iteration
+                can grow before rebuilding. Defaults to 2.0.
+            max_rate (float, optional):
+                The largest acceptable ratio between consecutive nonlinear
+                residuals. Defaults to 0.5.
+        """
+        self.lagging = {'jacobian': jacobian,
+                        'preconditioner': preconditioner,
+                        'ksp_growth': ksp_growth,
+                        'max_rate': max_rate}
+        # Create a lagging to validate the options.
+        Lagging(**self.lagging)
+
+    def set_telemetry(self, fmt='jsonl', path=None):
+        """
+        Enable recording solver statistics and timings for each step.
+        See TTiP.core.telemetry.Telemetry for the recorded values.
+
+        Args:
+            fmt (string, optional):
+                The format to write in ('jsonl' or 'csv'). Defaults to 'jsonl'.
+            path (string, optional):
+                The path to write to. Defaults to the result path with
+                '_telemetry.<fmt>' in place of the extension.
+        """
+        self.telemetry = {'fmt': fmt, 'path': path}
+        # Create an empty telemetry to validate the options.
+        Telemetry(fmt=fmt)
+
+    def set_checkpointing(self, every, path=None):
+        """
+        Enable periodic checkpoints in the time loop.
+        Each checkpoint replaces the last, and a final checkpoint is written
+        when the run finishes.
+
+        Args:
+            every (int):
+                Write a checkpoint every this many steps.
+            path (string, optional):
+                The path to write the checkpoint to.
+                Defaults to checkpoint.h5 in the results directory.
+        """
+        self.checkpoint_every = every
+        self.checkpoint_path = path
+
+    def load_checkpoint(self, path):
+        """
+        Load the state from a checkpoint so that the next solve continues
+        from where the checkpointed run stopped.
+        The problem must be defined on the mesh from the checkpoint (see
+        TTiP.core.checkpoint.load_checkpoint_mesh) and have the same
+        timescale as the checkpointed run.
+
+        Args:
+            path (string):
+                The path to the checkpoint.
+
+        Raises:
+            ValueError: If the problem is steady state.
+        """
+        if self.is_steady_state():
+            raise ValueError('Only time dependant problems can be restarted.')
+
+        self._start = load_checkpoint(path, self.problem)
+        LOGGER.info('Loaded checkpoint at t=%g (step %d).',
+                    self._start[0], self._start[1])
+
+    def set_output(self, every=None, interval=None, times=None,
+                   final_only=False, asynchronous=False, buffers=2):
+        """
+        Set how often and how results are written in the time loop.
+        Only one of every, interval, times, and final_only can be given. By
+        default every step is written. The final state is always written.
+
+        When writing at an interval or at given times, steps are shortened so
+        that the outputs land exactly on the requested times.
+
+        Args:
+            every (int, optional):
+                Write every this many steps. Defaults to None.
+            interval (float, optional):
+                Write every time this much simulated time has passed.
+                Defaults to None.
+            times (list<float>, optional):
+                The simulated times to write at. Defaults to None.
+            final_only (bool, optional):
+                Only write the final state. Defaults to False.
+            asynchronous (bool, optional):
+                Write results in a background thread so that the next step
+                can be solved while the last is written. Defaults to False.
+            buffers (int, optional):
+                The number of results that can be waiting to be written before
+                the solve has to wait. Defaults to 2.
+        """
+        # pylint: disable=too-many-arguments
+        self.output = {'every': every,
+                       'interval': interval,
+                       'times': times,
+                       'final_only': final_only,
+                       'asynchronous': asynchronous,
+                       'buffers': buffers}
+        # Create a writer to validate the options.
+        OutputWriter('', self.output)
+
+    def set_retries(self, max_retries=5, regrow_after=5):
+        """
+        Enable retrying steps where the nonlinear solve diverges.
+
+        The state at the start of the step is restored and the step is
+        retried with half the step size, up to max_retries times in a row.
+        Once regrow_after steps in a row have succeeded, dt is doubled back
+        towards the configured value.
+
+        Args:
+            max_retries (int, optional):
+                The number of times to retry a single step. Defaults to 5.
+            regrow_after (int, optional):
+                The number of successful steps before growing dt.
+                Defaults to 5.
+        """
+        self.max_retries = max_retries
+        self.regrow_after = regrow_after
+
+    def set_adaptive(self, tolerance=1e-3, dt_min=None, dt_max=None,
+                     estimator=None, safety=0.9, max_growth=2.0,
+                     min_shrink=0.2):
+        """
+        Enable adaptive time stepping.
+
+        Each step is also solved with a second iteration method and the
+        difference is used as an estimate of the local error.
+        Steps with too large an error are rejected and retried, and dt is
+        grown or shrunk towards the largest step that meets the tolerance.
+        The problem's dt is used as the initial step and the final step is
+        shortened to stop exactly at max_t.
+
+        Args:
+            tolerance (float, optional):
+                The target relative local error for a step. Defaults to 1e-3.
+            dt_min (float, optional):
+                The smallest step to take. Steps of this size are accepted
+                regardless of the error. Defaults to None (no minimum).
+            dt_max (float, optional):
+                The largest step to take. Defaults to None (max_t).
+            estimator (str, optional):
+                The iteration method to compare against.
+                Defaults to BackwardEuler, or CrankNicolson if the problem is
+                already using BackwardEuler.
+            safety (float, optional):
+                Factor applied to the optimal step to reduce rejections.
+                Defaults to 0.9.
+            max_growth (float, optional):
+                The largest factor to grow dt by in one step. Defaults to 2.0.
+            min_shrink (float, optional):
+                The smallest factor to shrink dt by in one step.
+                Defaults to 0.2.
+        """
+        # pylint: disable=too-many-arguments
+        self.adaptive = {'tolerance': tolerance,
+                         'dt_min': dt_min,
+                         'dt_max': dt_max,
+                         'estimator': estimator,
+                         'safety': safety,
+                         'max_growth': max_growth,
+                         'min_shrink': min_shrink}
 
     def solve(self, file_path='ttip_result/solution.pvd'):
         """
@@ -69,41 +386,480 @@ class Solver:
                 It is recommended that this is a separate drectory per run.
                 Defaults to 'TTiP_result/solution.pvd'.
         """
+        self.problem.prune()
         F = self.problem.a - self.problem.L
+        F = self.problem.allocate_placeholders(F)
         steady_state = self.is_steady_state()
 
-        if isinstance(self.problem, BoundaryMixin):
-            var_prob = NonlinearVariationalProblem(
-                F, self.u, bcs=self.problem.bcs)
+        lagging = Lagging(**self.lagging)
+        solver = self._create_solver(F, self.u,
+                                     extra_params=lagging.solver_parameters())
+        lagging.attach(solver)
+
+        writer = OutputWriter(file_path, self.output)
+        if self._start is None:
+            writer.open()
+            writer.write_initial(self.u)
         else:
-            var_prob = NonlinearVariationalProblem(
-                F, self.u)
-        solver = NonlinearVariationalSolver(problem=var_prob,
-                                            solver_parameters=self.params)
-
-        outfile = File(file_path)
-        outfile.write(self.u, target_degree=1, target_continuity=H1)
-
-        if steady_state:
-            solver.solve()
-            outfile.write(self.u,
-                          target_degree=1,
-                          target_continuity=H1)
+            writer.open(append=True, steps=self._start[1])
+
+        if self.checkpoint_every is not None and self.checkpoint_path is None:
+            self.checkpoint_path = os.path.join(os.path.dirname(file_path),
+                                                'checkpoint.h5')
+
+        telemetry = self._create_telemetry(file_path)
+        telemetry.attach(solver)
+
+        solved = False
+        try:
+            if steady_state:
+                if self.coarse_problems:
+                    self._solve_grid_sequence()
+                if self.pseudo_transient is not None:
+                    self._solve_pseudo_transient(F, telemetry)
+                telemetry.start_step(solver)
+                solver.solve()
+                solve_time = telemetry.solve_done()
+                telemetry.time_write(writer.step_done, self.u)
+                telemetry.time_write(writer.write_final, self.u)
+                telemetry.record(solver, solve_time, step=1, t=None, dt=None,
+                                 status='accepted')
+            else:
+                self._solve_time_dependant(solver, writer, telemetry,
+                                           lagging)
+            solved = True
+        finally:
+            telemetry.close()
+            # Don't hide an error from the solve with one from the writer.
+            writer.close(raise_error=solved)
+
+    def _solve_grid_sequence(self):
+        """
+        Solve the coarse problems in turn and prolong the result to be the
+        initial guess for the problem (see set_grid_sequence).
+        If a coarse solve fails the sequence is abandoned and the problem
+        starts from its own initial value.
+        """
+        previous = None
+        for level, problem in enumerate(self.coarse_problems):
+            if previous is not None:
+                prolong(previous.T, problem.T)
+
+            params = get_preset(select_preset(problem.V))
+            problem.prune()
+            solver = self._create_solver(problem.a - problem.L, problem.T,
+                                         problem=problem, params=params)
+            try:
+                solver.solve()
+            except ConvergenceError:
+                LOGGER.warning('Grid sequencing failed on level %d, starting '
+                               'from the initial value.', level)
+                return
+            LOGGER.debug('Grid sequencing level %d: %d Newton iterations.',
+                         level, solver.snes.getIterationNumber())
+            previous = problem
+
+        prolong(previous.T, self.u)
+
+    def _solve_pseudo_transient(self, F, telemetry):
+        """
+        Take pseudo time steps towards the steady state solution of F == 0
+        (see set_pseudo_transient).
+
+        Args:
+            F (Form):
+                The steady state residual.
+            telemetry (Telemetry):
+                The telemetry to record each pseudo time step in.
+        """
+        # pylint: disable=too-many-locals
+        settings = self.pseudo_transient
+        dt = settings['dt']
+
+        # Cap the quadrature once so that the residual norms use the same
+        # (cheap) kernels as the steps.
+        F = self.problem.limit_quadrature(F)
+        dt_max = settings['dt_max'] or float('inf')
+
+        u_prev = Function(self.problem.V, name='T_pseudo')
+        dt_inv = Constant(1 / dt)
+        C = getattr(self.problem, 'C', 1)
+        F_ptc = F + C * (self.u - u_prev) * dt_inv * self.problem.v * dx
+        ptc_solver = self._create_solver(F_ptc, self.u,
+                                         extra_params={'snes_type': 'ksponly'})
+        telemetry.attach(ptc_solver)
+
+        for bc in getattr(self.problem, 'bcs', []):
+            bc.apply(self.u)
+        initial = self._residual_norm(F)
+        residual = initial
+        num_steps = 0
+        while (num_steps < settings['max_steps']
+               and residual > settings['tolerance'] * initial):
+            num_steps += 1
+
+            u_prev.assign(self.u)
+            dt_inv.assign(1 / dt)
+            telemetry.start_step(ptc_solver)
+            ptc_solver.solve()
+            telemetry.record(ptc_solver, telemetry.solve_done(),
+                             step=num_steps, t=None, dt=dt, status='pseudo')
+
+            new_residual = self._residual_norm(F)
+            if new_residual > residual:
+                # Reject the step and back off.
+                self.u.assign(u_prev)
+                dt /= 2
+                continue
+
+            growth = min(residual / max(new_residual, 1e-300),
+                         settings['max_growth'])
+            dt = min(dt * growth, dt_max)
+            residual = new_residual
+
+        LOGGER.info('Pseudo transient continuation reduced the residual by '
+                    '%.2g in %d steps.', residual / max(initial, 1e-300),
+                    num_steps)
+
+    def _residual_norm(self, F):
+        """
+        Calculate the l2 norm of the residual, ignoring dirichlet DOFs.
+
+        Args:
+            F (Form): The residual to evaluate.
+
+        Returns:
+            float: The norm.
+        """
+        residual = assemble(F)
+        for bc in getattr(self.problem, 'bcs', []):
+            bc.zero(residual)
+        with residual.dat.vec_ro as vec:
+            return vec.norm()
+
+    def _create_telemetry(self, file_path):
+        """
+        Create the telemetry for a solve.
+
+        Args:
+            file_path (string): The path that results are saved to.
+
+        Returns:
+            Telemetry: The telemetry. This does nothing if disabled.
+        """
+        if self.telemetry is None:
+            return Telemetry()
+
+        fmt = self.telemetry['fmt']
+        path = self.telemetry['path']
+        if path is None:
+            path = '{}_telemetry.{}'.format(os.path.splitext(file_path)[0],
+                                            fmt)
+        return Telemetry(path, fmt=fmt, comm=self.problem.mesh.comm)
+
+    def _solve_time_dependant(self, solver, writer, telemetry, lagging):
+        """
+        Run the time loop.
+
+        Steps use the problem's dt unless adaptive stepping is enabled (see
+        set_adaptive).
+        If retries are enabled (see set_retries), a step where the nonlinear
+        solve diverges is restored and retried with half the step size.
+
+        Args:
+            solver (NonlinearVariationalSolver):
+                The solver for the main iteration method.
+            writer (OutputWriter):
+                The writer to pass each accepted step to.
+            telemetry (Telemetry):
+                The telemetry to record each attempted step in.
+            lagging (Lagging):
+                The lagging to check after each solve.
+        """
+        # pylint: disable=too-many-branches, too-many-locals
+        # pylint: disable=too-many-statements
+        problem = self.problem
+
+        if self.adaptive is None:
+            t_end = problem.dt * problem.steps
+            dt = problem.dt
+            estimator = None
         else:
-            self.problem.T_.assign(self.u)
-            last_perc = 0
-            for i in range(self.problem.steps):
+            t_end = problem.max_t
+            dt = min(problem.dt, self.adaptive['dt_max'] or t_end)
+            estimator = self._create_estimator()
+            telemetry.attach(estimator[1])
+
+        dt_target = dt
+        end_tol = 1e-6 * dt
+        t = 0
+        num_steps = 0
+        if self._start is not None:
+            t, num_steps, dt = self._start
+            self._start = None
+        last_perc = 0
+        num_retries = 0
+        num_rejected = 0
+        num_successes = 0
+        energy = None
+        if self.steady_stop is not None:
+            energy = self._thermal_energy()
+
+        problem.T_.assign(self.u)
+        while t_end - t > end_tol:
+            step = min(dt, t_end - t)
+            next_output = writer.next_output_time(t)
+            if next_output is not None:
+                step = min(step, next_output - t)
+            problem.set_dt(step)
+            # Time dependant functions take their value at the end of the step.
+            problem.update_time(t + step)
+
+            telemetry.start_step(solver)
+            try:
                 solver.solve()
+                lagging.step_done(solver)
+                if estimator is None:
+                    accepted = True
+                else:
+                    accepted, dt_new = self._adapt_step(step, *estimator)
+                    # Don't let a step that was shortened to hit an output
+                    # time shrink the following steps.
+                    shortened = accepted and step < dt
+                    dt = max(dt_new, dt) if shortened else dt_new
+            except ConvergenceError:
+                telemetry.record(solver, telemetry.solve_done(),
+                                 step=num_steps + 1, t=t + step, dt=step,
+                                 status='diverged')
+                self.u.assign(problem.T_)
+                lagging.refresh(solver)
+                if num_retries >= self.max_retries:
+                    raise
+                num_retries += 1
+                num_successes = 0
+                dt = step / 2
+                LOGGER.warning('Nonlinear solve diverged at t=%g, retrying '
+                               'with dt=%g (%d/%d).', t, dt, num_retries,
+                               self.max_retries)
+                continue
+
+            solve_time = telemetry.solve_done()
+            if not accepted:
+                telemetry.record(solver, solve_time, step=num_steps + 1,
+                                 t=t + step, dt=step, status='rejected')
+                self.u.assign(problem.T_)
+                num_rejected += 1
+                continue
+
+            t += step
+            num_steps += 1
+            num_retries = 0
+            num_successes += 1
+            steady = False
+            if self.steady_stop is not None:
+                steady, energy = self._check_steady(step, energy)
+            problem.T_.assign(self.u)
+            telemetry.time_write(writer.step_done, self.u, t)
+
+            if (self.checkpoint_every is not None
+                    and num_steps % self.checkpoint_every == 0):
+                telemetry.time_write(save_checkpoint, self.checkpoint_path,
+                                     problem, t, num_steps, dt)
+            telemetry.record(solver, solve_time, step=num_steps, t=t,
+                             dt=step, status='accepted')
+
+            last_perc = self._report_progress(t / t_end, last_perc)
+
+            if steady:
+                LOGGER.info('Reached steady state at t=%g after %d steps, '
+                            'stopping early.', t, num_steps)
+                break
+
+            if (estimator is None
+                    and dt < dt_target
+                    and num_successes >= self.regrow_after):
+                dt = min(2 * dt, dt_target)
+                num_successes = 0
+                LOGGER.debug('Growing dt back to %g.', dt)
+
+        writer.write_final(self.u, t)
 
-                perc = int(100 * (i + 1) / self.problem.steps)
-                if perc > last_perc:
-                    print(f'{perc}%')
-                    last_perc = perc
+        # Leave the problem with the step size the next step would use.
+        problem.set_dt(dt)
 
-                self.problem.T_.assign(self.u)
-                outfile.write(self.u,
-                              target_degree=1,
-                              target_continuity=H1)
+        if (self.checkpoint_every is not None
+                and num_steps % self.checkpoint_every != 0):
+            save_checkpoint(self.checkpoint_path, problem, t, num_steps, dt)
+
+        if estimator is not None:
+            LOGGER.info('Adaptive stepping finished at t=%g (%d rejected '
+                        'steps).', t, num_rejected)
+
+    def _check_steady(self, step, energy):
+        """
+        Check whether the step that has just been accepted meets the steady
+        state criteria (see set_steady_stop).
+
+        Args:
+            step (float): The size of the step.
+            energy (float): The thermal energy before the step.
+
+        Returns:
+            (bool, float):
+                Whether the steady state has been reached, and the thermal
+                energy after the step.
+        """
+        criteria = self.steady_stop
+        change = self._relative_difference(self.u, self.problem.T_)
+        steady = change <= criteria['tolerance']
+
+        new_energy = energy
+        if criteria['energy_rate'] is not None:
+            new_energy = self._thermal_energy()
+            rate = abs(new_energy - energy) / (step * max(abs(new_energy),
+                                                          1e-300))
+            steady = steady and rate <= criteria['energy_rate']
+        return steady, new_energy
+
+    def _thermal_energy(self):
+        """
+        Calculate the total thermal energy, int C*T dx.
+
+        Returns:
+            float: The thermal energy.
+        """
+        energy = self.problem.allocate_placeholders(
+            self.problem.C * self.u * dx)
+        return assemble(self.problem.limit_quadrature(energy))
+
+    def _create_estimator(self):
+        """
+        Create the solver for the error estimate used in adaptive stepping.
+
+        Returns:
+            (Function, NonlinearVariationalSolver):
+                The function holding the estimate and the solver for it.
+        """
+        estimator = self.adaptive['estimator']
+        if estimator is None:
+            estimator = ('CrankNicolson'
+                         if self.problem.method == 'BackwardEuler'
+                         else 'BackwardEuler')
+
+        # The estimate is solved into its own function so that self.u holds
+        # the result of the main method.
+        estimate = Function(self.problem.V, name='T_estimate')
+        F_est = self.problem.allocate_placeholders(
+            self.problem.method_residual(estimator))
+        F_est = replace(F_est, {self.u: estimate})
+        return estimate, self._create_solver(F_est, estimate)
+
+    def _adapt_step(self, step, estimate, est_solver):
+        """
+        Estimate the error in the step that has just been solved and choose
+        the next step size.
+
+        Args:
+            step (float):
+                The size of the step that was solved.
+            estimate (Function):
+                The function to hold the estimate.
+            est_solver (NonlinearVariationalSolver):
+                The solver for the estimate.
+
+        Returns:
+            (bool, float): Whether to accept the step, and the next dt.
+        """
+        settings = self.adaptive
+        tol = settings['tolerance']
+        dt_min = settings['dt_min'] or 0
+        dt_max = settings['dt_max'] or self.problem.max_t
+
+        estimate.assign(self.u)
+        est_solver.solve()
+        error = self._relative_difference(self.u, estimate)
+
+        accepted = error <= tol or step <= dt_min
+        if accepted and error > tol:
+            LOGGER.warning('Accepting step at dt_min (%g) with error %g.',
+                           step, error)
+        LOGGER.debug('%s step: dt=%g, error=%g',
+                     'Accepted' if accepted else 'Rejected', step, error)
+
+        # The estimate is first order so the error scales with dt^2.
+        factor = settings['safety'] * sqrt(tol / max(error, 1e-16))
+        factor = min(max(factor, settings['min_shrink']),
+                     settings['max_growth'])
+        return accepted, min(max(step * factor, dt_min), dt_max)
+
+    def _create_solver(self, F, u, extra_params=None, problem=None,
+                       params=None):
+        """
+        Create a nonlinear solver for the residual F, including any boundary
+        conditions on the problem.
+        The quadrature degree of F is limited by the problem.
+
+        Args:
+            F (Form): The residual to solve F == 0 for.
+            u (Function): The function to solve for.
+            extra_params (dict, optional):
+                Parameters to add to the solver parameters. Defaults to None.
+            problem (Problem, optional):
+                The problem to take boundary conditions from.
+                Defaults to the problem being solved.
+            params (dict, optional):
+                The solver parameters. Defaults to self.params.
+
+        Returns:
+            NonlinearVariationalSolver: The solver.
+        """
+        # pylint: disable=too-many-arguments
+        if problem is None:
+            problem = self.problem
+        F = problem.limit_quadrature(problem.allocate_placeholders(F))
+        if isinstance(problem, BoundaryMixin):
+            var_prob = NonlinearVariationalProblem(
+                F, u, bcs=problem.bcs)
+        else:
+            var_prob = NonlinearVariationalProblem(
+                F, u)
+        params = dict(params or self.params, **(extra_params or {}))
+        return NonlinearVariationalSolver(problem=var_prob,
+                                          solver_parameters=params)
+
+    def _relative_difference(self, u, v):
+        """
+        Calculate the L2 norm of u - v relative to the L2 norm of u.
+
+        Args:
+            u (Function): The reference function.
+            v (Function): The function to compare against.
+
+        Returns:
+            float: The relative difference.
+        """
+        limit = self.problem.limit_quadrature
+        diff = assemble(limit(inner(u - v, u - v) * dx))
+        scale = assemble(limit(inner(u, u) * dx))
+        return sqrt(diff / max(scale, 1e-300))
+
+    @staticmethod
+    def _report_progress(fraction, last_perc):
+        """
+        Print the percentage complete if it has increased.
+
+        Args:
+            fraction (float): The fraction of the run that is complete.
+            last_perc (int): The last percentage that was printed.
+
+        Returns:
+            int: The last percentage that has been printed.
+        """
+        perc = int(100 * fraction)
+        if perc > last_perc:
+            print(f'{perc}%')
+            return perc
+        return last_perc
 
     def is_steady_state(self):
         """
@@ -0,0 +1,155 @@
+"""
+This file holds named sets of PETSc parameters for the solver.
+
+Available presets are:
+    - direct-mumps: A direct LU solve with MUMPS. Fastest for small problems.
+    - amg-assembled: GMRES with BoomerAMG on an assembled jacobian.
+    - amg-matfree: GMRES with a matrix free jacobian and BoomerAMG on an
+      assembled copy. This is the default.
+    - amg-p1: GMRES with a matrix free jacobian, preconditioned by BoomerAMG
+      on a P1 discretisation of the jacobian (for higher order elements).
+    - gmg: GMRES with geometric multigrid and assembled smoothers. The mesh
+      must be the finest level of a MeshHierarchy.
+    - gmg-matfree: GMRES with a matrix free jacobian and P-multigrid down to
+      linear elements, then geometric multigrid. The mesh must be the finest
+      level of a MeshHierarchy.
+    - auto: Choose one of the above from the size of the problem.
+"""
+from firedrake.mg.utils import get_level
+
+# The settings for the nonlinear solve that are shared by all presets.
+_NONLINEAR = {
+    'snes_type': 'newtonls',
+    'snes_linesearch_type': 'l2',
+    'snes_linesearch_maxstep': 1.0,
+    # 'snes_monitor': None,
+    # 'snes_view': None,
+    # 'ksp_monitor_true_residual': None,
+    # 'snes_converged_reason': None,
+    # 'ksp_converged_reason': None,
+    # 'snes_atol': 1e-6,
+    # 'snes_rtol': 0,
+    # 'snes_stol': 1e-16,
+    'snes_max_L_solve_fail': 10,
+    'snes_max_it': 1000}
+
+PRESETS = {
+    'direct-mumps': {
+        'mat_type': 'aij',
+        'ksp_type': 'preonly',
+        'pc_type': 'lu',
+        'pc_factor_mat_solver_type': 'mumps'},
+    'amg-assembled': {
+        'mat_type': 'aij',
+        'ksp_type': 'gmres',
+        'pc_type': 'hypre',
+        'pc_hypre_type': 'boomeramg'},
+    'amg-matfree': {
+        'mat_type': 'matfree',
+        'ksp_type': 'gmres',
+        'pc_type': 'python',
+        'pc_python_type': 'firedrake.AssembledPC',
+        'assembled_pc_type': 'hypre',
+        'assembled_pc_factor_mat_solver_type': 'mumps',
+        'assembled_pc_hypre_type': 'boomeramg',
+        'assembled_pc_hypre_boomeramg_max_iter': 10,
+        'assembled_pc_hypre_boomeramg_tol': 1e-9},
+    'amg-p1': {
+        'mat_type': 'matfree',
+        'ksp_type': 'gmres',
+        'pc_type': 'python',
+        'pc_python_type': 'firedrake.P1PC',
+        'pmg_mg_levels_ksp_type': 'chebyshev',
+        'pmg_mg_levels_ksp_max_it': 2,
+        'pmg_mg_levels_pc_type': 'jacobi',
+        'pmg_mg_coarse_mat_type': 'aij',
+        'pmg_mg_coarse_ksp_type': 'preonly',
+        'pmg_mg_coarse_pc_type': 'hypre',
+        'pmg_mg_coarse_pc_hypre_type': 'boomeramg'},
+    'gmg': {
+        'mat_type': 'aij',
+        'ksp_type': 'gmres',
+        'pc_type': 'mg',
+        'pc_mg_type': 'multiplicative',
+        'mg_levels_ksp_type': 'chebyshev',
+        'mg_levels_ksp_max_it': 2,
+        'mg_levels_pc_type': 'jacobi',
+        'mg_coarse_ksp_type': 'preonly',
+        'mg_coarse_pc_type': 'lu',
+        'mg_coarse_pc_factor_mat_solver_type': 'mumps'},
+    'gmg-matfree': {
+        'mat_type': 'matfree',
+        'ksp_type': 'gmres',
+        'pc_type': 'python',
+        'pc_python_type': 'firedrake.PMGPC',
+        'pmg_mg_levels_ksp_type': 'chebyshev',
+        'pmg_mg_levels_ksp_max_it': 2,
+        'pmg_mg_levels_pc_type': 'jacobi',
+        'pmg_mg_coarse_mat_type': 'aij',
+        'pmg_mg_coarse_ksp_type': 'preonly',
+        'pmg_mg_coarse_pc_type': 'mg',
+        'pmg_mg_coarse_mg_levels_ksp_type': 'chebyshev',
+        'pmg_mg_coarse_mg_levels_ksp_max_it': 2,
+        'pmg_mg_coarse_mg_levels_pc_type': 'jacobi',
+        'pmg_mg_coarse_mg_coarse_ksp_type': 'preonly',
+        'pmg_mg_coarse_mg_coarse_pc_type': 'lu',
+        'pmg_mg_coarse_mg_coarse_pc_factor_mat_solver_type': 'mumps'}}
+
+DEFAULT_PRESET = 'amg-matfree'
+
+# The largest number of DOFs to use a direct solve for, by mesh dimension.
+# Fill in grows much faster in 3D so the limit is lower.
+DIRECT_MAX_DOFS = {1: 1000000, 2: 200000, 3: 50000}
+
+
+def select_preset(V):
+    """
+    Choose a preset for a function space.
+
+    Small problems use a direct solve. Larger problems use geometric
+    multigrid if a mesh hierarchy is available, otherwise AMG. Linear elements
+    use an assembled jacobian. Higher orders use a matrix free jacobian (where
+    the matrix free action is cheaper than an assembled matrix) with AMG on a
+    P1 discretisation, which is much sparser than the high order operator.
+
+    Args:
+        V (firedrake.FunctionSpace): The function space of the solution.
+
+    Returns:
+        string: The name of the preset.
+    """
+    mesh = V.mesh()
+    dim = mesh.topological_dimension()
+    if V.dim() <= DIRECT_MAX_DOFS.get(dim, DIRECT_MAX_DOFS[3]):
+        return 'direct-mumps'
+
+    linear = V.ufl_element().degree() == 1
+
+    _, level = get_level(mesh)
+    if level is not None and level > 0:
+        return 'gmg' if linear else 'gmg-matfree'
+
+    return 'amg-assembled' if linear else 'amg-p1'
+
+
+def get_preset(name):
+    """
+    Get the solver parameters for a preset.
+    Use select_preset to choose the name for the auto preset.
+
+    Args:
+        name (string): The name of the preset.
+
+    Raises:
+        ValueError: If the preset is not recognised.
+
+    Returns:
+        dict: A new dictionary of solver parameters.
+    """
+    if name not in PRESETS:
+        raise ValueError('Unknown solver preset: {}. Available presets are: '
+                         '{}, auto.'.format(name, ', '.join(PRESETS)))
+
+    params = dict(_NONLINEAR)
+    params.update(PRESETS[name])
+    return params
@@ -0,0 +1,233 @@
+"""
+This file holds the Telemetry class which records statistics for each step of
+a solve.
+"""
+import csv
+import json
+import os
+from time import perf_counter
+
+
+class Telemetry:
+    """
+    A class to record solver statistics for each step to a file.
+
+    Each row holds:
+        - step: The number of the step.
+        - time: The simulated time at the end of the step.
+        - dt: The step size.
+        - status: accepted, rejected (adaptive stepping), or diverged.
+        - snes_its: The number of nonlinear iterations.
+        - snes_reason: The SNES converged reason.
+        - ksp_its: The total number of linear iterations.
+        - initial_residual: The nonlinear residual norm before the step.
+        - final_residual: The nonlinear residual norm after the step.
+        - assemble_time: Wall time spent in the residual and jacobian
+          callbacks.
+        - solve_time: Wall time spent in the solve, excluding assembly.
+        - write_time: Wall time spent writing results and checkpoints.
+
+    A Telemetry without a file path does nothing, so it can always be used.
+
+    Attributes:
+        file_path (string):
+            The path to write to. None if disabled.
+        fmt (string):
+            The format to write in ('jsonl' or 'csv').
+        _file (file):
+            The open file. None on ranks other than 0.
+        _writer (csv.DictWriter):
+            The csv writer if using csv.
+        _assemble_time (float):
+            The assembly time since the step started.
+        _start (float):
+            The wall time at the start of the step.
+        _write_time (float):
+            The write time since the step started.
+    """
+
+    fields = ['step', 'time', 'dt', 'status', 'snes_its', 'snes_reason',
+              'ksp_its', 'initial_residual', 'final_residual',
+              'assemble_time', 'solve_time', 'write_time']
+
+    def __init__(self, file_path=None, fmt='jsonl', comm=None):
+        """
+        Initialiser for Telemetry.
+
+        Args:
+            file_path (string, optional):
+                The path to write to. Defaults to None (disabled).
+            fmt (string, optional):
+                The format to write in ('jsonl' or 'csv').
+                Defaults to 'jsonl'.
+            comm (MPI communicator, optional):
+                Only rank 0 of this communicator writes. Defaults to None.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if fmt not in ('jsonl', 'csv'):
+            raise ValueError('Unknown telemetry format: {}. Supported formats'
+                             ' are: jsonl, csv.'.format(fmt))
+
+        self.file_path = file_path
+        self.fmt = fmt
+
+        self._file = None
+        self._writer = None
+        self._assemble_time = 0.0
+        self._start = 0.0
+        self._write_time = 0.0
+
+        if file_path is not None and (comm is None or comm.rank == 0):
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(file_path, 'w', newline='', encoding='utf-8')
+            if fmt == 'csv':
+                self._writer = csv.DictWriter(self._file,
+                                              fieldnames=self.fields)
+                self._writer.writeheader()
+
+    @property
+    def enabled(self):
+        """
+        Whether telemetry is being recorded.
+
+        Returns:
+            bool: True if recording.
+        """
+        return self.file_path is not None
+
+    def attach(self, solver):
+        """
+        Prepare a NonlinearVariationalSolver so that its statistics and
+        assembly times can be recorded.
+
+        Args:
+            solver (NonlinearVariationalSolver): The solver to attach to.
+        """
+        if not self.enabled:
+            return
+
+        # Firedrake registers the callbacks from the solver context with the
+        # SNES before each solve, so the context's callbacks are wrapped.
+        ctx = solver._ctx  # pylint: disable=protected-access
+        ctx.form_function = self._timed(ctx.form_function)
+        ctx.form_jacobian = self._timed(ctx.form_jacobian)
+        ctx.set_function(solver.snes)
+        ctx.set_jacobian(solver.snes)
+
+    def start_step(self, solver):
+        """
+        Reset the timers for a new step.
+
+        Args:
+            solver (NonlinearVariationalSolver): The main solver.
+        """
+        if not self.enabled:
+            return
+
+        solver.snes.setConvergenceHistory(reset=True)
+        self._assemble_time = 0.0
+        self._write_time = 0.0
+        self._start = perf_counter()
+
+    def solve_done(self):
+        """
+        Mark the end of the solving part of a step.
+
+        Returns:
+            float: The wall time for the solve.
+        """
+        if not self.enabled:
+            return 0.0
+        return perf_counter() - self._start
+
+    def time_write(self, func, *args, **kwargs):
+        """
+        Call a function and add the time taken to the write time.
+
+        Args:
+            func (callable): The function to call.
+
+        Returns:
+            The result of func.
+        """
+        start = perf_counter()
+        result = func(*args, **kwargs)
+        self._write_time += perf_counter() - start
+        return result
+
+    def record(self, solver, solve_time, step, t, dt, status):
+        """
+        Record a row for the step.
+
+        Args:
+            solver (NonlinearVariationalSolver):
+                The main solver.
+            solve_time (float):
+                The wall time from solve_done.
+            step (int):
+                The number of the step.
+            t (float):
+                The simulated time at the end of the step.
+            dt (float):
+                The step size.
+            status (string):
+                The status of the step.
+        """
+        # pylint: disable=too-many-arguments
+        if not self.enabled:
+            return
+
+        snes = solver.snes
+        norms, _ = snes.getConvergenceHistory()
+        row = {'step': step,
+               'time': t,
+               'dt': dt,
+               'status': status,
+               'snes_its': snes.getIterationNumber(),
+               'snes_reason': snes.getConvergedReason(),
+               'ksp_its': snes.getLinearSolveIterations(),
+               'initial_residual': float(norms[0]) if len(norms) else None,
+               'final_residual': float(norms[-1]) if len(norms) else None,
+               'assemble_time': self._assemble_time,
+               'solve_time': solve_time - self._assemble_time,
+               'write_time': self._write_time}
+
+        if self._file is None:
+            return
+
+        if self._writer is not None:
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + '\n')
+        self._file.flush()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _timed(self, func):
+        """
+        Wrap a callback so that the time spent in it is added to the assembly
+        time.
+
+        Args:
+            func (callable): The callback to wrap.
+
+        Returns:
+            callable: The wrapped callback.
+        """
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            self._assemble_time += perf_counter() - start
+            return result
+
+        return timed
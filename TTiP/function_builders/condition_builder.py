@@ -97,4 +97,5 @@ class ConditionBuilder(FunctionBuilder):
             raise AttributeError('Unknown condition: {}'.format(op))
 
         val = conditional(self._dispatch_table[op](lhs, rhs), 1, 0)
-        return Function(self.V).interpolate(val)
+        f = Function(self.function_space()).interpolate(val)
+        return self.finalise(f)
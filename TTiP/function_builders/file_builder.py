@@ -2,11 +2,41 @@ r"""
 The File function creates an function interpolated from data in a file.
 
 Args:
-  - path (str): The path to the file to interpolate.
+  - path (str): The path to the file to interpolate. For a time series this is
+    a pattern that is formatted with the index of each frame, e.g.
+    laser_{:03d}.npy for laser_000.npy, laser_001.npy, ...
+  - times (comma seperated list, optional): The simulated time of each frame
+    in a time series.
+  - cache_dir (str, optional): A directory to store interpolation weights in
+    so that they can be reused by later runs.
+  - dataset (str, optional): The name of the array to read from a .npz or
+    HDF5 file.
+  - grid (str, optional): Whether the data is on a structured grid. Options
+    are: auto (the default, detect it from the coordinates), structured, and
+    scattered.
+  - extrapolation (str, optional): How to fill points outside of the data.
+    Options are: nearest (the default), constant, and linear.
+  - fill_value (float, optional): **constant extrapolation only** The value
+    outside of the data. Defaults to 0.
+  - halo (float, optional): **parallel runs only** How far past the points
+    owned by a process to send it data. Defaults to 4 times the average data
+    spacing.
 
-The file must be a csv (optionally with a commented header row),
-where the first n columns represent the coords and the final column
-is the value at the coordinate.
+The format is chosen from the file extension:
+
+  - .npy: A single 2D array, memory-mapped.
+  - .npz: Uncompressed arrays are memory-mapped.
+  - .h5 or .hdf5: An HDF5 file (this requires h5py).
+  - Anything else: A csv.
+
+The csv and single array formats hold one row per data point, where the first
+n columns represent the coords and the final column is the value at the
+coordinate. A .npz or HDF5 file can instead hold the coords and values as
+separate arrays named "coords" and "values". Otherwise the array named by
+dataset is used, which can be left out if the file only holds one array.
+
+Only the columns that are needed are read from binary files, so large data
+files are not copied or parsed into memory as text.
 
 e.g. For a 2D problem::
 
@@ -17,17 +47,107 @@ e.g. For a 2D problem::
     0.3, 0.0, 7.0
     ...
 
-Cubic interpolation is used for 1-D or 2-D problems, while
-linear interpolation is used for higher dimensional problems.
+If every combination of the unique coordinates in each direction is a data
+point (in any order), the data is on a structured grid. This is interpolated
+directly on the grid, which is much faster than triangulating the data and
+uses cubic interpolation in any dimension (linear if any direction has fewer
+than 4 points).
+
+Otherwise the data is triangulated. Cubic interpolation is used for 1-D or
+2-D problems, while linear interpolation is used for higher dimensional
+problems.
+
+Points outside of the data are filled according to extrapolation:
+
+  - nearest: The value of the nearest data point. For a structured grid this
+    is the value at the nearest point on the boundary of the grid.
+  - constant: The fill_value.
+  - linear: A least squares linear fit to the nearest data points.
+
+If times are given the function is interpolated linearly in time between the
+two frames either side of the simulated time at each step (and takes the first
+or last frame outside of the times). The function is updated in place, so the
+equations do not need rebuilding. Only those two frames are kept in memory,
+and the frame after them is read in a background thread during the solve.
+Frames with the same coordinates share the same interpolation weights.
+
+In parallel the file is only read by the first process. Each process is sent
+the data inside the bounding box of the points it owns (plus the halo), and
+interpolates only its own points, so the memory and time per process fall as
+more processes are used. The halo is grown for any process that would receive
+too few data points to interpolate. Frames of a time series are not read in
+the background in parallel.
+
+The triangulation of the data and the interpolation weights for the mesh are
+cached in memory, keyed by the contents of the file and the coordinates they
+are interpolated to. Loading the same file onto the same mesh again (e.g. in
+the PARAMETERS and SOURCES sections) then only costs a sparse matrix-vector
+product. If cache_dir is given the linear interpolation weights are also
+stored on disk.
 """
+import hashlib
 import os
+import struct
+import zipfile
+from threading import Thread
 
 import numpy as np
 from firedrake import Function, VectorFunctionSpace, interpolate
 from numpy import loadtxt
-from scipy.interpolate import griddata
+from numpy.lib import format as npy_format
+from scipy.sparse import load_npz, save_npz
+# pylint: disable=no-name-in-module
+from scipy.spatial import Delaunay, cKDTree
 
 from TTiP.function_builders.function_builder import FunctionBuilder
+from TTiP.function_builders.interpolation import (cubic_interpolation,
+                                                  find_grid, gap_weights,
+                                                  grid_interpolation,
+                                                  griddata_interpolation,
+                                                  linear_weights)
+
+# The options for the grid property.
+GRID_OPTIONS = ('auto', 'structured', 'scattered')
+# The options for the extrapolation property.
+EXTRAPOLATION_OPTIONS = ('nearest', 'constant', 'linear')
+
+# Triangulations of the data, keyed by the file hash.
+_TRIANGULATIONS = {}
+# The structured grids that the data is on (or None), keyed by the file hash.
+_GRIDS = {}
+# KD-trees of the data points, keyed by the file hash.
+_TREES = {}
+# Interpolations from the data to a set of points, keyed by the file hash,
+# the points, and the method (with the extrapolation for gap filling).
+_INTERPOLATIONS = {}
+# The size of the blocks to read when hashing a file.
+_HASH_BLOCK_SIZE = 2**20
+
+
+def clear_cache():
+    """
+    Clear the in memory cache of triangulations and interpolation weights.
+    """
+    _TRIANGULATIONS.clear()
+    _GRIDS.clear()
+    _TREES.clear()
+    _INTERPOLATIONS.clear()
+
+
+def _evict_cache(key):
+    """
+    Remove everything cached for a file (or for a set of coordinates) from
+    the in memory cache.
+
+    Args:
+        key (str): The hash the file or coordinates are cached under.
+    """
+    for cache in (_TRIANGULATIONS, _GRIDS, _TREES):
+        cache.pop(key, None)
+    # The background thread may be adding interpolations.
+    for interpolation_key in list(_INTERPOLATIONS):
+        if interpolation_key.startswith(key + '-'):
+            _INTERPOLATIONS.pop(interpolation_key, None)
 
 
 class FileBuilder(FunctionBuilder):
@@ -37,17 +157,45 @@ class FileBuilder(FunctionBuilder):
 
     Required Properties:
         path (str):
-            This is the file that will be used.
+            This is the file that will be used, or the pattern for the files
+            in a time series.
+
+    Optional Properties:
+        cache_dir (str):
+            A directory to store interpolation weights in.
+        dataset (str):
+            The name of the array to read from a .npz or HDF5 file.
+        grid (str):
+            Whether the data is on a structured grid (see GRID_OPTIONS).
+        extrapolation (str):
+            How to fill points outside of the data (see
+            EXTRAPOLATION_OPTIONS).
+        fill_value (float):
+            The value outside of the data for constant extrapolation.
+        times (list<float>):
+            The time of each frame in a time series.
+        halo (float):
+            How far past the points owned by a process to send it data.
     """
     # pylint: disable=too-few-public-methods
-    properties = {'path': (str)}
+    properties = {'path': (str),
+                  'times': (list, int, float),
+                  'cache_dir': (str),
+                  'dataset': (str),
+                  'grid': (str),
+                  'extrapolation': (str),
+                  'fill_value': (int, float),
+                  'halo': (int, float)}
 
     def build(self):
         """
         Build the interpolated firedrake function.
+        If times are given, this also sets time_series to a FileSeries that
+        updates the function.
 
         Raises:
             AttributeError: If required properties are not defined.
+            ValueError: If the path or an option is invalid.
 
         Returns:
             Function: firedrake Function with values from the file.
@@ -56,28 +204,688 @@ class FileBuilder(FunctionBuilder):
         if path is None:
             raise AttributeError('"path" has not been defined.')
 
-        if not os.path.exists(path):
-            raise ValueError('Invalid path')
+        times = self._props['times']
+        if times is None:
+            paths = [path]
+        else:
+            if not isinstance(times, list):
+                times = [times]
+            if np.any(np.diff(times) <= 0):
+                raise ValueError('The times for a file series must be '
+                                 'increasing.')
+            paths = [path.format(i) for i in range(len(times))]
 
-        data = loadtxt(path, delimiter=',')
+        for p in paths:
+            if not os.path.exists(p):
+                raise ValueError('Invalid path')
 
-        coords = data[:, :-1]
-        vals = data[:, -1]
+        for name, options in (('grid', GRID_OPTIONS),
+                              ('extrapolation', EXTRAPOLATION_OPTIONS)):
+            if self._props[name] not in (None,) + options:
+                raise ValueError('Unknown {} option: {}. Available options '
+                                 'are: {}.'.format(name, self._props[name],
+                                                   ', '.join(options)))
 
-        # Now make the VectorFunctionSpace corresponding to V.
-        W = VectorFunctionSpace(self.mesh, self.V.ufl_element())
+        # Now make the VectorFunctionSpace corresponding to the space.
+        V = self.function_space()
+        W = VectorFunctionSpace(self.mesh, V.ufl_element())
         X = interpolate(self.mesh.coordinates, W)
-        f = Function(self.V)
+        points = X.dat.data_ro.reshape(len(X.dat.data_ro), -1)
+        f = Function(V)
 
-        method = 'linear' if coords.shape[1] > 2 else 'cubic'
-        # Use the external data function to interpolate the values of f.
-        interpolated = griddata(coords, vals, X.dat.data, method)
-        if np.isnan(interpolated).any():
-            # Use nearest method to fill in gaps.
-            nearest = griddata(coords, vals, X.dat.data, 'nearest')
-            mask = np.isnan(interpolated)
-            interpolated[mask] = nearest[mask]
+        if times is None:
+            f.dat.data[:] = self._load_values(path, points)
+            return self.finalise(f)
 
-        f.dat.data[:] = interpolated
+        # The cache key used by each frame that has been read.
+        keys = {}
 
+        def load(frame_path):
+            return self._load_values(frame_path, points, by_coords=True,
+                                     keys=keys)
+
+        def release(frame_path):
+            # Frames with different coordinates would otherwise keep their
+            # triangulations and weights for the rest of the run.
+            key = keys.pop(frame_path, None)
+            if key is not None and key not in list(keys.values()):
+                _evict_cache(key)
+
+        self.time_series = FileSeries(f, times, paths, load, release=release)
+        # Reading in the background would make collective MPI calls from a
+        # second thread.
+        self.time_series.prefetch = self.mesh.comm.size == 1
+        self.time_series.update(times[0])
         return f
+
+    def _load_values(self, path, points, by_coords=False, keys=None):
+        """
+        Read a data file and interpolate it onto the points.
+
+        Args:
+            path (str): The path to the file.
+            points (numpy.ndarray): The coordinates to interpolate to.
+            by_coords (bool, optional):
+                Cache the interpolation by the coordinates in the file instead
+                of the whole file, so that files with the same coordinates
+                share it. Defaults to False.
+            keys (dict, optional):
+                If given, the cache key used for the path is stored in this.
+
+        Returns:
+            numpy.ndarray: The values at the points.
+        """
+        comm = self.mesh.comm
+        if comm.size == 1:
+            coords, vals = read_data(path, self._props['dataset'])
+        else:
+            coords, vals = scatter_data(comm, path, points,
+                                        self._props['dataset'],
+                                        self._props['halo'])
+            # Each process has its own part of the file.
+            by_coords = True
+
+        if len(points) == 0:
+            return np.empty(0)
+
+        if by_coords:
+            key = _hash_array(coords)
+        else:
+            # Different datasets in one file have different coordinates.
+            # The name is hashed as it may be a path inside an HDF5 file.
+            dataset = str(self._props['dataset']).encode()
+            key = '{}-{}'.format(_hash_file(path),
+                                 hashlib.sha1(dataset).hexdigest())
+        if keys is not None:
+            keys[path] = key
+        return self._interpolation(key, coords, points)(vals)
+
+    def _interpolation(self, file_hash, coords, points):
+        """
+        Get a function to interpolate the data onto the points, including
+        filling any points outside of the data.
+
+        Args:
+            file_hash (str): The hash of the file contents.
+            coords (numpy.ndarray): The coordinates of the data.
+            points (numpy.ndarray): The coordinates to interpolate to.
+
+        Returns:
+            callable: A function taking the data values and returning the
+                values at the points.
+        """
+        key, interpolate_inside, outside = self._inside_interpolation(
+            file_hash, coords, points)
+
+        extrapolation = self._props['extrapolation'] or 'nearest'
+        if len(outside) == 0 or (extrapolation == 'nearest'
+                                 and key.endswith('-grid')):
+            # Structured grid interpolation already clamps to the boundary.
+            return interpolate_inside
+
+        if extrapolation == 'constant':
+            fill_value = self._props['fill_value'] or 0.0
+
+            def fill_gaps(vals):
+                # pylint: disable=unused-argument
+                return fill_value
+        else:
+            fill_key = '{}-{}'.format(key, extrapolation)
+            if fill_key not in _INTERPOLATIONS:
+                weights = gap_weights(_tree(file_hash, coords), coords,
+                                      points[outside], extrapolation)
+                _INTERPOLATIONS[fill_key] = weights.dot
+            fill_gaps = _INTERPOLATIONS[fill_key]
+
+        def interpolation(vals):
+            interpolated = interpolate_inside(vals)
+            interpolated[outside] = fill_gaps(vals)
+            return interpolated
+
+        return interpolation
+
+    def _inside_interpolation(self, file_hash, coords, points):
+        """
+        Get a function to interpolate the data onto the points inside of the
+        data. This is taken from the cache if possible.
+
+        Args:
+            file_hash (str): The hash of the file contents.
+            coords (numpy.ndarray): The coordinates of the data.
+            points (numpy.ndarray): The coordinates to interpolate to.
+
+        Raises:
+            ValueError: If the data should be structured but is not.
+
+        Returns:
+            str, callable, numpy.ndarray: The cache key, a function taking
+                the data values and returning the values at the points, and
+                the indices of the points outside of the data (which have
+                undefined values).
+        """
+        grid = None
+        if self._props['grid'] != 'scattered':
+            grid = _grid(file_hash, coords)
+        if grid is None and self._props['grid'] == 'structured':
+            raise ValueError('The data in {} is not on a structured '
+                             'grid.'.format(self._props['path']))
+
+        dim = coords.shape[1]
+        if grid is not None:
+            axes, _ = grid
+            method = 'cubic' if min(len(a) for a in axes) >= 4 else 'linear'
+            method += '-grid'
+        else:
+            method = 'linear' if dim > 2 else 'cubic'
+
+        key = '{}-{}-{}'.format(file_hash, _hash_array(points), method)
+        if key in _INTERPOLATIONS:
+            return (key,) + _INTERPOLATIONS[key]
+
+        if grid is not None:
+            interpolation = grid_interpolation(grid, points, method[:-5])
+        elif method == 'linear':
+            weights = self._load_weights(key)
+            if weights is None:
+                tri = _triangulation(file_hash, coords)
+                weights = linear_weights(tri, coords, points)
+                self._save_weights(key, weights)
+            # Points outside of the data have no weights.
+            outside = np.nonzero(np.diff(weights.indptr) == 0)[0]
+            interpolation = weights.dot, outside
+        elif dim == 2:
+            tri = _triangulation(file_hash, coords)
+            interpolation = cubic_interpolation(tri, points)
+        else:
+            interpolation = griddata_interpolation(coords, points, method)
+
+        _INTERPOLATIONS[key] = interpolation
+        return (key,) + interpolation
+
+    def _load_weights(self, key):
+        """
+        Load interpolation weights from the cache directory.
+
+        Args:
+            key (str): The key for the weights.
+
+        Returns:
+            scipy.sparse.csr_matrix: The weights, or None if not stored.
+        """
+        cache_dir = self._props['cache_dir']
+        if cache_dir is None:
+            return None
+        path = os.path.join(cache_dir, key + '.npz')
+        if not os.path.exists(path):
+            return None
+        return load_npz(path)
+
+    def _save_weights(self, key, weights):
+        """
+        Store interpolation weights in the cache directory (if set).
+
+        Args:
+            key (str): The key for the weights.
+            weights (scipy.sparse.csr_matrix): The weights to store.
+        """
+        cache_dir = self._props['cache_dir']
+        if cache_dir is None:
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        save_npz(os.path.join(cache_dir, key + '.npz'), weights)
+
+
+class FileSeries:
+    """
+    A function interpolated linearly in time between frames read from files.
+    Only the frames either side of the current time are kept in memory, and
+    the next frame is read in a background thread.
+
+    Attributes:
+        function (Function):
+            The function that is updated in place.
+        times (numpy.ndarray):
+            The time of each frame.
+        paths (list<str>):
+            The file for each frame.
+        _load (callable):
+            Reads a file and returns its values for the function.
+        _frames (dict):
+            The values of the loaded frames, keyed by their index.
+        prefetch (bool):
+            Whether to read the next frame in a background thread.
+            Defaults to True.
+        _prefetch (tuple):
+            The index of the frame being read in the background, the thread
+            reading it, and a dictionary the thread stores the values (or
+            any error) in. None if no frame is being read.
+        _release (callable):
+            Called with the file for a frame once it is no longer needed.
+    """
+    # pylint: disable=too-few-public-methods
+    # The series needs the state of the frames, the background read, and the
+    # files.
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, function, times, paths, load, release=None):
+        """
+        Initialiser for FileSeries.
+
+        Args:
+            function (Function): The function to update in place.
+            times (list<float>): The time of each frame.
+            paths (list<str>): The file for each frame.
+            load (callable):
+                Reads a file and returns its values for the function.
+            release (callable, optional):
+                Called with the file for a frame once it is no longer needed,
+                so that anything cached for it can be freed. Defaults to None.
+        """
+        self.function = function
+        self.times = np.asarray(times, dtype=float)
+        self.paths = paths
+        self._load = load
+        self._frames = {}
+        self.prefetch = True
+        self._prefetch = None
+        self._release = release
+
+    def update(self, t):
+        """
+        Update the function to the given time and start reading the next
+        frame.
+
+        Args:
+            t (float): The simulated time.
+        """
+        last = len(self.times) - 1
+        before = int(np.clip(np.searchsorted(self.times, t, side='right') - 1,
+                             0, max(last - 1, 0)))
+        after = min(before + 1, last)
+
+        weight = 0.0
+        if after != before:
+            weight = (t - self.times[before]) / (self.times[after]
+                                                 - self.times[before])
+            weight = min(max(weight, 0.0), 1.0)
+
+        frames = {before: self._frame(before), after: self._frame(after)}
+        for index in self._frames:
+            if index not in frames:
+                self._release_frame(index)
+        self._frames = frames
+
+        data = self.function.dat.data
+        np.multiply(self._frames[before], 1 - weight, out=data)
+        if weight > 0:
+            data += weight * self._frames[after]
+
+        self._start_prefetch(after + 1)
+
+    def _frame(self, index):
+        """
+        Get the values for a frame, waiting for the background thread if it
+        is reading it.
+
+        Args:
+            index (int): The index of the frame.
+
+        Raises:
+            RuntimeError: If reading the frame in the background failed.
+
+        Returns:
+            numpy.ndarray: The values for the frame.
+        """
+        if index in self._frames:
+            return self._frames[index]
+
+        if self._prefetch is not None and self._prefetch[0] == index:
+            _, thread, result = self._prefetch
+            self._prefetch = None
+            thread.join()
+            if 'error' in result:
+                raise RuntimeError('Failed to read {}.'.format(
+                    self.paths[index])) from result['error']
+            return result['values']
+
+        return self._load(self.paths[index])
+
+    def _start_prefetch(self, index):
+        """
+        Start reading a frame in a background thread.
+
+        Args:
+            index (int): The index of the frame.
+        """
+        if (not self.prefetch or index >= len(self.times)
+                or index in self._frames):
+            return
+        if self._prefetch is not None:
+            if self._prefetch[0] == index:
+                return
+            # The time has jumped past the frame being read.
+            self._prefetch[1].join()
+            self._release_frame(self._prefetch[0])
+
+        result = {}
+
+        def read():
+            try:
+                result['values'] = self._load(self.paths[index])
+            except Exception as e:  # pylint: disable=broad-except
+                result['error'] = e
+
+        thread = Thread(target=read, daemon=True)
+        thread.start()
+        self._prefetch = (index, thread, result)
+
+    def _release_frame(self, index):
+        """
+        Let go of anything cached for a frame that is no longer needed.
+
+        Args:
+            index (int): The index of the frame.
+        """
+        if self._release is not None:
+            self._release(self.paths[index])
+
+
+def read_data(path, dataset=None):
+    """
+    Read the coordinates and values from a data file.
+    The format is chosen from the file extension.
+
+    Args:
+        path (str): The path to the file.
+        dataset (str, optional):
+            The name of the array to read from a .npz or HDF5 file.
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: The coordinates and values.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        data = np.load(path, mmap_mode='r')
+        return data[:, :-1], data[:, -1]
+    if ext == '.npz':
+        return _read_npz(path, dataset)
+    if ext in ('.h5', '.hdf5'):
+        return _read_hdf5(path, dataset)
+
+    data = loadtxt(path, delimiter=',')
+    return data[:, :-1], data[:, -1]
+
+
+def scatter_data(comm, path, points, dataset=None, halo=None):
+    """
+    Read a data file on the first process and send each process the data
+    near the points it owns.
+
+    Args:
+        comm (mpi4py.MPI.Comm): The communicator of the processes.
+        path (str): The path to the file.
+        points (numpy.ndarray): The points owned by this process.
+        dataset (str, optional):
+            The name of the array to read from a .npz or HDF5 file.
+        halo (float, optional):
+            How far past the bounding box of the points to send data.
+            Defaults to None (4 times the average data spacing).
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: The coordinates and values for this
+            process.
+    """
+    bounds = None
+    if len(points):
+        bounds = (points.min(axis=0), points.max(axis=0))
+    all_bounds = comm.gather(bounds, root=0)
+
+    local_data = None
+    if comm.rank == 0:
+        coords, vals = read_data(path, dataset)
+        if halo is None:
+            halo = _data_spacing(coords) * 4
+        local_data = [_local_data(coords, vals, b, halo) for b in all_bounds]
+
+    return comm.scatter(local_data, root=0)
+
+
+def _data_spacing(coords):
+    """
+    Estimate the average spacing of the data from its bounding box.
+
+    Args:
+        coords (numpy.ndarray): The coordinates of the data.
+
+    Returns:
+        float: The spacing.
+    """
+    extent = np.ptp(coords, axis=0)
+    extent = extent[extent > 0]
+    if len(extent) == 0:
+        return 1.0
+    return (np.prod(extent) / len(coords)) ** (1 / len(extent))
+
+
+def _local_data(coords, vals, bounds, halo):
+    """
+    Select the data inside a bounding box grown by the halo.
+    The halo is doubled until there are enough points to interpolate with.
+
+    Args:
+        coords (numpy.ndarray): The coordinates of the data.
+        vals (numpy.ndarray): The values of the data.
+        bounds (tuple<numpy.ndarray>):
+            The lower and upper corners of the box. None for no data.
+        halo (float): How far past the box to select data.
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: The selected coordinates and values.
+    """
+    if bounds is None:
+        return np.empty((0, coords.shape[1])), np.empty(0)
+
+    lower, upper = bounds
+    required = min(len(coords), 2 * (coords.shape[1] + 1))
+    halo = max(halo, _data_spacing(coords) * 1e-6)
+    while True:
+        inside = np.all((coords >= lower - halo) & (coords <= upper + halo),
+                        axis=1)
+        if np.count_nonzero(inside) >= required:
+            break
+        halo *= 2
+
+    return coords[inside], vals[inside]
+
+
+def _choose_arrays(names, dataset, path):
+    """
+    Choose which arrays in a file to read the data from.
+
+    Args:
+        names (list<str>): The names of the arrays in the file.
+        dataset (str): The name requested by the user or None.
+        path (str): The path to the file (for errors).
+
+    Raises:
+        ValueError: If the arrays to read can not be determined.
+
+    Returns:
+        list<str>:
+            Either the names of the coords and values arrays, or the name of
+            a single array holding both.
+    """
+    if dataset is not None:
+        if dataset not in names:
+            raise ValueError('"{}" is not in {}. Available arrays are: '
+                             '{}'.format(dataset, path, ', '.join(names)))
+        return [dataset]
+    if 'coords' in names and 'values' in names:
+        return ['coords', 'values']
+    if len(names) == 1:
+        return list(names)
+    raise ValueError('Can not tell which data to use from {}. Set dataset '
+                     'to one of: {}'.format(path, ', '.join(names)))
+
+
+def _read_npz(path, dataset):
+    """
+    Read the coordinates and values from a .npz file.
+
+    Args:
+        path (str): The path to the file.
+        dataset (str): The name of the array to read or None.
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: The coordinates and values.
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = [n[:-4] for n in archive.namelist() if n.endswith('.npy')]
+        arrays = [_npz_member(path, archive.getinfo(n + '.npy'))
+                  for n in _choose_arrays(names, dataset, path)]
+
+    if len(arrays) == 2:
+        return arrays[0].reshape(len(arrays[1]), -1), arrays[1]
+    return arrays[0][:, :-1], arrays[0][:, -1]
+
+
+def _npz_member(path, info):
+    """
+    Load an array from a .npz file.
+    Uncompressed arrays are memory-mapped, compressed arrays must be read.
+
+    Args:
+        path (str): The path to the file.
+        info (zipfile.ZipInfo): The entry for the array in the archive.
+
+    Returns:
+        numpy.ndarray: The array.
+    """
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as arrays:
+            return arrays[info.filename[:-4]]
+
+    with open(path, 'rb') as f:
+        # Skip the local file header to the start of the .npy data.
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack('<HH', f.read(4))
+        f.seek(name_len + extra_len, os.SEEK_CUR)
+        version = npy_format.read_magic(f)
+        if version == (1, 0):
+            header = npy_format.read_array_header_1_0(f)
+        else:
+            header = npy_format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    shape, fortran_order, dtype = header
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape, offset=offset,
+                     order='F' if fortran_order else 'C')
+
+
+def _read_hdf5(path, dataset):
+    """
+    Read the coordinates and values from an HDF5 file.
+
+    Args:
+        path (str): The path to the file.
+        dataset (str): The name of the dataset to read or None.
+
+    Raises:
+        ImportError: If h5py is not installed.
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: The coordinates and values.
+    """
+    try:
+        import h5py  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError('h5py is required to read HDF5 files.') from e
+
+    with h5py.File(path, 'r') as f:
+        names = []
+        f.visititems(lambda name, obj: names.append(name)
+                     if isinstance(obj, h5py.Dataset) else None)
+        datasets = [f[n] for n in _choose_arrays(names, dataset, path)]
+
+        if len(datasets) == 2:
+            vals = datasets[1][()].reshape(-1)
+            return datasets[0][()].reshape(len(vals), -1), vals
+        return datasets[0][:, :-1], datasets[0][:, -1]
+
+
+def _hash_file(path):
+    """
+    Hash the contents of a file without reading it all into memory.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: The hash.
+    """
+    file_hash = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _hash_array(arr):
+    """
+    Hash the contents of an array.
+
+    Args:
+        arr (numpy.ndarray): The array to hash.
+
+    Returns:
+        str: The hash.
+    """
+    return hashlib.sha1(np.ascontiguousarray(arr).tobytes()).hexdigest()
+
+
+def _triangulation(file_hash, coords):
+    """
+    Get the Delaunay triangulation of the data, using the cache if possible.
+
+    Args:
+        file_hash (str): The hash of the file contents.
+        coords (numpy.ndarray): The coordinates of the data.
+
+    Returns:
+        scipy.spatial.Delaunay: The triangulation.
+    """
+    if file_hash not in _TRIANGULATIONS:
+        _TRIANGULATIONS[file_hash] = Delaunay(coords)
+    return _TRIANGULATIONS[file_hash]
+
+
+def _grid(file_hash, coords):
+    """
+    Get the structured grid that the data is on, using the cache if possible.
+
+    Args:
+        file_hash (str): The hash of the file contents.
+        coords (numpy.ndarray): The coordinates of the data.
+
+    Returns:
+        tuple: The grid (see find_grid) or None if the data is scattered.
+    """
+    if file_hash not in _GRIDS:
+        _GRIDS[file_hash] = find_grid(coords)
+    return _GRIDS[file_hash]
+
+
+def _tree(file_hash, coords):
+    """
+    Get a KD-tree of the data, using the cache if possible.
+
+    Args:
+        file_hash (str): The hash of the file contents.
+        coords (numpy.ndarray): The coordinates of the data.
+
+    Returns:
+        scipy.spatial.cKDTree: The tree.
+    """
+    if file_hash not in _TREES:
+        _TREES[file_hash] = cKDTree(coords)
+    return _TREES[file_hash]
@@ -10,9 +10,52 @@ FunctionBuilders must define:
     build (function):
         This should take no arguments and return a firedrake Function-like
         object.
+
+Every FunctionBuilder also accepts a `space` property which selects a cheaper
+function space to build in (see SPACES).
 """
 from abc import ABC, abstractmethod
 
+from firedrake import Constant, FunctionSpace
+
+from TTiP.util.logger import get_logger
+
+LOGGER = get_logger()
+
+# The function spaces that functions can be built in:
+#     - default: The solution space.
+#     - P1: Continuous linear.
+#     - DG0: Piecewise constant.
+#     - constant: A Constant if the value is uniform, otherwise P1.
+SPACES = ('default', 'P1', 'DG0', 'constant')
+
+
+def get_function_space(mesh, V, space=None):
+    """
+    Get the function space to build a function in.
+
+    Args:
+        mesh (Mesh): The mesh that the function will be interpolated over.
+        V (FunctionSpace): The solution function space.
+        space (string, optional):
+            The name of the space (see SPACES). Defaults to None (the
+            solution space).
+
+    Raises:
+        ValueError: If the space is not recognised.
+
+    Returns:
+        FunctionSpace: The function space.
+    """
+    if space is None or space == 'default':
+        return V
+    if space in ('P1', 'constant'):
+        return FunctionSpace(mesh, 'CG', 1)
+    if space == 'DG0':
+        return FunctionSpace(mesh, 'DG', 0)
+    raise ValueError('Unknown function space: {}. Available spaces are: {}.'
+                     ''.format(space, ', '.join(SPACES)))
+
 
 class FunctionBuilder(ABC):
     """
@@ -33,6 +76,14 @@ class FunctionBuilder(ABC):
             The mesh that function will be interpolated over.
         V (FunctionSpace):
             The function space that functions must be a member of.
+        space (string):
+            The name of the function space to build in (see SPACES).
+            None to build in V.
+        time_series (object):
+            Set by build if the function depends on time. This has an
+            update(t) method which updates the built function in place for
+            the simulated time t. None if the function does not depend on
+            time.
     """
 
     properties = {}
@@ -43,6 +94,8 @@ class FunctionBuilder(ABC):
         """
         self.mesh = mesh
         self.V = V
+        self.space = None
+        self.time_series = None
         self._props = {k: None for k in self.properties}
 
     def assign(self, name, value):
@@ -60,8 +113,15 @@ class FunctionBuilder(ABC):
         Raises:
             TypeError: If property is being set to the wrong type.
             KeyError: If property is not valid.
+            ValueError: If the space is not recognised.
         """
-        if name in self.properties:
+        if name == 'space':
+            if value not in SPACES:
+                raise ValueError('Unknown function space: {}. Available '
+                                 'spaces are: {}.'.format(value,
+                                                          ', '.join(SPACES)))
+            self.space = value
+        elif name in self.properties:
             if isinstance(value, self.properties[name]):
                 self._props[name] = value
             else:
@@ -72,6 +132,39 @@ class FunctionBuilder(ABC):
             raise KeyError('Property "{}" is not valid with this function.'
                            ''.format(name))
 
+    def function_space(self):
+        """
+        Get the function space to build the function in.
+
+        Returns:
+            FunctionSpace: The function space.
+        """
+        return get_function_space(self.mesh, self.V, self.space)
+
+    def finalise(self, f):
+        """
+        Replace a built function with a Constant if the constant space was
+        requested and the function is uniform.
+
+        Args:
+            f (Function): The built function.
+
+        Returns:
+            Function or Constant: The function to use.
+        """
+        if self.space != 'constant':
+            return f
+
+        with f.dat.vec_ro as vec:
+            _, f_min = vec.min()
+            _, f_max = vec.max()
+        if f_min == f_max:
+            return Constant(f_min)
+
+        LOGGER.warning('Function is not uniform, using P1 instead of a '
+                       'Constant.')
+        return f
+
     @abstractmethod
     def build(self):
         """
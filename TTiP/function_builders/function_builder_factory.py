@@ -6,7 +6,8 @@ filename.
 from importlib import import_module
 from inspect import getmembers, isabstract, isclass
 
-from TTiP.function_builders.function_builder import FunctionBuilder
+from TTiP.function_builders.function_builder import (FunctionBuilder,
+                                                     get_function_space)
 from TTiP.parsers.parse_args import process_args
 
 
@@ -18,9 +19,28 @@ class FunctionBuilderFactory:
 
     Also provdes a utility function to create the function given a list of
     properties.
+
+    Class Attributes:
+        str_keys (list<string>):
+            The function properties that are strings and should not be
+            parsed as expressions.
+
+    Attributes:
+        mesh (Mesh):
+            The mesh that the function will interpolate over.
+        V (FunctionSpace):
+            The solution function space.
+        space (string):
+            The name of the function space to build functions in by default
+            (see function_builder.SPACES). None to build in V.
+        time_series (list):
+            The time series of every time dependant function that has been
+            created (see FunctionBuilder.time_series).
     """
+    str_keys = ['type', 'path', 'space', 'cache_dir', 'dataset', 'grid',
+                'extrapolation']
 
-    def __init__(self, mesh, V):
+    def __init__(self, mesh, V, space=None):
         """
         Initialiser for the FunctionBuilderFactory
 
@@ -29,9 +49,23 @@ class FunctionBuilderFactory:
                 The mesh that the function will interpolate over.
             V (FunctionSpace):
                 The function space that the function should belong to.
+            space (string, optional):
+                The name of the function space to build functions in by
+                default. Defaults to None (V).
         """
         self.mesh = mesh
         self.V = V
+        self.space = space
+        self.time_series = []
+
+    def function_space(self):
+        """
+        Get the default function space to build functions in.
+
+        Returns:
+            FunctionSpace: The function space.
+        """
+        return get_function_space(self.mesh, self.V, self.space)
 
     def create_function_builder(self, function_type):
         """
@@ -66,7 +100,10 @@ class FunctionBuilderFactory:
             raise RuntimeError('Could not get unique function builder for {}.'
                                ''.format(function_type))
 
-        return classes[0][1](mesh=self.mesh, V=self.V)
+        builder = classes[0][1](mesh=self.mesh, V=self.V)
+        if self.space is not None:
+            builder.assign('space', self.space)
+        return builder
 
     def create_function(self, function_type, **properties):
         """
@@ -93,7 +130,10 @@ class FunctionBuilderFactory:
             raise ValueError('Could not create {} function with properties: {}'
                              ''.format(function_type, properties))
 
-        return func_builder.build()
+        func = func_builder.build()
+        if func_builder.time_series is not None:
+            self.time_series.append(func_builder.time_series)
+        return func
 
     def create_function_dict(self, conf):
         """
@@ -112,7 +152,7 @@ class FunctionBuilderFactory:
         """
         all_funcs = process_args(conf,
                                  factory=self,
-                                 str_keys=['type', 'path'])
+                                 str_keys=self.str_keys)
 
         funcs_dict = {}
         for k, v in all_funcs.items():
@@ -78,7 +78,7 @@ class GaussianBuilder(FunctionBuilder):
         if not isinstance(sd, list):
             sd = [sd] * len(xs)
 
-        gaussian = Function(self.V)
+        gaussian = Function(self.function_space())
         components = [exp(-(x - m)**2 / 2 / s**2)
                       for x, m, s in zip(xs, mean, sd)]
         product = components[0]
@@ -87,4 +87,4 @@ class GaussianBuilder(FunctionBuilder):
 
         gaussian.interpolate(scale * product)
 
-        return gaussian
+        return self.finalise(gaussian)
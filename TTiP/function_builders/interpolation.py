@@ -0,0 +1,184 @@
+"""
+Interpolation from scattered or structured data to a set of points.
+These are used by the FileBuilder, which caches the results.
+"""
+import numpy as np
+from scipy.interpolate import (CloughTocher2DInterpolator,
+                               RegularGridInterpolator, griddata)
+from scipy.sparse import csr_matrix
+
+
+def find_grid(coords):
+    """
+    Check if the data is on a structured grid.
+    This is the case if the data has a point for every combination of the
+    unique coordinates in each direction.
+
+    Args:
+        coords (numpy.ndarray): The coordinates of the data.
+
+    Returns:
+        tuple: None if the data is scattered, otherwise the coordinates of the
+            grid in each direction, and the order to take the data in to
+            arrange it on the grid (None if it is already in order).
+    """
+    axes = [np.unique(coords[:, i]) for i in range(coords.shape[1])]
+    shape = tuple(len(a) for a in axes)
+    if min(shape) < 2 or np.prod(shape) != len(coords):
+        return None
+
+    index = np.ravel_multi_index(
+        [np.searchsorted(a, coords[:, i]) for i, a in enumerate(axes)], shape)
+    if np.bincount(index, minlength=len(coords)).max() > 1:
+        return None
+
+    if np.all(index[1:] > index[:-1]):
+        return axes, None
+    order = np.empty_like(index)
+    order[index] = np.arange(len(index))
+    return axes, order
+
+
+def grid_interpolation(grid, points, method):
+    """
+    Create a function for interpolation from data on a structured grid to
+    the points. Points outside of the grid are moved onto the boundary.
+
+    Args:
+        grid (tuple): The grid axes and data order (see find_grid).
+        points (numpy.ndarray): The coordinates to interpolate to.
+        method (str): The interpolation method.
+
+    Returns:
+        callable, numpy.ndarray: A function taking the data values and
+            returning the values at the points, and the indices of the points
+            outside of the grid.
+    """
+    axes, order = grid
+    shape = tuple(len(a) for a in axes)
+    clipped = np.clip(points, [a[0] for a in axes], [a[-1] for a in axes])
+    outside = np.nonzero((clipped != points).any(axis=1))[0]
+
+    def interpolate_values(vals):
+        if order is not None:
+            vals = vals[order]
+        interpolator = RegularGridInterpolator(axes, vals.reshape(shape),
+                                               method=method)
+        return interpolator(clipped)
+
+    return interpolate_values, outside
+
+
+def linear_weights(tri, coords, points):
+    """
+    Calculate the weights for linear interpolation from the data to the
+    points. Each row holds the barycentric coordinates of a point in its
+    simplex, or is empty if the point is outside of the data.
+
+    Args:
+        tri (scipy.spatial.Delaunay): The triangulation of the data.
+        coords (numpy.ndarray): The coordinates of the data.
+        points (numpy.ndarray): The coordinates to interpolate to.
+
+    Returns:
+        scipy.sparse.csr_matrix: The weights with shape (points, data).
+    """
+    dim = coords.shape[1]
+    simplex = tri.find_simplex(points)
+    inside = np.nonzero(simplex >= 0)[0]
+
+    transform = tri.transform[simplex[inside]]
+    delta = points[inside] - transform[:, dim]
+    bary = np.einsum('ijk,ik->ij', transform[:, :dim], delta)
+    bary = np.c_[bary, 1 - bary.sum(axis=1)]
+
+    rows = np.repeat(inside, dim + 1)
+    cols = tri.simplices[simplex[inside]].ravel()
+
+    return csr_matrix((bary.ravel(), (rows, cols)),
+                      shape=(len(points), len(coords)))
+
+
+def cubic_interpolation(tri, points):
+    """
+    Create a function for 2D cubic interpolation from the data to the points
+    on a cached triangulation.
+
+    Args:
+        tri (scipy.spatial.Delaunay): The triangulation of the data.
+        points (numpy.ndarray): The coordinates to interpolate to.
+
+    Returns:
+        callable, numpy.ndarray: A function taking the data values and
+            returning the values at the points, and the indices of the points
+            outside of the data.
+    """
+    outside = np.nonzero(tri.find_simplex(points) < 0)[0]
+
+    def interpolate_values(vals):
+        return CloughTocher2DInterpolator(tri, vals)(points)
+
+    return interpolate_values, outside
+
+
+def griddata_interpolation(coords, points, method):
+    """
+    Create a function for interpolation from the data to the points with
+    griddata. This is used for 1D data, which does not need triangulating.
+
+    Args:
+        coords (numpy.ndarray): The coordinates of the data.
+        points (numpy.ndarray): The coordinates to interpolate to.
+        method (str): The interpolation method.
+
+    Returns:
+        callable, numpy.ndarray: A function taking the data values and
+            returning the values at the points, and the indices of the points
+            outside of the data.
+    """
+    outside = np.nonzero((points < coords.min(axis=0)).any(axis=1)
+                         | (points > coords.max(axis=0)).any(axis=1))[0]
+
+    def interpolate_values(vals):
+        interpolated = griddata(coords, vals, points, method)
+        return interpolated.reshape(len(points))
+
+    return interpolate_values, outside
+
+
+def gap_weights(tree, coords, points, extrapolation):
+    """
+    Calculate the weights to fill points outside of the data from the nearby
+    data points.
+
+    For nearest extrapolation each row holds a single 1 for the nearest data
+    point. For linear extrapolation a linear function is fit to the nearest
+    2(n+1) data points by least squares and each row holds the weights of
+    those points in its value at the point.
+
+    Args:
+        tree (scipy.spatial.cKDTree): A KD-tree of the data.
+        coords (numpy.ndarray): The coordinates of the data.
+        points (numpy.ndarray): The coordinates to fill.
+        extrapolation (str): Either 'nearest' or 'linear'.
+
+    Returns:
+        scipy.sparse.csr_matrix: The weights with shape (points, data).
+    """
+    dim = coords.shape[1]
+    k = 1 if extrapolation == 'nearest' else min(2 * (dim + 1), len(coords))
+    _, nearest = tree.query(points, k=k)
+    nearest = nearest.reshape(len(points), k)
+
+    if extrapolation == 'nearest':
+        weights = np.ones((len(points), 1))
+    else:
+        # Fit v = a + b.(x - p) so the value at p is a, the first row of the
+        # pseudo-inverse applied to the values.
+        offsets = coords[nearest] - points[:, np.newaxis, :]
+        fit = np.concatenate([np.ones((len(points), k, 1)), offsets], axis=2)
+        weights = np.linalg.pinv(fit)[:, 0, :]
+
+    rows = np.repeat(np.arange(len(points)), k)
+    return csr_matrix((weights.ravel(), (rows, nearest.ravel())),
+                      shape=(len(points), len(coords)))
@@ -36,9 +36,10 @@ class BoundaryCondsParser(FunctionSectionParser):
             conf (configparser section or dict):
                 The full BOUNDARIES section from the config.
         """
-        boundaries = process_args(conf,
-                                  factory=self.factory,
-                                  str_keys=['type', 'boundary_type'])
+        boundaries = process_args(
+            conf,
+            factory=self.factory,
+            str_keys=self.factory.str_keys + ['boundary_type'])
 
         for b in boundaries.values():
             for k, v in b.items():
@@ -17,6 +17,9 @@ class MeshParser(SectionParser):
         func_space (FunctionSpace):
             This variable hold the instntiated function space once it has been
             generated.
+        hierarchy (MeshHierarchy):
+            The mesh hierarchy that mesh is the finest level of.
+            None if no coarse levels or refinements are requested.
     """
     # pylint: disable=too-few-public-methods
 
@@ -27,22 +30,48 @@ class MeshParser(SectionParser):
         super().__init__()
         self.mesh = None
         self.func_space = None
+        self.hierarchy = None
 
-    def parse(self, conf):
+    def parse(self, conf, mesh=None):
         """
         Parse the given config section into an instantiated Mesh.
 
+        If coarse_levels is given, the cell counts of a utility mesh are
+        divided by 2**coarse_levels and a MeshHierarchy is refined from the
+        result, so that the finest level matches the configured mesh.
+        If refinements is given, the configured mesh is refined this many
+        times more and the finest level is used as the mesh.
+
         Args:
             conf (configparser section):
                 The config section for the mesh.
+            mesh (Mesh, optional):
+                An existing mesh to use instead of creating one from the
+                config (e.g. from a checkpoint). The function space is still
+                defined by the config. Defaults to None.
 
         Raises:
             AttributeError: If no mesh type is defined.
+            ValueError: If coarse levels are requested for a mesh from file.
+            ValueError: If the cell counts can't be divided for the coarse
+                levels.
         """
-
-        if 'type' not in conf:
+        conf = dict(conf)
+        if mesh is None and 'type' not in conf:
             raise AttributeError('Must define a mesh type.')
 
+        element = conf.pop('element')
+        order = conf.pop('order')
+        try:
+            order = int(order)
+        except ValueError as e:
+            raise TypeError from e
+
+        if mesh is not None:
+            self.mesh = mesh
+            self.func_space = firedrake.FunctionSpace(mesh, element, order)
+            return
+
         mesh_type = conf.pop('type')
         if mesh_type.lower() == 'file':
             mesh_type = 'Mesh'
@@ -52,23 +81,55 @@ class MeshParser(SectionParser):
 
         mesh_cls = getattr(firedrake, mesh_type)
 
-        element = conf.pop('element')
-        order = conf.pop('order')
-        try:
-            order = int(order)
-        except ValueError as e:
-            raise TypeError from e
+        coarse_levels = int(conf.pop('coarse_levels', 0))
+        refinements = int(conf.pop('refinements', 0))
 
         processed_args = []
         args = conf.pop('params', None)
         if args is not None:
             args = Expression(args)
             processed_args = args.evaluate(None)
+            if not isinstance(processed_args, list):
+                processed_args = [processed_args]
 
-        kwargs = {}
-        for k, v in conf.items():
-            expr = Expression(v)
-            kwargs[k] = expr.evaluate(None)
+        kwargs = {k: Expression(v).evaluate(None) for k, v in conf.items()}
+
+        if coarse_levels > 0:
+            if mesh_type == 'Mesh':
+                raise ValueError('Coarse levels can only be created for '
+                                 'utility meshes.')
+            processed_args = self._coarsen_args(processed_args,
+                                                2**coarse_levels)
 
         self.mesh = mesh_cls(*processed_args, **kwargs)
+        if coarse_levels + refinements > 0:
+            self.hierarchy = firedrake.MeshHierarchy(
+                self.mesh, coarse_levels + refinements)
+            self.mesh = self.hierarchy[-1]
         self.func_space = firedrake.FunctionSpace(self.mesh, element, order)
+
+    @staticmethod
+    def _coarsen_args(args, factor):
+        """
+        Divide the cell counts (the leading integer arguments) of a utility
+        mesh by a factor.
+
+        Args:
+            args (list): The arguments for the utility mesh.
+            factor (int): The factor to divide the counts by.
+
+        Raises:
+            ValueError: If a count is not divisible by the factor.
+
+        Returns:
+            list: The arguments for the coarse mesh.
+        """
+        coarse_args = list(args)
+        for i, arg in enumerate(coarse_args):
+            if not isinstance(arg, int):
+                break
+            if arg % factor != 0:
+                raise ValueError('Cell count {} is not divisible by {}, '
+                                 'reduce coarse_levels.'.format(arg, factor))
+            coarse_args[i] = arg // factor
+        return coarse_args
@@ -35,9 +35,14 @@ class ParametersParser(FunctionSectionParser):
         """
         Parse the PARAMETERS section of the config into the various attributes.
 
+        The optional "space" entry sets the function space that all
+        parameters are built in (see function_builder.SPACES).
+
         Args:
             conf (configparser section or dict):
                 The full PARAMETERS section from the config.
         """
+        conf = dict(conf)
+        self.factory.space = conf.pop('space', None)
         all_functions = self.factory.create_function_dict(conf)
         self.parameters.update(all_functions)
@@ -583,7 +583,7 @@ def process_args(conf, factory=None, str_keys=['type', 'path'], clean=True):
         Node.clear_terminals()
 
     mesh = factory.mesh if factory is not None else None
-    V = factory.V if factory is not None else None
+    V = factory.function_space() if factory is not None else None
 
     tmp_functions = {k[1:].split('.')[0]
                      for k in conf
@@ -4,6 +4,10 @@ This contains the parser for parsing the SOLVER section of the config.
 from TTiP.parsers.parse_args import process_args
 from TTiP.parsers.parser import SectionParser
 
+# Keys starting with these are passed to PETSc instead of the method.
+PETSC_PREFIXES = ('snes_', 'ksp_', 'pc_', 'mat_', 'assembled_', 'mg_',
+                  'pmg_')
+
 
 class SolverParser(SectionParser):
     """
@@ -16,6 +20,16 @@ class SolverParser(SectionParser):
             The method to use for the solve.
         params (dict):
             Any parameters for the selected method.
+        solver_settings (dict):
+            The keyword arguments for each of the Solver set_ methods, keyed
+            by the name of the method without "set_" (e.g. "output" for
+            set_output). None for any that are not enabled.
+        problem_settings (dict):
+            The largest quadrature degree to integrate with
+            (quadrature_degree), whether to copy parameter values into
+            placeholder functions so that compiled kernels can be reused
+            (reuse_kernels), and whether to solve steady state problems on
+            the coarse mesh levels first (grid_sequencing).
     """
     # pylint: disable=too-few-public-methods
 
@@ -27,6 +41,8 @@ class SolverParser(SectionParser):
         self.file_path = None
         self.method = None
         self.params = {}
+        self.solver_settings = {}
+        self.problem_settings = {}
 
     def parse(self, conf):
         """
@@ -35,12 +51,86 @@ class SolverParser(SectionParser):
         Args:
             conf (configparser section or dict):
                 The full SOLVER section from the config.
+
+        Raises:
+            ValueError:
+                If pseudo transient continuation is enabled without a first
+                pseudo time step.
         """
-        known_vars = list(vars(self))
+        # PETSc options are left as strings for PETSc to interpret.
+        petsc_params = {k: v for k, v in conf.items()
+                        if k.startswith(PETSC_PREFIXES)}
+        conf = {k: v for k, v in conf.items() if k not in petsc_params}
+
         all_inps = process_args(conf,
                                 factory=None,
-                                str_keys=['file_path', 'method'])
-        self.file_path = all_inps['file_path']
-        self.method = all_inps['method']
-        self.params = {k: v for k, v in all_inps.items()
-                       if k not in known_vars}
+                                str_keys=['file_path', 'method',
+                                          'checkpoint_path', 'telemetry',
+                                          'telemetry_path', 'preset'])
+        self.file_path = all_inps.pop('file_path')
+        self.method = all_inps.pop('method')
+
+        settings = {}
+        settings['preset'] = {'preset': all_inps.pop('preset', None),
+                              'overrides': petsc_params}
+        settings['output'] = {
+            'every': all_inps.pop('output_every', None),
+            'interval': all_inps.pop('output_interval', None),
+            'times': all_inps.pop('output_times', None),
+            'final_only': all_inps.pop('final_only', False),
+            'asynchronous': all_inps.pop('async_output', False),
+            'buffers': all_inps.pop('output_buffers', 2)}
+
+        checkpointing = {'every': all_inps.pop('checkpoint_every', None),
+                         'path': all_inps.pop('checkpoint_path', None)}
+        settings['checkpointing'] = (
+            None if checkpointing['every'] is None else checkpointing)
+
+        pseudo_transient = _drop_none({
+            'dt': all_inps.pop('ptc_dt', None),
+            'dt_max': all_inps.pop('ptc_dt_max', None),
+            'max_growth': all_inps.pop('ptc_max_growth', None),
+            'tolerance': all_inps.pop('ptc_tolerance', None),
+            'max_steps': all_inps.pop('ptc_max_steps', None)})
+        settings['pseudo_transient'] = None
+        if all_inps.pop('pseudo_transient', False):
+            if 'dt' not in pseudo_transient:
+                raise ValueError('ptc_dt must be set to use pseudo transient '
+                                 'continuation.')
+            settings['pseudo_transient'] = pseudo_transient
+
+        lagging = _drop_none({
+            'jacobian': all_inps.pop('lag_jacobian', None),
+            'preconditioner': all_inps.pop('lag_preconditioner', None),
+            'ksp_growth': all_inps.pop('lag_ksp_growth', None),
+            'max_rate': all_inps.pop('lag_max_rate', None)})
+        settings['lagging'] = None
+        if 'jacobian' in lagging or 'preconditioner' in lagging:
+            settings['lagging'] = lagging
+
+        telemetry = {'fmt': all_inps.pop('telemetry', None),
+                     'path': all_inps.pop('telemetry_path', None)}
+        settings['telemetry'] = (
+            None if telemetry['fmt'] is None else telemetry)
+        self.solver_settings = settings
+
+        self.problem_settings = {
+            'quadrature_degree': all_inps.pop('quadrature_degree', None),
+            'reuse_kernels': all_inps.pop('reuse_kernels', False),
+            'grid_sequencing': all_inps.pop('grid_sequencing', False)}
+
+        self.params = all_inps
+
+
+def _drop_none(settings):
+    """
+    Remove the settings that have not been given so that the defaults are
+    used.
+
+    Args:
+        settings (dict): The settings.
+
+    Returns:
+        dict: The settings that are not None.
+    """
+    return {k: v for k, v in settings.items() if v is not None}
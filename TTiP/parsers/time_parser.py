@@ -15,6 +15,15 @@ class TimeParser(SectionParser):
             The value for dt (change in time)
         max_t (float):
             The time to iterate until.
+        adaptive (dict):
+            The keyword arguments for Solver.set_adaptive (tolerance, dt_min,
+            and dt_max). None if adaptive stepping is not enabled.
+        retries (dict):
+            The keyword arguments for Solver.set_retries (max_retries and
+            regrow_after). None if steps that fail are not retried.
+        steady_stop (dict):
+            The keyword arguments for Solver.set_steady_stop (tolerance and
+            energy_rate). None if runs do not stop early at a steady state.
     """
     # pylint: disable=too-few-public-methods
 
@@ -26,6 +35,9 @@ class TimeParser(SectionParser):
         self.steps = None
         self.dt = None
         self.max_t = None
+        self.adaptive = None
+        self.retries = None
+        self.steady_stop = None
 
     def parse(self, conf):
         """
@@ -43,3 +55,19 @@ class TimeParser(SectionParser):
 
         if 'max_t' in conf:
             self.max_t = conf.getfloat('max_t')
+
+        if 'adaptive' in conf and conf.getboolean('adaptive'):
+            self.adaptive = {key: conf.getfloat(key)
+                             for key in ('tolerance', 'dt_min', 'dt_max')
+                             if key in conf}
+
+        if 'max_retries' in conf and conf.getint('max_retries'):
+            self.retries = {key: conf.getint(key)
+                            for key in ('max_retries', 'regrow_after')
+                            if key in conf}
+
+        steady_stop = {key: conf.getfloat('steady_' + key)
+                       for key in ('tolerance', 'energy_rate')
+                       if 'steady_' + key in conf}
+        if steady_stop:
+            self.steady_stop = steady_stop
@@ -38,6 +38,8 @@ class BoundaryMixin:
             These can't be worked into the variational problem directly.
         _has_boundary (bool);
             Flag that is set to true when a boundary has been set.
+        _dirichlet_surfaces (set):
+            The surfaces with dirichlet conditions ('everywhere' for all).
     """
     # pylint: disable=no-member
 
@@ -58,6 +60,7 @@ class BoundaryMixin:
 
         self.bcs = []
         self._has_boundary = None
+        self._dirichlet_surfaces = set()
 
     def add_boundary(self, boundary_type, **kwargs):
         """
@@ -111,12 +114,15 @@ class BoundaryMixin:
         if surface == 'all':
             dbc = DirichletBC(V=self.V, g=g, sub_domain="on_boundary")
             self.a += integrand * ds
+            self._dirichlet_surfaces.add('everywhere')
         else:
             dbc = DirichletBC(V=self.V, g=g, sub_domain=surface)
             try:
                 self.a += sum(integrand * ds(s) for s in surface)
+                self._dirichlet_surfaces.update(surface)
             except TypeError:
                 self.a += integrand * ds(surface)
+                self._dirichlet_surfaces.add(surface)
 
         self.bcs.append(dbc)
         self._has_boundary = True
@@ -162,6 +168,26 @@ class BoundaryMixin:
 
         self._has_boundary = True
 
+    def prune(self):
+        """
+        Remove terms that are identically zero from a and L.
+        The rows of the residual for nodes on a surface with a dirichlet
+        condition are overwritten by the condition, so any boundary integral
+        over that surface contributes nothing and is removed.
+        """
+        super().prune()
+        if not self._dirichlet_surfaces:
+            return
+
+        def on_dirichlet_surface(integral):
+            if integral.integral_type() != 'exterior_facet':
+                return False
+            return ('everywhere' in self._dirichlet_surfaces
+                    or integral.subdomain_id() in self._dirichlet_surfaces)
+
+        self._prune_integrals('dirichlet boundary',
+                              condition=on_dirichlet_surface)
+
     def set_no_boundary(self):
         """
         Declare that the problem will have no boundaries.
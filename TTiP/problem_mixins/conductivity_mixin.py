@@ -39,7 +39,7 @@ class SpitzerHarmMixin:
         self._add_function('coulomb_ln')
         self._add_function('ionisation')
 
-        self.set_function('K', self._K())
+        self.set_functions({'K': self._K()})
 
     def _K(self):
         """
@@ -35,7 +35,7 @@ class ConstantIonisationSHCMixin:
         self._add_function('C')
 
         C = 1.5 * self.electron_density * e
-        self.set_function('C', C)
+        self.set_functions({'C': C})
 
 
 class NonConstantIonisationSHCMixin:
@@ -72,4 +72,4 @@ class NonConstantIonisationSHCMixin:
         self._add_function('C')
 
         C = 1.5 * self.ionisation * self.ion_density * e
-        self.set_function('C', C)
+        self.set_functions({'C': C})
@@ -2,7 +2,8 @@
 Contains the TimeMixin class for extending problems.
 Also contains the IterationMethod class used by TimeMixin.
 """
-from firedrake import Constant, dx
+from firedrake import Constant, dx, replace
+from ufl.constantvalue import Zero
 
 from TTiP.util.logger import get_logger
 
@@ -44,6 +45,12 @@ class TimeMixin:
         steady_state (bool):
             Toggle whether solving steady state (dT/dt = 0) or time dependent
             problem.
+        method (str):
+            The iteration method that has been set (None until set_method is
+            called).
+        _unsubstituted (dict):
+            The a and L sections as they were before the iteration method was
+            substituted in. Used to build residuals for other methods.
     """
     # pylint: disable=too-many-instance-attributes, no-member
 
@@ -58,7 +65,7 @@ class TimeMixin:
         self._add_function('T')
         self._add_function('a')
 
-        self._add_function('T_')
+        self._add_function('T_', allocate=True)
         self._add_function('C')
         self._add_function('_delT')
 
@@ -69,6 +76,9 @@ class TimeMixin:
 
         self.steady_state = True
 
+        self.method = None
+        self._unsubstituted = None
+
         self.a += self._M()
 
     def set_method(self, method='BackwardEuler', **kwargs):
@@ -81,14 +91,75 @@ class TimeMixin:
             method (str, optional):
                 The method to use. Defaults to 'BackwardEuler'.
         """
+        unsubstituted = {'a': self.a, 'L': self.L}
+        self.method = method
+
         T = self.T
         iter_method = IterationMethod(self)
         substitution = iter_method.get_substitution(method, **kwargs)
-        self._update_func('T', substitution)
+        delT = (T - self.T_) * self._dt_invc
+        # The substitution must not reach the stored forms.
+        self._unsubstituted = None
+        self._update_funcs({'T': substitution, '_delT': delT})
+        self._unsubstituted = unsubstituted
         self.T = T
 
+    def method_residual(self, method, **kwargs):
+        """
+        Create the residual (a - L) for a different iteration method without
+        changing the problem.
+        This uses a and L as they were when set_method was called, so any
+        terms added after that are not included.
+
+        Args:
+            method (str):
+                The method to use.
+
+        Raises:
+            AttributeError: If set_method has not been called.
+
+        Returns:
+            Form: The residual for the given method.
+        """
+        if self._unsubstituted is None:
+            raise AttributeError('Must call set_method before creating a '
+                                 'residual for another method.')
+
+        iter_method = IterationMethod(self)
+        substitution = iter_method.get_substitution(method, **kwargs)
+
+        F = self._unsubstituted['a'] - self._unsubstituted['L']
+        F = replace(F, {self.T: substitution})
         delT = (self.T - self.T_) * self._dt_invc
-        self._update_func('_delT', delT)
+        return replace(F, {self._placeholders['_delT']: delT})
+
+    def _replace_all(self, replacements):
+        """
+        Replace terms in all of the main attributes, and in the forms stored
+        by set_method so that residuals for other methods see functions that
+        are set or allocated later.
+
+        Args:
+            replacements (dict): The terms to replace and their replacements.
+        """
+        super()._replace_all(replacements)
+        # This is called by the other initialisers before _unsubstituted
+        # exists.
+        if getattr(self, '_unsubstituted', None) is not None:
+            self._unsubstituted = {
+                name: self._replace(form, replacements)
+                for name, form in self._unsubstituted.items()}
+
+    def set_dt(self, dt):
+        """
+        Change the size of the next time step.
+        This updates the constant in place so that no forms need rebuilding.
+
+        Args:
+            dt (float): The new time step.
+        """
+        self.dt = dt
+        self._dt_invc.assign(1 / dt)
 
     def remove_timescale(self):
         """
@@ -97,6 +168,20 @@ class TimeMixin:
         self.steady_state = True
         self._dt_invc.assign(0)
 
+    def prune(self):
+        """
+        Remove terms that are identically zero from a and L.
+        When solving for the steady state the mass term is removed as 1/dt
+        is 0. The term is not restored by set_timescale so this should only
+        be called just before solving.
+        """
+        super().prune()
+        if self.steady_state:
+            self._prune_integrals(
+                'steady state mass',
+                mapping={self._dt_invc: Zero(),
+                         self._placeholders['_delT']: Zero()})
+
     def set_timescale(self, max_t=None, dt=None, steps=None):
         """
         Set the time stepping variables (max_t, dt, and number of steps).
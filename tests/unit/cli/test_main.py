@@ -52,6 +52,14 @@ class TestGetArgParser(unittest.TestCase):
         args = self.ap.parse_args(['test'])
         self.assertEqual(args.config, 'test')
 
+    def test_parsing_restart(self):
+        """
+        Test returned parser with a checkpoint to restart from.
+        """
+        args = self.ap.parse_args(['--restart', 'chk.h5', 'test'])
+        self.assertEqual(args.restart, 'chk.h5')
+        self.assertEqual(args.config, 'test')
+
     def test_multiple_config(self):
         """
         Test returned parser with 2 config files.
@@ -176,9 +184,21 @@ class TestMain(unittest.TestCase):
         with patch.object(sys, 'argv', testargs):
             with patch.object(main, 'run', self.stash_args):
                 main.main()
-        self.assertEqual(len(self.stashed_args), 2)
+        self.assertEqual(len(self.stashed_args), 3)
         self.assertIn(True, self.stashed_args)
         self.assertIn('some_conf.ini', self.stashed_args)
+        self.assertIn(None, self.stashed_args)
+
+    def test_with_restart(self):
+        """
+        Test that main passes the checkpoint into run.
+        """
+        testargs = ['prog', '--restart', 'chk.h5', 'some_conf.ini']
+        with patch.object(sys, 'argv', testargs):
+            with patch.object(main, 'run', self.stash_args):
+                main.main()
+        self.assertIn('chk.h5', self.stashed_args)
+        self.assertIn('some_conf.ini', self.stashed_args)
 
     def stash_args(self, *args, **kwargs):
         """
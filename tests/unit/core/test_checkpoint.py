@@ -0,0 +1,85 @@
+"""
+Tests for the checkpoint.py file.
+"""
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+from firedrake import FunctionSpace, SpatialCoordinate, UnitSquareMesh
+
+from TTiP.core import checkpoint
+from TTiP.core.problem import create_problem_class
+
+SimpleTimeDep = create_problem_class(time_dep=True,
+                                     sh_conductivity=False,
+                                     limit_flux=False,
+                                     limit_conductivity=False)
+
+
+class TestCheckpoint(TestCase):
+    """
+    Tests for saving and loading checkpoints.
+    """
+
+    def setUp(self):
+        """
+        Create a problem with a known state.
+        """
+        self.out_dir = TemporaryDirectory()
+        self.path = os.path.join(self.out_dir.name, 'chk.h5')
+
+        mesh = UnitSquareMesh(5, 5)
+        V = FunctionSpace(mesh, 'CG', 1)
+        self.prob = SimpleTimeDep(mesh=mesh, V=V)
+        self.prob.set_timescale(dt=0.1, steps=10)
+
+        x = SpatialCoordinate(mesh)
+        self.prob.T.interpolate(x[0] + 2 * x[1])
+        self.prob.T_.interpolate(x[0] * x[1])
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def test_load_non_existant(self):
+        """
+        Test that an error is raised when the checkpoint does not exist.
+        """
+        with self.assertRaises(ValueError):
+            checkpoint.load_checkpoint_mesh(self.path)
+
+    def test_round_trip(self):
+        """
+        Test that the state is restored into a new problem.
+        """
+        checkpoint.save_checkpoint(self.path, self.prob, t=0.3, step=3)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+        mesh = checkpoint.load_checkpoint_mesh(self.path)
+        V = FunctionSpace(mesh, 'CG', 1)
+        new_prob = SimpleTimeDep(mesh=mesh, V=V)
+        new_prob.set_timescale(dt=0.1, steps=10)
+
+        t, step, dt = checkpoint.load_checkpoint(self.path, new_prob)
+
+        self.assertAlmostEqual(t, 0.3)
+        self.assertEqual(step, 3)
+        self.assertAlmostEqual(dt, 0.1)
+
+        points = [(0.1, 0.2), (0.5, 0.5), (0.9, 0.3)]
+        self.assertTrue(np.allclose(new_prob.T.at(points),
+                                    self.prob.T.at(points)))
+        self.assertTrue(np.allclose(new_prob.T_.at(points),
+                                    self.prob.T_.at(points)))
+
+    def test_explicit_dt(self):
+        """
+        Test that a given dt is stored instead of the problem's dt.
+        """
+        checkpoint.save_checkpoint(self.path, self.prob, t=0.3, step=3,
+                                   dt=0.05)
+
+        _, _, dt = checkpoint.load_checkpoint(self.path, self.prob)
+
+        self.assertAlmostEqual(dt, 0.05)
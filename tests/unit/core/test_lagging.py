@@ -0,0 +1,136 @@
+"""
+Tests for the lagging.py file.
+"""
+from unittest import TestCase
+
+from TTiP.core.lagging import Lagging
+
+
+class FakeSNES:
+    """
+    A replacement for a PETSc SNES with settable statistics.
+    """
+
+    def __init__(self):
+        self.its = 2
+        self.ksp_its = 10
+        self.norms = [1.0, 1e-3, 1e-8]
+        self.lags = {}
+
+    def setConvergenceHistory(self, reset=False):
+        """
+        Ignore requests to record the history.
+        """
+
+    def getConvergenceHistory(self):
+        """
+        Return the history of residual norms.
+        """
+        return self.norms, []
+
+    def getIterationNumber(self):
+        """
+        Return the number of nonlinear iterations.
+        """
+        return self.its
+
+    def getLinearSolveIterations(self):
+        """
+        Return the total number of linear iterations.
+        """
+        return self.ksp_its
+
+    def setLagJacobian(self, lag):
+        """
+        Record the jacobian lag.
+        """
+        self.lags['jacobian'] = lag
+
+    def setLagPreconditioner(self, lag):
+        """
+        Record the preconditioner lag.
+        """
+        self.lags['preconditioner'] = lag
+
+
+class FakeSolver:
+    """
+    A replacement for a NonlinearVariationalSolver.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.snes = FakeSNES()
+
+
+class TestInit(TestCase):
+    """
+    Tests for the init method.
+    """
+
+    def test_invalid_lag(self):
+        """
+        Test that an error is raised for a lag of 0.
+        """
+        with self.assertRaises(ValueError):
+            Lagging(jacobian=0)
+
+    def test_disabled_parameters(self):
+        """
+        Test that no parameters are added when nothing is lagged.
+        """
+        self.assertDictEqual(Lagging().solver_parameters(), {})
+
+    def test_parameters(self):
+        """
+        Test that the lags persist across solves.
+        """
+        params = Lagging(preconditioner=-1).solver_parameters()
+        self.assertEqual(params['snes_lag_preconditioner'], -1)
+        self.assertTrue(params['snes_lag_preconditioner_persists'])
+
+
+class TestStepDone(TestCase):
+    """
+    Tests for the step_done method.
+    """
+
+    def setUp(self):
+        """
+        Create a lagging and take a first step to set the baseline.
+        """
+        self.lagging = Lagging(preconditioner=-1)
+        self.solver = FakeSolver()
+        self.lagging.step_done(self.solver)
+
+    def test_no_degradation(self):
+        """
+        Test that nothing is rebuilt if the solve has not degraded.
+        """
+        self.lagging.step_done(self.solver)
+        self.assertDictEqual(self.solver.snes.lags, {})
+
+    def test_ksp_growth(self):
+        """
+        Test that a rebuild is requested when the linear iterations grow.
+        """
+        self.solver.snes.ksp_its = 50
+        self.lagging.step_done(self.solver)
+        self.assertEqual(self.solver.snes.lags['preconditioner'], -2)
+
+    def test_slow_convergence(self):
+        """
+        Test that a rebuild is requested when the nonlinear solve slows.
+        """
+        self.solver.snes.norms = [1.0, 0.9, 0.8]
+        self.lagging.step_done(self.solver)
+        self.assertEqual(self.solver.snes.lags['jacobian'], -2)
+
+    def test_lags_restored(self):
+        """
+        Test that the configured lags are restored after the rebuild.
+        """
+        self.lagging.refresh(self.solver)
+        self.lagging.step_done(self.solver)
+        self.assertEqual(self.solver.snes.lags['jacobian'], 1)
+        self.assertEqual(self.solver.snes.lags['preconditioner'], -1)
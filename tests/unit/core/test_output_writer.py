@@ -0,0 +1,257 @@
+"""
+Tests for the output_writer.py file.
+"""
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from firedrake import Function, FunctionSpace, UnitSquareMesh
+
+from TTiP.core import output_writer
+
+
+class FakeFile:
+    """
+    A replacement for firedrake.File that records writes.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, file_path, mode='w'):
+        self.file_path = file_path
+        self.mode = mode
+        self.times = []
+
+    def write(self, *functions, **kwargs):
+        """
+        Record the time of each write.
+        """
+        # pylint: disable=unused-argument
+        self.times.append(kwargs.get('time'))
+
+
+class TestInit(TestCase):
+    """
+    Tests for the init method.
+    """
+
+    def test_multiple_options(self):
+        """
+        Test that an error is raised for more than one cadence.
+        """
+        with self.assertRaises(ValueError):
+            output_writer.OutputWriter('a.pvd', {'every': 2,
+                                                 'final_only': True})
+
+    def test_no_buffers(self):
+        """
+        Test that an error is raised for less than 1 buffer.
+        """
+        with self.assertRaises(ValueError):
+            output_writer.OutputWriter('a.pvd', {'asynchronous': True,
+                                                 'buffers': 0})
+
+    def test_unknown_option(self):
+        """
+        Test that an error is raised for an unknown option.
+        """
+        with self.assertRaises(ValueError):
+            output_writer.OutputWriter('a.pvd', {'every_step': True})
+
+    def test_single_time(self):
+        """
+        Test that a single output time is converted to a list.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'times': 0.5})
+        self.assertListEqual(writer.times, [0.5])
+
+
+# pylint: disable=protected-access
+class TestWriting(TestCase):
+    """
+    Tests for the writing methods.
+    """
+
+    def run_steps(self, writer, num_steps, dt=0.1):
+        """
+        Simulate a time loop and return the times written at.
+        """
+        with patch.object(output_writer, 'File', FakeFile):
+            writer.open()
+            writer.write_initial('u')
+            t = 0
+            for _ in range(num_steps):
+                t += dt
+                writer.step_done('u', t)
+            writer.write_final('u', t)
+        return writer._outfile.times
+
+    def test_default_every_step(self):
+        """
+        Test that every step is written by default.
+        """
+        writer = output_writer.OutputWriter('a.pvd')
+        times = self.run_steps(writer, 5)
+        self.assertEqual(len(times), 6)
+
+    def test_every(self):
+        """
+        Test that every n steps are written along with the final step.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'every': 2})
+        times = self.run_steps(writer, 5)
+        self.assertEqual(len(times), 4)
+        self.assertIsNone(times[0])
+        self.assertAlmostEqual(times[-1], 0.5)
+
+    def test_final_only(self):
+        """
+        Test that only the final step is written.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'final_only': True})
+        times = self.run_steps(writer, 5)
+        self.assertEqual(len(times), 1)
+        self.assertAlmostEqual(times[0], 0.5)
+
+    def test_interval(self):
+        """
+        Test that steps are written each time the interval passes.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'interval': 0.2})
+        times = self.run_steps(writer, 6)
+        self.assertEqual(len(times), 4)
+        self.assertAlmostEqual(times[1], 0.2)
+        self.assertAlmostEqual(times[2], 0.4)
+        self.assertAlmostEqual(times[3], 0.6)
+
+    def test_times(self):
+        """
+        Test that the given times are written.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'times': [0.3, 0.1]})
+        times = self.run_steps(writer, 5)
+        self.assertEqual(len(times), 4)
+        self.assertAlmostEqual(times[1], 0.1)
+        self.assertAlmostEqual(times[2], 0.3)
+        self.assertAlmostEqual(times[3], 0.5)
+
+
+class TestNextOutputTime(TestCase):
+    """
+    Tests for the next_output_time method.
+    """
+
+    def test_not_timed(self):
+        """
+        Test that None is returned if outputs are not timed.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'every': 3})
+        self.assertIsNone(writer.next_output_time(0.1))
+
+    def test_interval(self):
+        """
+        Test that the next multiple of the interval is returned.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'interval': 0.2})
+        self.assertAlmostEqual(writer.next_output_time(0.0), 0.2)
+        self.assertAlmostEqual(writer.next_output_time(0.3), 0.4)
+        self.assertAlmostEqual(writer.next_output_time(0.4), 0.6)
+
+    def test_times(self):
+        """
+        Test that the next listed time is returned.
+        """
+        writer = output_writer.OutputWriter('a.pvd', {'times': [0.1, 0.5]})
+        self.assertAlmostEqual(writer.next_output_time(0.0), 0.1)
+        self.assertAlmostEqual(writer.next_output_time(0.1), 0.5)
+        self.assertIsNone(writer.next_output_time(0.5))
+
+
+class TestAsynchronous(TestCase):
+    """
+    Tests for writing in a background thread.
+    """
+
+    def setUp(self):
+        """
+        Create a directory for the outputs.
+        """
+        self.out_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def run_steps(self, V, num_steps):
+        """
+        Write a changing function for a number of steps.
+        """
+        u = Function(V, name='T')
+        writer = output_writer.OutputWriter(self.file_path,
+                                            {'asynchronous': True,
+                                             'buffers': 1})
+        writer.open()
+        writer.write_initial(u)
+        for i in range(num_steps):
+            u.assign(i + 1)
+            writer.step_done(u, 0.1 * (i + 1))
+        writer.write_final(u, 0.1 * num_steps)
+        writer.close()
+
+    def test_writes_all_files(self):
+        """
+        Test that all the files are written once closed.
+        """
+        V = FunctionSpace(UnitSquareMesh(5, 5), 'CG', 1)
+        self.run_steps(V, 5)
+
+        flist = os.listdir(self.out_dir.name)
+        self.assertEqual(len(flist), 7)
+        self.assertIn('out.pvd', flist)
+        for i in range(6):
+            self.assertIn('out_{}.vtu'.format(i), flist)
+
+    def test_writes_high_order(self):
+        """
+        Test that higher order functions are written.
+        """
+        V = FunctionSpace(UnitSquareMesh(5, 5), 'CG', 2)
+        self.run_steps(V, 2)
+
+        flist = os.listdir(self.out_dir.name)
+        self.assertEqual(len(flist), 4)
+
+    def test_error_raised_on_close(self):
+        """
+        Test that errors in the background thread are raised.
+        """
+        V = FunctionSpace(UnitSquareMesh(5, 5), 'CG', 1)
+        writer = output_writer.OutputWriter(self.file_path,
+                                            {'asynchronous': True})
+        writer.open()
+
+        def fail(*args, **kwargs):
+            raise IOError('Disk full.')
+
+        with patch.object(writer, '_write_now', fail):
+            writer.write_initial(Function(V))
+            with self.assertRaises(RuntimeError):
+                writer.close()
+
+    def test_error_logged_on_close(self):
+        """
+        Test that errors in the background thread are only logged if
+        requested.
+        """
+        V = FunctionSpace(UnitSquareMesh(5, 5), 'CG', 1)
+        writer = output_writer.OutputWriter(self.file_path,
+                                            {'asynchronous': True})
+        writer.open()
+
+        def fail(*args, **kwargs):
+            raise IOError('Disk full.')
+
+        with patch.object(writer, '_write_now', fail):
+            writer.write_initial(Function(V))
+            with self.assertLogs(output_writer.LOGGER, 'ERROR'):
+                writer.close(raise_error=False)
@@ -6,8 +6,8 @@ No tests for init, _A, _f as these just declare something.
 from unittest import TestCase
 from unittest.mock import patch
 
-from firedrake import (Function, FunctionSpace, SpatialCoordinate,
-                       UnitCubeMesh, as_tensor, dx)
+from firedrake import (BoxMesh, Constant, Function, FunctionSpace,
+                       SpatialCoordinate, UnitCubeMesh, as_tensor, dx)
 
 from TTiP.core import problem
 from TTiP.problem_mixins.boundaries_mixin import BoundaryMixin
@@ -116,15 +116,15 @@ class TestSetFunction(TestCase):
 
     def test_correct_call(self):
         """
-        Test that the correct values are passed to _update_func.
+        Test that the correct values are passed to _update_funcs.
         """
         self.prob._functions = ['foo']
 
-        with patch.object(self.prob, '_update_func', self.stash_args):
+        with patch.object(self.prob, '_update_funcs', self.stash_args):
             self.prob.set_function('foo', 3)
 
-        self.assertTupleEqual(self.args, ())
-        self.assertDictEqual(self.kwargs, {'name': 'foo', 'val': 3})
+        self.assertTupleEqual(self.args, ({'foo': 3},))
+        self.assertDictEqual(self.kwargs, {})
 
     def stash_args(self, *args, **kwargs):
         """
@@ -134,6 +134,247 @@ class TestSetFunction(TestCase):
         self.kwargs = kwargs
 
 
+class TestSetFunctions(TestCase):
+    """
+    Tests for the set_functions method.
+    """
+    def setUp(self):
+        """
+        Create a blank problem.
+        """
+        self.mesh = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+
+        self.prob = problem.Problem(mesh=self.mesh, V=self.V)
+
+    def test_unknown_function(self):
+        """
+        Test that an exception is raised if a name is not a function.
+        """
+        with self.assertRaises(AttributeError):
+            self.prob.set_functions({'S': Constant(1), 'foo': Constant(2)})
+
+    def test_ignore_unknown(self):
+        """
+        Test that unknown names are skipped and returned when ignored.
+        """
+        S = Function(self.V)
+        ignored = self.prob.set_functions({'S': S, 'foo': Constant(2)},
+                                          ignore_unknown=True)
+
+        self.assertListEqual(ignored, ['foo'])
+        self.assertEqual(self.prob.L, S * self.prob.v * dx)
+
+    def test_sets_all_functions(self):
+        """
+        Test that every function in the mapping is replaced.
+        """
+        # pylint: disable=no-member
+        S = Function(self.V)
+        K = Function(self.V)
+        self.prob.set_functions({'S': S, 'K': K})
+
+        self.assertEqual(self.prob.S, S)
+        self.assertEqual(self.prob.K, K)
+        self.assertEqual(self.prob.L, S * self.prob.v * dx)
+
+    def test_single_traversal_per_attribute(self):
+        """
+        Test that the number of traversals does not grow with the number of
+        functions set.
+        """
+        start = self.prob.replace_traversals
+        self.prob.set_functions({'S': Function(self.V)})
+        single = self.prob.replace_traversals - start
+
+        start = self.prob.replace_traversals
+        self.prob.set_functions({'S': Function(self.V),
+                                 'K': Function(self.V),
+                                 'atomic_number': Function(self.V)})
+        multiple = self.prob.replace_traversals - start
+
+        self.assertEqual(single, multiple)
+
+
+class TestAssignFunctions(TestCase):
+    """
+    Tests for the assign_functions method.
+    """
+    def setUp(self):
+        """
+        Create a blank problem.
+        """
+        self.mesh = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+
+        self.prob = problem.Problem(mesh=self.mesh, V=self.V)
+
+    def test_keeps_placeholder(self):
+        """
+        Test that the value is copied into the placeholder.
+        """
+        # pylint: disable=no-member
+        self.prob.assign_functions({'S': Constant(2)})
+        S = self.prob.S
+
+        self.assertIsInstance(S, Function)
+        self.assertEqual(self.prob.L, S * self.prob.v * dx)
+        self.assertAlmostEqual(S.dat.data.min(), 2)
+
+    def test_matching_signatures(self):
+        """
+        Test that problems with different values have the same signature.
+        """
+        other = problem.Problem(mesh=self.mesh, V=self.V)
+        self.prob.assign_functions({'S': Constant(2)})
+        other.assign_functions({'S': Constant(3)})
+
+        self.assertEqual(self.prob.L.signature(), other.L.signature())
+
+    def test_replaces_zero_constant(self):
+        """
+        Test that zero constants are replaced so they can be pruned.
+        """
+        # pylint: disable=no-member
+        zero = Constant(0)
+        self.prob.assign_functions({'S': zero})
+        self.assertEqual(self.prob.S, zero)
+
+    def test_unknown_function(self):
+        """
+        Test that an exception is raised if a name is not a function.
+        """
+        with self.assertRaises(AttributeError):
+            self.prob.assign_functions({'foo': Constant(2)})
+
+
+class TestGetFunction(TestCase):
+    """
+    Tests for the get_function method.
+    """
+    def setUp(self):
+        """
+        Create a blank problem.
+        """
+        self.mesh = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+
+        self.prob = problem.Problem(mesh=self.mesh, V=self.V)
+
+    def test_placeholder_not_allocated(self):
+        """
+        Test that placeholders are not functions until needed.
+        """
+        # pylint: disable=no-member
+        self.assertNotIsInstance(self.prob.S, Function)
+        self.assertIsInstance(self.prob.T, Function)
+
+    def test_allocates(self):
+        """
+        Test that the placeholder is replaced by a function everywhere.
+        """
+        S = self.prob.get_function('S')
+
+        self.assertIsInstance(S, Function)
+        self.assertEqual(self.prob.L, S * self.prob.v * dx)
+
+    def test_allocates_once(self):
+        """
+        Test that repeated calls return the same function.
+        """
+        S = self.prob.get_function('S')
+        self.assertIs(self.prob.get_function('S'), S)
+
+
+class TestAllocatePlaceholders(TestCase):
+    """
+    Tests for the allocate_placeholders method.
+    """
+    def setUp(self):
+        """
+        Create a blank problem.
+        """
+        self.mesh = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+
+        self.prob = problem.Problem(mesh=self.mesh, V=self.V)
+
+    def test_allocates_form(self):
+        """
+        Test that all coefficients in the form are functions.
+        """
+        form = self.prob.allocate_placeholders(self.prob.a - self.prob.L)
+        for coefficient in form.coefficients():
+            self.assertIsInstance(coefficient, Function)
+
+    def test_only_allocates_form(self):
+        """
+        Test that placeholders not in the form are not allocated.
+        """
+        # pylint: disable=no-member
+        self.prob.allocate_placeholders(self.prob.L)
+        self.assertIsInstance(self.prob.S, Function)
+        self.assertNotIsInstance(self.prob.atomic_number, Function)
+
+
+class TestMemoryReport(TestCase):
+    """
+    Tests for the memory_report method.
+    """
+
+    def test_saved_bytes(self):
+        """
+        Test that the report counts unallocated placeholders on a box mesh.
+        """
+        mesh = BoxMesh(4, 4, 4, 1, 1, 1)
+        V = FunctionSpace(mesh, 'CG', 1)
+        prob = problem.Problem(mesh=mesh, V=V)
+
+        report = prob.memory_report()
+        nbytes = V.dim() * 8
+
+        self.assertEqual(report['allocated'], 1)
+        self.assertEqual(report['allocated_bytes'], nbytes)
+        self.assertGreater(report['placeholders'], 0)
+        self.assertEqual(report['saved_bytes'],
+                         report['placeholders'] * nbytes)
+
+
+class TestUpdateTime(TestCase):
+    """
+    Tests for the update_time method.
+    """
+
+    def test_updates_series(self):
+        """
+        Test that every added time series is updated to the time.
+        """
+        mesh = UnitCubeMesh(2, 2, 2)
+        V = FunctionSpace(mesh, 'CG', 1)
+        prob = problem.Problem(mesh=mesh, V=V)
+
+        class Series:
+            """
+            A time series that records the times it is updated to.
+            """
+            # pylint: disable=too-few-public-methods
+            def __init__(self):
+                self.times = []
+
+            def update(self, t):
+                """
+                Record the time.
+                """
+                self.times.append(t)
+
+        series = [Series(), Series()]
+        for s in series:
+            prob.add_time_series(s)
+        prob.update_time(0.5)
+
+        self.assertEqual([s.times for s in series], [[0.5], [0.5]])
+
+
 class TestAddFunction(TestCase):
     """
     Tests for the _add_function method.
@@ -322,6 +563,111 @@ class TestBound(TestCase):
         self.assertAlmostEqual(self.prob.test_func[1]([0.6, 0.1, 0.1]), 1.45)
 
 
+class TestLimitQuadrature(TestCase):
+    """
+    Tests for the limit_quadrature method.
+    """
+
+    def setUp(self):
+        """
+        Create a problem with a high degree integrand.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.problem = problem.Problem(m, V)
+        T = Function(V)
+        self.form = pow(T, 5 / 2) * self.problem.v * dx
+
+    def test_auto_cap(self):
+        """
+        Test the degree is capped from the element order by default.
+        """
+        form = self.problem.limit_quadrature(self.form)
+        degrees = [i.metadata()['quadrature_degree']
+                   for i in form.integrals()]
+        self.assertListEqual(degrees, [3])
+
+    def test_set_degree(self):
+        """
+        Test the degree is capped at the set degree.
+        """
+        self.problem.set_quadrature_degree(2)
+        form = self.problem.limit_quadrature(self.form)
+        degrees = [i.metadata()['quadrature_degree']
+                   for i in form.integrals()]
+        self.assertListEqual(degrees, [2])
+
+    def test_low_degree_unchanged(self):
+        """
+        Test integrals below the cap keep their estimated degree.
+        """
+        form = self.problem.limit_quadrature(self.problem.v * dx)
+        degrees = [i.metadata()['quadrature_degree']
+                   for i in form.integrals()]
+        self.assertListEqual(degrees, [1])
+
+    def test_logs_truncation_once(self):
+        """
+        Test truncating the degree from the automatic cap is only logged
+        once, at debug level.
+        """
+        with patch.object(problem.LOGGER, 'debug') as mock_debug:
+            with patch.object(problem.LOGGER, 'warning') as mock_warning:
+                self.problem.limit_quadrature(self.form)
+                self.problem.limit_quadrature(self.form)
+        mock_debug.assert_called_once()
+        mock_warning.assert_not_called()
+
+    def test_warns_when_truncating_set_degree(self):
+        """
+        Test a warning is logged when the degree is truncated by a degree the
+        user has set.
+        """
+        self.problem.set_quadrature_degree(2)
+        with patch.object(problem.LOGGER, 'warning') as mock_warning:
+            self.problem.limit_quadrature(self.form)
+        mock_warning.assert_called_once()
+
+    def test_negative_degree(self):
+        """
+        Test a negative degree raises an error.
+        """
+        with self.assertRaises(ValueError):
+            self.problem.set_quadrature_degree(-1)
+
+
+class TestPrune(TestCase):
+    """
+    Tests for the prune method.
+    """
+
+    def setUp(self):
+        """
+        Create a problem.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.problem = problem.Problem(m, V)
+
+    def test_removes_zero_source(self):
+        """
+        Test a zero constant source is removed.
+        """
+        self.problem.set_function('S', Constant(0))
+        self.problem.prune()
+        self.assertEqual(len(self.problem.L.integrals()), 0)
+
+    def test_keeps_non_zero_source(self):
+        """
+        Test a non zero constant source is kept.
+        """
+        self.problem.set_function('S', Constant(1))
+        self.problem.prune()
+        self.assertEqual(len(self.problem.L.integrals()), 1)
+
+
 class TestMin(TestCase):
     """
     Tests for the _min method.
@@ -430,6 +776,20 @@ class TestCreateProblemClass(TestCase):
     Tests for thecreate_problem_class_method.
     """
 
+    def test_memoized(self):
+        """
+        Test that the same class is returned for the same flags.
+        """
+        klass = problem.create_problem_class(time_dep=True)
+        self.assertIs(klass, problem.create_problem_class(True))
+
+    def test_not_shared(self):
+        """
+        Test that different flags return different classes.
+        """
+        klass = problem.create_problem_class(time_dep=True)
+        self.assertIsNot(klass, problem.create_problem_class(time_dep=False))
+
     def test_is_problem(self):
         """
         Test that the returned class is a subclass of Problem.
@@ -1,14 +1,20 @@
 """
 Tests for the solver.py file.
 """
+import json
 import os
 import unittest
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import numpy as np
-from firedrake import (Constant, FunctionSpace, SpatialCoordinate,
-                       UnitCubeMesh, UnitIntervalMesh, pi, sin)
+from firedrake import (Constant, ConvergenceError, FunctionSpace,
+                       MeshHierarchy, NonlinearVariationalSolver,
+                       SpatialCoordinate, UnitCubeMesh, UnitIntervalMesh,
+                       UnitSquareMesh, pi, sin)
 
+from TTiP.core.checkpoint import load_checkpoint_mesh
+from TTiP.core.output_writer import OutputWriter
 from TTiP.core.problem import create_problem_class
 from TTiP.core.solver import Solver
 
@@ -89,6 +95,81 @@ class TestSolve(unittest.TestCase):
         for i in range(num_steps):
             self.assertIn('out_{}.vtu'.format(i), flist)
 
+    def test_creates_files_output_every(self):
+        """
+        Test that the solve method only writes the requested steps and the
+        final step.
+        """
+        prob = SimpleTimeDep(mesh=self.m, V=self.V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.set_no_boundary()
+        prob.set_timescale(steps=5, dt=0.1)
+        prob.set_method('BackwardEuler')
+
+        solver = Solver(prob)
+        solver.set_output(every=2)
+        solver.u.assign(10)
+        solver.solve(file_path=file_path)
+
+        flist = os.listdir(self.out_dir.name)
+
+        # Initial value, steps 2 and 4, final step, and pvd.
+        self.assertEqual(len(flist), 5)
+
+    def test_creates_files_final_only(self):
+        """
+        Test that the solve method only writes the final step.
+        """
+        prob = SimpleTimeDep(mesh=self.m, V=self.V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.set_no_boundary()
+        prob.set_timescale(steps=5, dt=0.1)
+        prob.set_method('BackwardEuler')
+
+        solver = Solver(prob)
+        solver.set_output(final_only=True)
+        solver.u.assign(10)
+        solver.solve(file_path=file_path)
+
+        flist = os.listdir(self.out_dir.name)
+
+        self.assertEqual(len(flist), 2)
+        self.assertIn('out.pvd', flist)
+        self.assertIn('out_0.vtu', flist)
+
+    def test_telemetry(self):
+        """
+        Test that the solve method records telemetry for each step.
+        """
+        prob = SimpleTimeDep(mesh=self.m, V=self.V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.set_no_boundary()
+        prob.set_timescale(steps=5, dt=0.1)
+        prob.set_method('BackwardEuler')
+
+        solver = Solver(prob)
+        solver.set_telemetry(fmt='jsonl')
+        solver.u.assign(10)
+        solver.solve(file_path=file_path)
+
+        telemetry_path = os.path.join(self.out_dir.name, 'out_telemetry.jsonl')
+        with open(telemetry_path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+
+        self.assertEqual(len(rows), 5)
+        self.assertAlmostEqual(rows[-1]['time'], 0.5)
+        self.assertGreater(rows[-1]['snes_its'], 0)
+        self.assertGreaterEqual(rows[-1]['assemble_time'], 0)
+
     def test_steady_state_result_uniform(self):
         """
         Test that the solve creates a correct uniform result for a simple
@@ -115,6 +196,127 @@ class TestSolve(unittest.TestCase):
         value = solver.u.at(coords)
         self.assertTrue(np.isclose(value, expected).all())
 
+    def test_steady_state_pseudo_transient_result_uniform(self):
+        """
+        Test that pseudo transient continuation reaches the same uniform
+        result for a simple steady state problem.
+        """
+        prob = SimpleSteadyState(mesh=self.m, V=self.V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('C', Constant(1))
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.add_boundary('dirichlet', g=10, surface='all')
+
+        solver = Solver(prob)
+        solver.set_pseudo_transient(dt=0.01)
+        solver.u.assign(100)
+        solver.solve(file_path=file_path)
+
+        coords = [[i/10, j/10, k/10]
+                  for i in range(11)
+                  for j in range(11)
+                  for k in range(11)]
+
+        value = solver.u.at(coords)
+        self.assertTrue(np.isclose(value, 10).all())
+
+    def test_pseudo_transient_residual_quadrature(self):
+        """
+        Test that the pseudo transient residual norm is assembled with a
+        capped quadrature degree.
+        """
+        prob = SimpleSteadyState(mesh=self.m, V=self.V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('C', Constant(1))
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.add_boundary('dirichlet', g=10, surface='all')
+
+        solver = Solver(prob)
+        solver.set_pseudo_transient(dt=0.01, max_steps=1)
+        forms = []
+        original_norm = Solver._residual_norm
+
+        def residual_norm(slv, F):
+            forms.append(F)
+            return original_norm(slv, F)
+
+        with patch.object(Solver, '_residual_norm', residual_norm):
+            solver.solve(file_path=file_path)
+
+        self.assertTrue(forms)
+        for F in forms:
+            for integral in F.integrals():
+                self.assertIn('quadrature_degree', integral.metadata())
+
+    def test_steady_state_grid_sequence_result_uniform(self):
+        """
+        Test that solving on coarse meshes first gives the same uniform
+        result for a simple steady state problem.
+        """
+        hierarchy = MeshHierarchy(UnitSquareMesh(4, 4), 2)
+        problems = []
+        for m in hierarchy:
+            prob = SimpleSteadyState(mesh=m, V=FunctionSpace(m, 'CG', 1))
+            prob.set_function('K', Constant(1))
+            prob.set_function('S', Constant(0))
+            prob.add_boundary('dirichlet', g=10, surface='all')
+            prob.T.assign(100)
+            problems.append(prob)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        solver = Solver(problems[-1])
+        solver.set_grid_sequence(problems[:-1])
+        solver.solve(file_path=file_path)
+
+        coords = [[i/10, j/10] for i in range(11) for j in range(11)]
+        self.assertTrue(np.isclose(solver.u.at(coords), 10).all())
+
+    def test_steady_state_gmg_result_uniform(self):
+        """
+        Test that geometric multigrid gives the correct uniform result for a
+        simple steady state problem.
+        """
+        m = MeshHierarchy(UnitSquareMesh(8, 8), 2)[-1]
+        prob = SimpleSteadyState(mesh=m, V=FunctionSpace(m, 'CG', 1))
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.add_boundary('dirichlet', g=10, surface='all')
+
+        solver = Solver(prob)
+        solver.set_preset('gmg')
+        solver.u.assign(100)
+        solver.solve(file_path=file_path)
+
+        coords = [[i/10, j/10] for i in range(11) for j in range(11)]
+        self.assertTrue(np.isclose(solver.u.at(coords), 10).all())
+
+    def test_steady_state_p1_preconditioner_result_uniform(self):
+        """
+        Test that preconditioning a high order problem on P1 gives the
+        correct uniform result.
+        """
+        m = UnitSquareMesh(10, 10)
+        prob = SimpleSteadyState(mesh=m, V=FunctionSpace(m, 'CG', 3))
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.add_boundary('dirichlet', g=10, surface='all')
+
+        solver = Solver(prob)
+        solver.set_preset('amg-p1')
+        solver.u.assign(100)
+        solver.solve(file_path=file_path)
+
+        coords = [[i/10, j/10] for i in range(11) for j in range(11)]
+        self.assertTrue(np.isclose(solver.u.at(coords), 10).all())
+
     def test_time_dependant_result_sine(self):
         """
         Test that the solve creates a correct result for a time
@@ -159,6 +361,450 @@ class TestSolve(unittest.TestCase):
             print(expected)
             self.assertTrue(np.isclose(value, expected).all())
 
+    def test_lagged_preconditioner_result_sine(self):
+        """
+        Test that reusing the preconditioner across steps gives a correct
+        result for the sine wave problem.
+        """
+        m = UnitIntervalMesh(500)
+        V = FunctionSpace(m, 'CG', 2)
+
+        prob = SimpleTimeDep(mesh=m, V=V)
+        file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        prob.set_function('C', Constant(1))
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.set_timescale(steps=100, dt=0.00001)
+        prob.add_boundary('dirichlet', g=0, surface='all')
+
+        x = SpatialCoordinate(m)
+        prob.T.interpolate(10*sin(x[0]*pi*3))
+
+        prob.set_method('CrankNicolson')
+        solver = Solver(prob)
+        solver.set_lagging(preconditioner=-1)
+        solver.solve(file_path=file_path)
+
+        coords = np.array([i/10 for i in range(11)])
+        expected = 10*np.sin(3*np.pi*coords) * np.exp(-np.pi*np.pi*9*0.001)
+        self.assertTrue(np.isclose(solver.u.at(coords), expected).all())
+
+
+class TestSolveAdaptive(unittest.TestCase):
+    """
+    Tests for the solve method with adaptive time stepping.
+    """
+
+    def setUp(self):
+        """
+        Setup a 1D sine wave problem.
+
+        T(x,0) = 10*sin(3*pi*x)
+        T(0,t) = T(1,t) = 0
+        """
+        self.out_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        m = UnitIntervalMesh(500)
+        V = FunctionSpace(m, 'CG', 2)
+
+        self.prob = SimpleTimeDep(mesh=m, V=V)
+        self.prob.set_function('C', Constant(1))
+        self.prob.set_function('K', Constant(1))
+        self.prob.set_function('S', Constant(0))
+        self.prob.set_timescale(max_t=0.001, dt=0.00001)
+        self.prob.add_boundary('dirichlet', g=0, surface='all')
+
+        x = SpatialCoordinate(m)
+        self.prob.T_.interpolate(10*sin(x[0]*pi*3))
+        self.prob.T.assign(self.prob.T_)
+
+        self.prob.set_method('CrankNicolson')
+        self.solver = Solver(self.prob)
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def test_result_sine(self):
+        """
+        Test that the adaptive solve creates a correct result.
+
+        Analytic solution: T(x, t) = 10*sin(3*pi*x)*exp(-pi*pi*9*t)
+        """
+        self.solver.set_adaptive(tolerance=1e-4)
+        self.solver.solve(file_path=self.file_path)
+
+        coords = np.array([i/10 for i in range(11)])
+        expected = 10*np.sin(3*np.pi*coords) * np.exp(-np.pi*np.pi*9*0.001)
+        value = self.solver.u.at(coords)
+        self.assertTrue(np.isclose(value, expected, atol=1e-3).all())
+
+    def test_grows_step(self):
+        """
+        Test that the step size grows for a smooth decay.
+        """
+        self.solver.set_adaptive(tolerance=1e-2)
+        self.solver.solve(file_path=self.file_path)
+
+        flist = os.listdir(self.out_dir.name)
+        self.assertLess(len(flist), self.prob.steps + 2)
+
+    def test_respects_dt_max(self):
+        """
+        Test that the step never grows past dt_max.
+        """
+        self.solver.set_adaptive(tolerance=1e-2, dt_max=0.00002)
+        self.solver.solve(file_path=self.file_path)
+
+        self.assertLessEqual(self.prob.dt, 0.00002)
+        flist = os.listdir(self.out_dir.name)
+        self.assertGreaterEqual(len(flist), 52)
+
+    def test_unset_source(self):
+        """
+        Test that the error estimate uses placeholders that are allocated or
+        set after the method.
+        """
+        m = self.prob.mesh
+        prob = SimpleTimeDep(mesh=m, V=self.prob.V)
+        prob.set_function('C', Constant(1))
+        prob.set_timescale(max_t=0.001, dt=0.00001)
+        prob.add_boundary('dirichlet', g=0, surface='all')
+        prob.T_.assign(self.prob.T_)
+        prob.T.assign(prob.T_)
+        prob.set_method('CrankNicolson')
+        prob.set_function('K', Constant(1))
+
+        solver = Solver(prob)
+        solver.set_adaptive(tolerance=1e-4)
+        solver.solve(file_path=self.file_path)
+
+        coords = np.array([i/10 for i in range(11)])
+        expected = 10*np.sin(3*np.pi*coords) * np.exp(-np.pi*np.pi*9*0.001)
+        value = solver.u.at(coords)
+        self.assertTrue(np.isclose(value, expected, atol=1e-3).all())
+
+
+class TestSolveRetries(unittest.TestCase):
+    """
+    Tests for retrying steps in the solve method.
+    """
+
+    def setUp(self):
+        """
+        Setup a simple time dependent problem and a solve that diverges on
+        the given calls.
+        """
+        self.out_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        m = UnitIntervalMesh(50)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.prob = SimpleTimeDep(mesh=m, V=V)
+        self.prob.set_function('C', Constant(1))
+        self.prob.set_function('K', Constant(1))
+        self.prob.set_function('S', Constant(0))
+        self.prob.set_timescale(steps=10, dt=0.001)
+        self.prob.add_boundary('dirichlet', g=0, surface='all')
+        self.prob.set_method('BackwardEuler')
+
+        self.solver = Solver(self.prob)
+        self.solver.u.assign(10)
+
+        self.fail_on = []
+        self.calls = 0
+        self.dts = []
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def run_solve(self):
+        """
+        Run the solve, diverging on the calls listed in self.fail_on.
+        """
+        original_solve = NonlinearVariationalSolver.solve
+
+        def fake_solve(nl_solver):
+            self.calls += 1
+            self.dts.append(self.prob.dt)
+            if self.calls in self.fail_on:
+                raise ConvergenceError('Fake divergence.')
+            original_solve(nl_solver)
+
+        with patch.object(NonlinearVariationalSolver, 'solve', fake_solve):
+            self.solver.solve(file_path=self.file_path)
+
+    def test_no_retries_raises(self):
+        """
+        Test that divergence is raised if retries are not enabled.
+        """
+        self.fail_on = [2]
+        with self.assertRaises(ConvergenceError):
+            self.run_solve()
+
+    def test_divergence_not_hidden_by_output_error(self):
+        """
+        Test that divergence is raised even if the background writer failed.
+        """
+        self.fail_on = [2]
+        # Only the initial state is written before the divergence.
+        self.solver.set_output(every=2, asynchronous=True)
+
+        def fail(*args, **kwargs):
+            raise IOError('Disk full.')
+
+        with patch.object(OutputWriter, '_write_now', fail):
+            with self.assertRaises(ConvergenceError):
+                self.run_solve()
+
+    def test_retry_halves_dt(self):
+        """
+        Test that a diverged step is retried with half the step.
+        """
+        self.fail_on = [2]
+        self.solver.set_retries(max_retries=2, regrow_after=100)
+        self.run_solve()
+
+        self.assertAlmostEqual(self.dts[1], 0.001)
+        self.assertAlmostEqual(self.dts[2], 0.0005)
+        self.assertAlmostEqual(sum(self.dts) - self.dts[1], 0.01)
+
+    def test_too_many_retries_raises(self):
+        """
+        Test that divergence is raised once the retries are used up.
+        """
+        self.fail_on = [2, 3, 4]
+        self.solver.set_retries(max_retries=2)
+        with self.assertRaises(ConvergenceError):
+            self.run_solve()
+
+    def test_regrows_dt(self):
+        """
+        Test that dt grows back to the configured value.
+        """
+        self.fail_on = [1]
+        self.solver.set_retries(max_retries=1, regrow_after=2)
+        self.run_solve()
+
+        self.assertAlmostEqual(self.dts[1], 0.0005)
+        self.assertAlmostEqual(self.dts[3], 0.001)
+        self.assertAlmostEqual(self.prob.dt, 0.001)
+
+
+class TestSolveSteadyStop(unittest.TestCase):
+    """
+    Tests for stopping the time loop at a steady state.
+    """
+
+    def setUp(self):
+        """
+        Create a simple time dependant problem.
+        """
+        self.out_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.out_dir.name, 'out.pvd')
+
+        m = UnitIntervalMesh(50)
+        self.prob = SimpleTimeDep(mesh=m, V=FunctionSpace(m, 'CG', 1))
+        self.prob.set_function('C', Constant(1))
+        self.prob.set_function('K', Constant(1))
+        self.prob.set_function('S', Constant(0))
+        self.prob.set_timescale(steps=10, dt=0.001)
+        self.prob.set_no_boundary()
+        self.prob.set_method('BackwardEuler')
+
+        self.solver = Solver(self.prob)
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def test_stops_at_steady_state(self):
+        """
+        Test that a run that starts at a steady state stops after one step.
+        """
+        self.prob.T.assign(10)
+        self.solver.set_steady_stop(tolerance=1e-6, energy_rate=1e-3)
+        self.solver.solve(file_path=self.file_path)
+
+        # Initial value, first step, and pvd.
+        self.assertEqual(len(os.listdir(self.out_dir.name)), 3)
+
+    def test_continues_when_changing(self):
+        """
+        Test that a run that is still changing is not stopped.
+        """
+        x = SpatialCoordinate(self.prob.mesh)
+        self.prob.T.interpolate(10 + sin(x[0]*pi))
+        self.solver.set_steady_stop(tolerance=1e-12)
+        self.solver.solve(file_path=self.file_path)
+
+        self.assertEqual(len(os.listdir(self.out_dir.name)), 12)
+
+    def test_steady_check_quadrature(self):
+        """
+        Test that the forms for the steady state check are assembled with
+        the capped quadrature degree.
+        """
+        # pylint: disable=protected-access
+        self.prob.T.assign(10)
+        with patch.object(self.prob, 'limit_quadrature',
+                          wraps=self.prob.limit_quadrature) as mock_limit:
+            self.solver._thermal_energy()
+            self.solver._relative_difference(self.prob.T, self.prob.T_)
+
+        # The energy and both norms of the change.
+        self.assertEqual(mock_limit.call_count, 3)
+
+
+class TestSolveRestart(unittest.TestCase):
+    """
+    Tests for checkpointing and restarting in the solve method.
+    """
+
+    def setUp(self):
+        """
+        Create a directory for the outputs.
+        """
+        self.out_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.out_dir.name, 'out.pvd')
+        self.chk_path = os.path.join(self.out_dir.name, 'chk.h5')
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    @staticmethod
+    def make_solver(mesh):
+        """
+        Create a solver for a simple problem on the given mesh.
+        """
+        V = FunctionSpace(mesh, 'CG', 1)
+        prob = SimpleTimeDep(mesh=mesh, V=V)
+        prob.set_function('C', Constant(1))
+        prob.set_function('K', Constant(1))
+        prob.set_function('S', Constant(0))
+        prob.set_timescale(steps=10, dt=0.001)
+        prob.add_boundary('dirichlet', g=0, surface='all')
+        prob.set_method('BackwardEuler')
+        prob.T.assign(10)
+
+        return Solver(prob)
+
+    def test_restart_matches_full_run(self):
+        """
+        Test that a run interrupted after a checkpoint and restarted gives the
+        same result as an uninterrupted run.
+        """
+        full = self.make_solver(UnitIntervalMesh(50))
+        full.solve(file_path=self.file_path)
+
+        interrupted = self.make_solver(UnitIntervalMesh(50))
+        interrupted.set_checkpointing(every=5, path=self.chk_path)
+
+        original_solve = NonlinearVariationalSolver.solve
+        calls = []
+
+        def fake_solve(nl_solver):
+            calls.append(1)
+            if len(calls) == 7:
+                raise ConvergenceError('Fake divergence.')
+            original_solve(nl_solver)
+
+        with patch.object(NonlinearVariationalSolver, 'solve', fake_solve):
+            with self.assertRaises(ConvergenceError):
+                interrupted.solve(file_path=self.file_path)
+
+        restarted = self.make_solver(load_checkpoint_mesh(self.chk_path))
+        restarted.load_checkpoint(self.chk_path)
+        restarted.solve(file_path=self.file_path)
+
+        coords = [i/10 for i in range(11)]
+        self.assertTrue(np.allclose(restarted.u.at(coords),
+                                    full.u.at(coords)))
+
+    def test_restart_with_output_interval(self):
+        """
+        Test that a restart from a checkpoint written after a step shortened
+        to land on an output time continues with the full step size.
+        """
+        full = self.make_solver(UnitIntervalMesh(50))
+        full.set_output(interval=0.0015)
+        full.solve(file_path=self.file_path)
+
+        interrupted = self.make_solver(UnitIntervalMesh(50))
+        interrupted.set_output(interval=0.0015)
+        # The second step is shortened to 0.0005 to land on t=0.0015.
+        interrupted.set_checkpointing(every=2, path=self.chk_path)
+
+        original_solve = NonlinearVariationalSolver.solve
+        calls = []
+
+        def fake_solve(nl_solver):
+            calls.append(1)
+            if len(calls) == 4:
+                raise ConvergenceError('Fake divergence.')
+            original_solve(nl_solver)
+
+        with patch.object(NonlinearVariationalSolver, 'solve', fake_solve):
+            with self.assertRaises(ConvergenceError):
+                interrupted.solve(file_path=self.file_path)
+
+        restarted = self.make_solver(load_checkpoint_mesh(self.chk_path))
+        restarted.set_output(interval=0.0015)
+        restarted.load_checkpoint(self.chk_path)
+        self.assertAlmostEqual(restarted._start[2], 0.001)
+        restarted.solve(file_path=self.file_path)
+
+        coords = [i/10 for i in range(11)]
+        self.assertTrue(np.allclose(restarted.u.at(coords),
+                                    full.u.at(coords)))
+
+    def test_restart_steady_state(self):
+        """
+        Test that steady state problems can't be restarted.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        prob = SimpleSteadyState(mesh=m, V=FunctionSpace(m, 'CG', 1))
+        solver = Solver(prob)
+        with self.assertRaises(ValueError):
+            solver.load_checkpoint(self.chk_path)
+
+
+class TestSetPreset(unittest.TestCase):
+    """
+    Tests for the set_preset method.
+    """
+
+    def setUp(self):
+        """
+        Create a solver for a small problem.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        prob = SimpleSteadyState(mesh=m, V=FunctionSpace(m, 'CG', 1))
+        self.solver = Solver(prob)
+
+    def test_default(self):
+        """
+        Test that the default preset is used if none is set.
+        """
+        self.assertEqual(self.solver.preset, 'amg-matfree')
+        self.assertEqual(self.solver.params['mat_type'], 'matfree')
+
+    def test_overrides(self):
+        """
+        Test that overrides are applied on top of the preset.
+        """
+        self.solver.set_preset('direct-mumps', overrides={'ksp_rtol': 1e-8})
+        self.assertEqual(self.solver.params['pc_type'], 'lu')
+        self.assertEqual(self.solver.params['ksp_rtol'], 1e-8)
+
+    def test_auto(self):
+        """
+        Test that auto chooses a preset for the problem.
+        """
+        self.solver.set_preset('auto')
+        self.assertEqual(self.solver.preset, 'direct-mumps')
+
 
 class TestIsSteadyState(unittest.TestCase):
     """
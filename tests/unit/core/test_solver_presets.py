@@ -0,0 +1,75 @@
+"""
+Tests for the solver_presets.py file.
+"""
+from unittest import TestCase
+
+from firedrake import (FunctionSpace, MeshHierarchy, UnitCubeMesh,
+                       UnitSquareMesh)
+
+from TTiP.core import solver_presets
+
+
+class TestGetPreset(TestCase):
+    """
+    Tests for the get_preset function.
+    """
+
+    def test_unknown_preset(self):
+        """
+        Test that an error is raised for an unknown preset.
+        """
+        with self.assertRaises(ValueError):
+            solver_presets.get_preset('fastest')
+
+    def test_includes_nonlinear_settings(self):
+        """
+        Test that the shared nonlinear settings are included.
+        """
+        params = solver_presets.get_preset('direct-mumps')
+        self.assertEqual(params['snes_type'], 'newtonls')
+        self.assertEqual(params['pc_type'], 'lu')
+
+    def test_returns_copy(self):
+        """
+        Test that changing the returned parameters does not change the preset.
+        """
+        params = solver_presets.get_preset('gmg')
+        params['pc_type'] = 'none'
+        self.assertEqual(solver_presets.get_preset('gmg')['pc_type'], 'mg')
+
+
+class TestSelectPreset(TestCase):
+    """
+    Tests for the select_preset function.
+    """
+
+    def test_small_problem(self):
+        """
+        Test that a direct solve is chosen for a small problem.
+        """
+        V = FunctionSpace(UnitSquareMesh(10, 10), 'CG', 1)
+        self.assertEqual(solver_presets.select_preset(V), 'direct-mumps')
+
+    def test_large_linear(self):
+        """
+        Test that assembled AMG is chosen for large linear problems.
+        """
+        V = FunctionSpace(UnitCubeMesh(40, 40, 40), 'CG', 1)
+        self.assertEqual(solver_presets.select_preset(V), 'amg-assembled')
+
+    def test_large_high_order(self):
+        """
+        Test that AMG on a P1 discretisation is chosen for large high order
+        problems.
+        """
+        V = FunctionSpace(UnitCubeMesh(20, 20, 20), 'CG', 2)
+        self.assertEqual(solver_presets.select_preset(V), 'amg-p1')
+
+    def test_large_hierarchy(self):
+        """
+        Test that geometric multigrid is chosen for large problems on a mesh
+        hierarchy.
+        """
+        hierarchy = MeshHierarchy(UnitCubeMesh(10, 10, 10), 2)
+        V = FunctionSpace(hierarchy[-1], 'CG', 1)
+        self.assertEqual(solver_presets.select_preset(V), 'gmg')
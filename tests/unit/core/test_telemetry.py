@@ -0,0 +1,135 @@
+"""
+Tests for the telemetry.py file.
+"""
+import csv
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from TTiP.core.telemetry import Telemetry
+
+
+class FakeSNES:
+    """
+    A replacement for a PETSc SNES with fixed statistics.
+    """
+
+    def setConvergenceHistory(self, reset=False):
+        """
+        Ignore requests to record the history.
+        """
+
+    @staticmethod
+    def getConvergenceHistory():
+        """
+        Return a fixed history of residual norms and linear iterations.
+        """
+        return [1.0, 1e-3, 1e-8], [4, 5]
+
+    @staticmethod
+    def getIterationNumber():
+        """
+        Return a fixed number of nonlinear iterations.
+        """
+        return 2
+
+    @staticmethod
+    def getConvergedReason():
+        """
+        Return a fixed converged reason.
+        """
+        return 3
+
+    @staticmethod
+    def getLinearSolveIterations():
+        """
+        Return a fixed number of linear iterations.
+        """
+        return 9
+
+
+class FakeSolver:
+    """
+    A replacement for a NonlinearVariationalSolver.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.snes = FakeSNES()
+
+
+class TestTelemetry(TestCase):
+    """
+    Tests for the Telemetry class.
+    """
+
+    def setUp(self):
+        """
+        Create a directory for the outputs.
+        """
+        self.out_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def record_steps(self, fmt):
+        """
+        Record 2 steps and return the path written to.
+        """
+        path = os.path.join(self.out_dir.name, 'telemetry.' + fmt)
+        telemetry = Telemetry(path, fmt=fmt)
+        solver = FakeSolver()
+        for i in range(2):
+            telemetry.start_step(solver)
+            solve_time = telemetry.solve_done()
+            telemetry.time_write(lambda: None)
+            telemetry.record(solver, solve_time, step=i + 1,
+                             t=0.1 * (i + 1), dt=0.1, status='accepted')
+        telemetry.close()
+        return path
+
+    def test_unknown_format(self):
+        """
+        Test that an error is raised for an unknown format.
+        """
+        with self.assertRaises(ValueError):
+            Telemetry(fmt='xml')
+
+    def test_disabled(self):
+        """
+        Test that a telemetry without a path does nothing.
+        """
+        telemetry = Telemetry()
+        self.assertFalse(telemetry.enabled)
+        telemetry.start_step(None)
+        telemetry.record(None, 0.0, step=1, t=0.1, dt=0.1, status='accepted')
+        telemetry.close()
+
+    def test_jsonl(self):
+        """
+        Test that a json object is written for each step.
+        """
+        path = self.record_steps('jsonl')
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+
+        self.assertEqual(len(rows), 2)
+        self.assertListEqual(list(rows[0]), Telemetry.fields)
+        self.assertEqual(rows[1]['step'], 2)
+        self.assertEqual(rows[1]['snes_its'], 2)
+        self.assertEqual(rows[1]['ksp_its'], 9)
+        self.assertAlmostEqual(rows[1]['initial_residual'], 1.0)
+        self.assertAlmostEqual(rows[1]['final_residual'], 1e-8)
+
+    def test_csv(self):
+        """
+        Test that a header and a row for each step are written.
+        """
+        path = self.record_steps('csv')
+        with open(path, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['status'], 'accepted')
+        self.assertEqual(rows[0]['snes_reason'], '3')
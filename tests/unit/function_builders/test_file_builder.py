@@ -2,13 +2,21 @@
 Contains tests for the file_bulder.py file.
 """
 
-from tempfile import NamedTemporaryFile
+import os
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 from unittest import TestCase
 
 import numpy as np
-from firedrake import FunctionSpace, UnitCubeMesh, UnitSquareMesh
+from firedrake import COMM_WORLD, FunctionSpace, UnitCubeMesh, UnitSquareMesh
 
-from TTiP.function_builders.file_builder import FileBuilder
+from TTiP.function_builders import file_builder
+from TTiP.function_builders.file_builder import (FileBuilder, read_data,
+                                                 scatter_data)
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 
 class TestGeneralBuild(TestCase):
@@ -146,3 +154,515 @@ class Test3dBuild(TestCase):
         self.assertAlmostEqual(f((0.0, 0.15, 0.94)), 10.9)
         self.assertAlmostEqual(f((0.38, 0.62, 0.01)), 10.1)
         self.assertAlmostEqual(f((0.99, 0.99, 0.54)), 25.2)
+
+
+class TestCache(TestCase):
+    """
+    Tests for caching the interpolation.
+    """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        """
+        Create an input file and clear the cache.
+        """
+        self.mesh = UnitCubeMesh(4, 4, 4)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+
+        self.input = NamedTemporaryFile(mode='w+')
+        lines = ['#   x,   y,   z,    v\n']
+        lines += [f'{x}, {y}, {z}, {10*(x+y+z)}\n'
+                  for x in np.linspace(0.0, 1.0, 5)
+                  for y in np.linspace(0.0, 1.0, 5)
+                  for z in np.linspace(0.0, 1.0, 5)]
+        self.input.writelines(lines)
+        self.input.flush()
+
+        file_builder.clear_cache()
+
+    def build(self, **props):
+        """
+        Build a function from the input file.
+        """
+        fb = FileBuilder(self.mesh, self.V)
+        fb.assign('path', self.input.name)
+        fb.assign('grid', 'scattered')
+        for k, v in props.items():
+            fb.assign(k, v)
+        return fb.build()
+
+    def test_reuses_interpolation(self):
+        """
+        Test that a second build reuses the cached interpolation.
+        """
+        f1 = self.build()
+        f2 = self.build()
+
+        self.assertEqual(len(file_builder._INTERPOLATIONS), 1)
+        self.assertEqual(len(file_builder._TRIANGULATIONS), 1)
+        self.assertTrue(np.allclose(f1.dat.data, f2.dat.data))
+
+    def test_disk_cache(self):
+        """
+        Test that weights are stored on and loaded from disk.
+        """
+        with TemporaryDirectory() as cache_dir:
+            f1 = self.build(cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            file_builder.clear_cache()
+            f2 = self.build(cache_dir=cache_dir)
+
+        self.assertEqual(len(file_builder._TRIANGULATIONS), 0)
+        self.assertTrue(np.allclose(f1.dat.data, f2.dat.data))
+        self.assertAlmostEqual(f2((0.38, 0.62, 0.01)), 10.1)
+
+    def test_disk_cache_nested_dataset(self):
+        """
+        Test that weights for a dataset inside an HDF5 group are stored in
+        the cache directory.
+        """
+        if h5py is None:
+            self.skipTest('h5py is not installed.')
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'data.h5')
+            with h5py.File(path, 'w') as f:
+                f['group/temp'] = np.loadtxt(self.input.name, delimiter=',')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            f1 = self.build(path=path, dataset='group/temp',
+                            cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        self.assertAlmostEqual(f1((0.38, 0.62, 0.01)), 10.1)
+
+
+class TestFormats(TestCase):
+    """
+    Tests for reading the binary file formats.
+    """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        """
+        Create a function builder and some data.
+        """
+        self.mesh = UnitSquareMesh(10, 10)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+        self.fb = FileBuilder(self.mesh, self.V)
+
+        self.tmp_dir = TemporaryDirectory()
+        grid = np.linspace(0.0, 1.0, 11)
+        coords = np.array([[x, y] for x in grid for y in grid])
+        self.data = np.c_[coords, 10 * coords.sum(axis=1)]
+
+    def tearDown(self):
+        """
+        Remove the data files.
+        """
+        self.tmp_dir.cleanup()
+
+    def check_build(self, path, dataset=None):
+        """
+        Build from the file and check the interpolated values.
+        """
+        self.fb.assign('path', path)
+        if dataset is not None:
+            self.fb.assign('dataset', dataset)
+        f = self.fb.build()
+
+        self.assertAlmostEqual(f((0.0, 0.15)), 1.5)
+        self.assertAlmostEqual(f((0.38, 0.62)), 10.0)
+
+    def test_npy(self):
+        """
+        Test that .npy files are memory-mapped and interpolated.
+        """
+        path = os.path.join(self.tmp_dir.name, 'data.npy')
+        np.save(path, self.data)
+
+        coords, _ = read_data(path)
+        self.assertIsInstance(coords, np.memmap)
+        self.check_build(path)
+
+    def test_npz_coords_values(self):
+        """
+        Test reading separate coords and values arrays from a .npz file.
+        """
+        path = os.path.join(self.tmp_dir.name, 'data.npz')
+        np.savez(path, coords=self.data[:, :2], values=self.data[:, 2])
+
+        coords, _ = read_data(path)
+        self.assertIsInstance(coords, np.memmap)
+        self.check_build(path)
+
+    def test_npz_compressed_dataset(self):
+        """
+        Test reading a named array from a compressed .npz file.
+        """
+        path = os.path.join(self.tmp_dir.name, 'data.npz')
+        np.savez_compressed(path, other=self.data[:1], profile=self.data)
+
+        self.check_build(path, dataset='profile')
+
+    def test_npz_two_datasets(self):
+        """
+        Test that two datasets in one file do not share cached
+        interpolations.
+        """
+        path = os.path.join(self.tmp_dir.name, 'data.npz')
+        shifted = self.data.copy()
+        shifted[:, :2] = shifted[:, :2] * 0.5 + 0.25
+        shifted[:, 2] = 10 * shifted[:, :2].sum(axis=1)
+        np.savez(path, A=self.data, B=shifted)
+        file_builder.clear_cache()
+
+        self.check_build(path, dataset='A')
+
+        self.fb.assign('dataset', 'B')
+        f = self.fb.build()
+        self.assertAlmostEqual(f((0.3, 0.4)), 7.0)
+        self.assertAlmostEqual(f((0.6, 0.7)), 13.0)
+        self.assertEqual(len(file_builder._INTERPOLATIONS), 2)
+
+    def test_npz_ambiguous(self):
+        """
+        Test an error is raised if the array to use is unclear.
+        """
+        path = os.path.join(self.tmp_dir.name, 'data.npz')
+        np.savez(path, a=self.data, b=self.data)
+
+        with self.assertRaises(ValueError):
+            read_data(path)
+
+    def test_hdf5(self):
+        """
+        Test reading a dataset from an HDF5 file.
+        """
+        if h5py is None:
+            self.skipTest('h5py is not installed.')
+        path = os.path.join(self.tmp_dir.name, 'data.h5')
+        with h5py.File(path, 'w') as f:
+            f['profiles/temperature'] = self.data
+
+        self.check_build(path)
+
+
+class TestGrid(TestCase):
+    """
+    Tests for interpolating data on a structured grid.
+    """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        """
+        Create a function builder and clear the cache.
+        """
+        self.mesh = UnitCubeMesh(4, 4, 4)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+        self.fb = FileBuilder(self.mesh, self.V)
+
+        self.input = NamedTemporaryFile(mode='w+')
+        self.fb.assign('path', self.input.name)
+
+        file_builder.clear_cache()
+
+    def write(self, coords):
+        """
+        Write a file with a cubic function at the given coords.
+        """
+        lines = ['#   x,   y,   z,    v\n']
+        lines += [f'{x}, {y}, {z}, {x**3 + y*z}\n' for x, y, z in coords]
+        self.input.writelines(lines)
+        self.input.flush()
+
+    def test_structured_cubic(self):
+        """
+        Test that shuffled grid data is detected and interpolated as cubic.
+        """
+        grid = np.linspace(0.0, 1.0, 6)
+        coords = [(x, y, z) for z in grid for x in grid for y in grid]
+        self.write(coords)
+
+        f = self.fb.build()
+
+        self.assertEqual(len(file_builder._TRIANGULATIONS), 0)
+        self.assertIsNotNone(list(file_builder._GRIDS.values())[0])
+        self.assertAlmostEqual(f((0.5, 0.25, 0.75)), 0.3125, places=4)
+        self.assertAlmostEqual(f((1.0, 1.0, 1.0)), 2.0)
+
+    def test_scattered(self):
+        """
+        Test that grid detection can be turned off.
+        """
+        grid = np.linspace(0.0, 1.0, 5)
+        self.write([(x, y, z) for x in grid for y in grid for z in grid])
+        self.fb.assign('grid', 'scattered')
+
+        self.fb.build()
+
+        self.assertEqual(len(file_builder._TRIANGULATIONS), 1)
+        self.assertEqual(len(file_builder._GRIDS), 0)
+
+    def test_structured_not_grid(self):
+        """
+        Test an error is raised if scattered data is declared structured.
+        """
+        coords = np.random.default_rng(0).random((50, 3))
+        self.write(coords)
+        self.fb.assign('grid', 'structured')
+
+        with self.assertRaises(ValueError):
+            self.fb.build()
+
+    def test_unknown_option(self):
+        """
+        Test an error is raised for an unknown grid option.
+        """
+        self.write([(0.0, 0.0, 0.0)])
+        self.fb.assign('grid', 'regular')
+
+        with self.assertRaises(ValueError):
+            self.fb.build()
+
+
+class TestExtrapolation(TestCase):
+    """
+    Tests for filling points outside of the data.
+    """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        """
+        Create a function builder and an input file covering half the mesh.
+        """
+        self.mesh = UnitSquareMesh(10, 10)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+        self.fb = FileBuilder(self.mesh, self.V)
+
+        self.input = NamedTemporaryFile(mode='w+')
+        lines = ['#   x,   y,   v\n']
+        lines += [f'{x}, {y}, {10*(x+y)}\n'
+                  for x in np.linspace(0.0, 0.5, 6)
+                  for y in np.linspace(0.0, 1.0, 11)]
+        self.input.writelines(lines)
+        self.input.flush()
+        self.fb.assign('path', self.input.name)
+
+        file_builder.clear_cache()
+
+    def test_nearest(self):
+        """
+        Test that the default takes the nearest value.
+        """
+        self.fb.assign('grid', 'scattered')
+        f = self.fb.build()
+
+        self.assertAlmostEqual(f((0.2, 0.3)), 5.0)
+        self.assertAlmostEqual(f((1.0, 0.5)), 10.0)
+        self.assertEqual(len(file_builder._TREES), 1)
+
+    def test_nearest_grid(self):
+        """
+        Test that grid data takes the value on the nearest grid boundary.
+        """
+        f = self.fb.build()
+
+        self.assertAlmostEqual(f((1.0, 0.5)), 10.0)
+        self.assertEqual(len(file_builder._TREES), 0)
+
+    def test_constant(self):
+        """
+        Test that points outside of the data take the fill value.
+        """
+        self.fb.assign('extrapolation', 'constant')
+        self.fb.assign('fill_value', 3.0)
+        f = self.fb.build()
+
+        self.assertAlmostEqual(f((0.2, 0.3)), 5.0)
+        self.assertAlmostEqual(f((0.5, 0.3)), 8.0)
+        self.assertAlmostEqual(f((0.6, 0.3)), 3.0)
+
+    def test_linear(self):
+        """
+        Test that linear data is extrapolated exactly.
+        """
+        self.fb.assign('extrapolation', 'linear')
+        self.fb.assign('grid', 'scattered')
+        f = self.fb.build()
+
+        self.assertAlmostEqual(f((0.8, 0.3)), 11.0)
+        self.assertAlmostEqual(f((1.0, 1.0)), 20.0)
+
+    def test_unknown_option(self):
+        """
+        Test an error is raised for an unknown extrapolation option.
+        """
+        self.fb.assign('extrapolation', 'cubic')
+
+        with self.assertRaises(ValueError):
+            self.fb.build()
+
+
+class TestFileSeries(TestCase):
+    """
+    Tests for time series of files.
+    """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        """
+        Create a function builder and a series of constant valued files.
+        """
+        self.mesh = UnitSquareMesh(4, 4)
+        self.V = FunctionSpace(self.mesh, 'CG', 1)
+        self.fb = FileBuilder(self.mesh, self.V)
+
+        self.tmp_dir = TemporaryDirectory()
+        grid = np.linspace(0.0, 1.0, 5)
+        for i, val in enumerate([10.0, 20.0, 40.0]):
+            path = os.path.join(self.tmp_dir.name, f'frame_{i}.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines([f'{x}, {y}, {val}\n'
+                              for x in grid for y in grid])
+        self.fb.assign('path', os.path.join(self.tmp_dir.name,
+                                            'frame_{}.csv'))
+        self.fb.assign('times', [0.0, 1.0, 3.0])
+
+        file_builder.clear_cache()
+
+    def tearDown(self):
+        """
+        Remove the data files.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_update(self):
+        """
+        Test that the function is interpolated in time in place.
+        """
+        f = self.fb.build()
+        series = self.fb.time_series
+        self.assertAlmostEqual(f((0.3, 0.3)), 10.0)
+
+        series.update(0.5)
+        self.assertAlmostEqual(f((0.3, 0.3)), 15.0)
+        series.update(2.0)
+        self.assertAlmostEqual(f((0.3, 0.3)), 30.0)
+        self.assertEqual(sorted(series._frames), [1, 2])
+        series.update(5.0)
+        self.assertAlmostEqual(f((0.3, 0.3)), 40.0)
+
+    def test_shared_interpolation(self):
+        """
+        Test that frames with the same coordinates share an interpolation.
+        """
+        self.fb.build()
+        self.fb.time_series.update(2.0)
+
+        self.assertEqual(len(file_builder._INTERPOLATIONS), 1)
+
+    def test_cache_bounded(self):
+        """
+        Test that frames with different coordinates are removed from the
+        cache once the series has moved past them.
+        """
+        for i, size in enumerate([5, 6, 7, 8]):
+            grid = np.linspace(0.0, 1.0, size)
+            path = os.path.join(self.tmp_dir.name, f'frame_{i}.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines([f'{x}, {y}, {10.0 * i}\n'
+                              for x in grid for y in grid])
+        self.fb.assign('times', [0.0, 1.0, 2.0, 3.0])
+
+        f = self.fb.build()
+        series = self.fb.time_series
+        for t in [0.5, 1.5, 2.5]:
+            series.update(t)
+            if series._prefetch is not None:
+                series._prefetch[1].join()
+            # The two current frames and the one being read ahead.
+            self.assertLessEqual(len(file_builder._GRIDS), 3)
+            self.assertLessEqual(len(file_builder._INTERPOLATIONS), 3)
+
+        self.assertAlmostEqual(f((0.3, 0.3)), 25.0)
+
+    def test_prefetch(self):
+        """
+        Test that the frame after the current ones is read in the background.
+        """
+        self.fb.build()
+
+        self.assertEqual(self.fb.time_series._prefetch[0], 2)
+
+    def test_times_not_increasing(self):
+        """
+        Test an error is raised if the times are not increasing.
+        """
+        self.fb.assign('times', [0.0, 2.0, 1.0])
+
+        with self.assertRaises(ValueError):
+            self.fb.build()
+
+    def test_missing_frame(self):
+        """
+        Test an error is raised if a frame is missing.
+        """
+        self.fb.assign('times', [0.0, 1.0, 3.0, 4.0])
+
+        with self.assertRaises(ValueError):
+            self.fb.build()
+
+
+class TestScatterData(TestCase):
+    """
+    Tests for sending each process the data near its points.
+    """
+
+    def setUp(self):
+        """
+        Create a file with data on a grid.
+        """
+        self.tmp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'data.npy')
+        grid = np.linspace(0.0, 1.0, 11)
+        coords = np.array([[x, y] for x in grid for y in grid])
+        np.save(self.path, np.c_[coords, coords.sum(axis=1)])
+
+    def tearDown(self):
+        """
+        Remove the data file.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_bounding_box(self):
+        """
+        Test that only the data near the points is kept.
+        """
+        points = np.array([[0.2, 0.2], [0.4, 0.3]])
+        coords, vals = scatter_data(COMM_WORLD, self.path, points,
+                                    halo=0.05)
+
+        self.assertEqual(len(coords), 3 * 2)
+        self.assertTrue(np.all(coords >= 0.15))
+        self.assertTrue(np.all(coords <= [0.45, 0.35]))
+        self.assertTrue(np.allclose(vals, coords.sum(axis=1)))
+
+    def test_grows_halo(self):
+        """
+        Test that points far from the data still get enough data.
+        """
+        points = np.array([[3.0, 3.0]])
+        coords, _ = scatter_data(COMM_WORLD, self.path, points, halo=0.1)
+
+        self.assertGreaterEqual(len(coords), 6)
+
+    def test_no_points(self):
+        """
+        Test that a process with no points gets no data.
+        """
+        coords, vals = scatter_data(COMM_WORLD, self.path,
+                                    np.empty((0, 2)))
+
+        self.assertEqual(coords.shape, (0, 2))
+        self.assertEqual(len(vals), 0)
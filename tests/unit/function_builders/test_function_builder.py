@@ -3,9 +3,10 @@ Tests for the function_builder.py file
 """
 import unittest
 
-from firedrake import FunctionSpace, UnitCubeMesh
+from firedrake import Constant, Function, FunctionSpace, UnitCubeMesh
 
-from TTiP.function_builders.function_builder import FunctionBuilder
+from TTiP.function_builders.function_builder import (FunctionBuilder,
+                                                     get_function_space)
 
 
 class DummyFunctionBuilder(FunctionBuilder):
@@ -59,3 +60,105 @@ class TestAssign(unittest.TestCase):
         """
         with self.assertRaises(KeyError):
             self.func_builder.assign('c', 10)
+
+    def test_assign_space(self):
+        """
+        Test that assign sets the space.
+        """
+        self.func_builder.assign('space', 'DG0')
+        self.assertEqual(self.func_builder.space, 'DG0')
+
+    def test_assign_invalid_space(self):
+        """
+        Test that assign raises an error for an unknown space.
+        """
+        with self.assertRaises(ValueError):
+            self.func_builder.assign('space', 'P7')
+
+
+class TestGetFunctionSpace(unittest.TestCase):
+    """
+    Tests for the get_function_space function.
+    """
+
+    def setUp(self):
+        """
+        Create a high order function space.
+        """
+        self.mesh = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(self.mesh, 'CG', 2)
+
+    def test_default(self):
+        """
+        Test that the solution space is used by default.
+        """
+        self.assertIs(get_function_space(self.mesh, self.V), self.V)
+        self.assertIs(get_function_space(self.mesh, self.V, 'default'),
+                      self.V)
+
+    def test_p1(self):
+        """
+        Test the P1 space.
+        """
+        W = get_function_space(self.mesh, self.V, 'P1')
+        self.assertEqual(W.ufl_element().family(), 'Lagrange')
+        self.assertEqual(W.ufl_element().degree(), 1)
+
+    def test_dg0(self):
+        """
+        Test the DG0 space.
+        """
+        W = get_function_space(self.mesh, self.V, 'DG0')
+        self.assertEqual(W.ufl_element().family(), 'Discontinuous Lagrange')
+        self.assertEqual(W.ufl_element().degree(), 0)
+
+    def test_unknown(self):
+        """
+        Test that an unknown space raises an error.
+        """
+        with self.assertRaises(ValueError):
+            get_function_space(self.mesh, self.V, 'P7')
+
+
+class TestFinalise(unittest.TestCase):
+    """
+    Tests for the finalise method.
+    """
+
+    def setUp(self):
+        """
+        Define the function builder.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        self.V = FunctionSpace(m, 'CG', 1)
+        self.func_builder = DummyFunctionBuilder(m, self.V)
+
+    def test_uniform_constant(self):
+        """
+        Test that a uniform function becomes a Constant.
+        """
+        self.func_builder.assign('space', 'constant')
+        f = Function(self.V).assign(3.0)
+        result = self.func_builder.finalise(f)
+
+        self.assertIsInstance(result, Constant)
+        self.assertAlmostEqual(float(result), 3.0)
+
+    def test_not_uniform(self):
+        """
+        Test that a non uniform function is kept.
+        """
+        self.func_builder.assign('space', 'constant')
+        f = Function(self.V)
+        f.dat.data[0] = 1.0
+
+        self.assertIs(self.func_builder.finalise(f), f)
+
+    def test_other_space(self):
+        """
+        Test that functions are kept for other spaces.
+        """
+        self.func_builder.assign('space', 'P1')
+        f = Function(self.V).assign(3.0)
+
+        self.assertIs(self.func_builder.finalise(f), f)
@@ -1,7 +1,9 @@
 """
 Tests for the function_builder_factory.py file.
 """
+import os
 import unittest
+from tempfile import TemporaryDirectory
 
 import numpy as np
 from firedrake import (Constant, Function, FunctionSpace, UnitCubeMesh,
@@ -83,6 +85,23 @@ class TestCreateFunction(unittest.TestCase):
         with self.assertRaises(AttributeError):
             self.factory.create_function('constant')
 
+    def test_time_series(self):
+        """
+        Test that the time series of time dependant functions are stored.
+        """
+        with TemporaryDirectory() as tmp_dir:
+            for i in range(2):
+                with open(os.path.join(tmp_dir, f'{i}.csv'), 'w',
+                          encoding='utf-8') as f:
+                    f.writelines([f'{x}, {y}, {z}, {i}\n'
+                                  for x in (0, 1) for y in (0, 1)
+                                  for z in (0, 1)])
+            self.factory.create_function(
+                'file', path=os.path.join(tmp_dir, '{}.csv'), times=[0, 1])
+        self.factory.create_function('constant', value=1.0)
+
+        self.assertEqual(len(self.factory.time_series), 1)
+
 
 class TestCreateFunctionDict(unittest.TestCase):
     """
@@ -0,0 +1,127 @@
+"""
+The tests for the interpolation.py file.
+"""
+from unittest import TestCase
+
+import numpy as np
+# pylint: disable=no-name-in-module
+from scipy.spatial import Delaunay, cKDTree
+
+from TTiP.function_builders.interpolation import (find_grid, gap_weights,
+                                                  grid_interpolation,
+                                                  linear_weights)
+
+
+class TestFindGrid(TestCase):
+    """
+    Tests for the find_grid function.
+    """
+
+    def test_in_order(self):
+        """
+        Test that data already in grid order needs no reordering.
+        """
+        grid = np.linspace(0.0, 1.0, 3)
+        coords = np.array([[x, y] for x in grid for y in grid])
+
+        axes, order = find_grid(coords)
+
+        self.assertEqual(len(axes), 2)
+        self.assertTrue(np.allclose(axes[0], grid))
+        self.assertIsNone(order)
+
+    def test_shuffled(self):
+        """
+        Test that the order puts shuffled data back onto the grid.
+        """
+        grid = np.linspace(0.0, 1.0, 3)
+        coords = np.array([[x, y] for x in grid for y in grid])
+        shuffled = coords[::-1]
+
+        _, order = find_grid(shuffled)
+
+        self.assertTrue(np.allclose(shuffled[order], coords))
+
+    def test_scattered(self):
+        """
+        Test that data missing a grid point is not a grid.
+        """
+        grid = np.linspace(0.0, 1.0, 3)
+        coords = np.array([[x, y] for x in grid for y in grid])
+
+        self.assertIsNone(find_grid(coords[1:]))
+
+
+class TestGridInterpolation(TestCase):
+    """
+    Tests for the grid_interpolation function.
+    """
+
+    def test_linear_clamped(self):
+        """
+        Test that points outside of the grid take the boundary value.
+        """
+        grid = np.linspace(0.0, 1.0, 3)
+        coords = np.array([[x, y] for x in grid for y in grid])
+        vals = coords.sum(axis=1)
+        points = np.array([[0.25, 0.5], [1.5, 0.5]])
+
+        interpolate, outside = grid_interpolation(find_grid(coords), points,
+                                                  'linear')
+
+        self.assertTrue(np.allclose(interpolate(vals), [0.75, 1.5]))
+        self.assertListEqual(list(outside), [1])
+
+
+class TestLinearWeights(TestCase):
+    """
+    Tests for the linear_weights function.
+    """
+
+    def test_reproduces_linear(self):
+        """
+        Test that a linear function is interpolated exactly and points
+        outside of the data have no weights.
+        """
+        rng = np.random.default_rng(0)
+        coords = np.r_[[[0, 0], [1, 0], [0, 1], [1, 1]], rng.random((20, 2))]
+        vals = 2 * coords[:, 0] - coords[:, 1]
+        points = np.array([[0.3, 0.6], [0.9, 0.2], [2.0, 2.0]])
+
+        weights = linear_weights(Delaunay(coords), coords, points)
+
+        self.assertTrue(np.allclose(weights.dot(vals)[:2], [0.0, 1.6]))
+        self.assertListEqual(list(np.diff(weights.indptr)), [3, 3, 0])
+
+
+class TestGapWeights(TestCase):
+    """
+    Tests for the gap_weights function.
+    """
+
+    def setUp(self):
+        """
+        Create some data on a grid.
+        """
+        self.coords = np.array([[x, y] for x in np.linspace(0.0, 1.0, 5)
+                                for y in np.linspace(0.0, 1.0, 5)])
+        self.vals = 3 * self.coords[:, 0] + 1
+        self.points = np.array([[1.5, 0.5]])
+
+    def test_nearest(self):
+        """
+        Test that nearest extrapolation takes the nearest value.
+        """
+        weights = gap_weights(cKDTree(self.coords), self.coords, self.points,
+                              'nearest')
+
+        self.assertTrue(np.allclose(weights.dot(self.vals), [4.0]))
+
+    def test_linear(self):
+        """
+        Test that linear extrapolation continues a linear function.
+        """
+        weights = gap_weights(cKDTree(self.coords), self.coords, self.points,
+                              'linear')
+
+        self.assertTrue(np.allclose(weights.dot(self.vals), [5.5]))
@@ -78,3 +78,86 @@ class TestParse(unittest.TestCase):
 
         self.assertTupleEqual(self.args, ())
         self.assertDictEqual(self.kwargs, expected)
+
+    def test_coarse_levels(self):
+        """
+        Test that the cell counts are divided for the coarsest level and a
+        hierarchy is refined from it.
+        """
+        conf = {'type': 'Rectangle',
+                'params': '8, 4, 1e-4, 1e-4',
+                'coarse_levels': '2',
+                'element': 'CG',
+                'order': 1}
+
+        def fake_mesh_maker(*args, **kwargs):
+            self.args = args
+            return 'coarse'
+
+        def fake_hierarchy(mesh, levels):
+            return [mesh] * (levels + 1)
+
+        def fake_function_space(*args, **kwargs):
+            pass
+
+        with patch.object(mesh_parser.firedrake,
+                          'RectangleMesh',
+                          fake_mesh_maker):
+            with patch.object(mesh_parser.firedrake,
+                              'MeshHierarchy',
+                              fake_hierarchy):
+                with patch.object(mesh_parser.firedrake,
+                                  'FunctionSpace',
+                                  fake_function_space):
+                    self.parser.parse(conf)
+
+        self.assertTupleEqual(self.args, (2, 1, 1e-4, 1e-4))
+        self.assertEqual(len(self.parser.hierarchy), 3)
+
+    def test_coarse_levels_not_divisible(self):
+        """
+        Test that an error is raised if the cell counts can't be divided.
+        """
+        conf = {'type': 'UnitSquare',
+                'params': '10, 10',
+                'coarse_levels': '2',
+                'element': 'CG',
+                'order': 1}
+
+        with self.assertRaises(ValueError):
+            self.parser.parse(conf)
+
+    def test_refinements(self):
+        """
+        Test that the configured mesh is refined and the finest level used.
+        """
+        conf = {'type': 'UnitSquare',
+                'params': '10, 10',
+                'refinements': '2',
+                'element': 'CG',
+                'order': 1}
+
+        def fake_mesh_maker(*args, **kwargs):
+            self.args = args
+            return 'base'
+
+        def fake_hierarchy(mesh, levels):
+            return [mesh] + ['fine'] * levels
+
+        def fake_function_space(*args, **kwargs):
+            pass
+
+        with patch.object(mesh_parser.firedrake,
+                          'UnitSquareMesh',
+                          fake_mesh_maker):
+            with patch.object(mesh_parser.firedrake,
+                              'MeshHierarchy',
+                              fake_hierarchy):
+                with patch.object(mesh_parser.firedrake,
+                                  'FunctionSpace',
+                                  fake_function_space):
+                    self.parser.parse(conf)
+
+        self.assertTupleEqual(self.args, (10, 10))
+        self.assertEqual(len(self.parser.hierarchy), 3)
+        self.assertEqual(self.parser.mesh, 'fine')
@@ -34,3 +34,34 @@ class TestParse(unittest.TestCase):
 
         self.assertIsInstance(density, Constant)
         self.assertEqual(density([0.2, 1.0, 0.4]), 2.6)
+
+    def test_space(self):
+        """
+        Test that parameters are built in the given space.
+        """
+        conf = {'space': 'DG0',
+                'electron_density.type': 'gaussian',
+                'electron_density.mean': '0.5',
+                'electron_density.sd': '0.1',
+                'electron_density.scale': '1.0'}
+
+        self.parser.parse(conf)
+        density = self.parser.parameters['electron_density']
+
+        self.assertNotIn('space', self.parser.parameters)
+        self.assertEqual(density.function_space().ufl_element().degree(), 0)
+
+    def test_parameter_space(self):
+        """
+        Test that a single parameter can be built in a different space.
+        """
+        conf = {'electron_density.type': 'gaussian',
+                'electron_density.mean': '0.5',
+                'electron_density.sd': '0.1',
+                'electron_density.scale': '1.0',
+                'electron_density.space': 'DG0'}
+
+        self.parser.parse(conf)
+        density = self.parser.parameters['electron_density']
+
+        self.assertEqual(density.function_space().ufl_element().degree(), 0)
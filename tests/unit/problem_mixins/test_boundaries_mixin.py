@@ -285,3 +285,51 @@ class TestSetNoBoundry(TestCase):
         self.problem._has_boundary = True
         with self.assertRaises(AttributeError):
             self.problem.set_no_boundary()
+
+
+class TestPrune(TestCase):
+    """
+    Tests for the prune method.
+    """
+
+    def setUp(self):
+        """
+        Prepare for tests.
+        """
+        mesh = UnitCubeMesh(2, 2, 2)
+        V = FunctionSpace(mesh, 'CG', 1)
+        self.problem = MockProblem(mesh, V)
+
+    def test_removes_dirichlet_surfaces(self):
+        """
+        Test boundary integrals on dirichlet surfaces are removed.
+        """
+        self.problem.add_dirichlet(g=1.0, surface=[1, 2])
+        self.problem.add_robin(alpha=1.0, g=1.0, surface=1)
+        self.problem.prune()
+
+        self.assertEqual(len(self.problem.a.integrals()), 1)
+        self.assertEqual(len(self.problem.L.integrals()), 1)
+
+    def test_keeps_other_surfaces(self):
+        """
+        Test boundary integrals on other surfaces are kept.
+        """
+        self.problem.add_dirichlet(g=1.0, surface=1)
+        self.problem.add_robin(alpha=1.0, g=1.0, surface=3)
+        self.problem.prune()
+
+        self.assertEqual(len(self.problem.a.integrals()), 2)
+        self.assertEqual(len(self.problem.L.integrals()), 2)
+
+    def test_removes_all(self):
+        """
+        Test all boundary integrals are removed for a dirichlet condition on
+        the whole boundary.
+        """
+        self.problem.add_robin(alpha=1.0, g=1.0, surface=3)
+        self.problem.add_dirichlet(g=1.0, surface='all')
+        self.problem.prune()
+
+        self.assertEqual(len(self.problem.a.integrals()), 1)
+        self.assertEqual(len(self.problem.L.integrals()), 1)
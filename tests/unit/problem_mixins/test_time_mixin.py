@@ -90,6 +90,77 @@ class TestSetMethod(TestCase):
         self.assertEqual(self.problem.Q, expected)
 
 
+class TestMethodResidual(TestCase):
+    """
+    Tests for the method_residual method.
+    """
+
+    def setUp(self):
+        """
+        Create the problem.
+        """
+        m = UnitCubeMesh(10, 10, 10)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.problem = MockProblem(m, V)
+
+    def test_before_set_method(self):
+        """
+        Test that an error is raised if no method has been set.
+        """
+        with self.assertRaises(AttributeError):
+            self.problem.method_residual('BackwardEuler')
+
+    def test_same_method(self):
+        """
+        Test that the residual matches the problem for the same method.
+        """
+        self.problem.set_method('CrankNicolson')
+        F = self.problem.method_residual('CrankNicolson')
+        self.assertEqual(F, self.problem.a - self.problem.L)
+
+    def test_does_not_change_problem(self):
+        """
+        Test that the problem is unchanged by creating another residual.
+        """
+        self.problem.set_method('CrankNicolson')
+        a = self.problem.a
+        L = self.problem.L
+        F = self.problem.method_residual('BackwardEuler')
+
+        self.assertNotEqual(F, a - L)
+        self.assertEqual(self.problem.a, a)
+        self.assertEqual(self.problem.L, L)
+        self.assertEqual(self.problem.method, 'CrankNicolson')
+
+
+class TestSetDt(TestCase):
+    """
+    Tests for the set_dt method.
+    """
+
+    def setUp(self):
+        """
+        Create the problem.
+        """
+        m = UnitCubeMesh(10, 10, 10)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.problem = MockProblem(m, V)
+        self.problem.set_timescale(dt=0.1, steps=10)
+
+    def test_updates_constant_in_place(self):
+        """
+        Test that the existing constant is updated.
+        """
+        dt_invc = self.problem._dt_invc
+        self.problem.set_dt(0.5)
+
+        self.assertIs(self.problem._dt_invc, dt_invc)
+        self.assertAlmostEqual(float(dt_invc), 2.0)
+        self.assertAlmostEqual(self.problem.dt, 0.5)
+
+
 class TestRemoveTimescale(TestCase):
     """
     Tests for the remove_timescale method.
@@ -198,6 +269,39 @@ class TestSetTimescale(TestCase):
             self.problem.set_timescale(max_t=4.0, dt=0.1, steps=53)
 
 
+class TestPrune(TestCase):
+    """
+    Test the prune method.
+    """
+
+    def setUp(self):
+        """
+        Create the problem.
+        """
+        m = UnitCubeMesh(2, 2, 2)
+        V = FunctionSpace(m, 'CG', 1)
+
+        self.problem = MockProblem(m, V)
+        self.problem.set_method('BackwardEuler')
+
+    def test_removes_mass_steady(self):
+        """
+        Test the mass term is removed for steady state problems.
+        """
+        num_integrals = len(self.problem.a.integrals())
+        self.problem.prune()
+        self.assertEqual(len(self.problem.a.integrals()), num_integrals - 1)
+
+    def test_keeps_mass_time_dependant(self):
+        """
+        Test the mass term is kept for time dependant problems.
+        """
+        self.problem.set_timescale(max_t=1.0, dt=0.1)
+        num_integrals = len(self.problem.a.integrals())
+        self.problem.prune()
+        self.assertEqual(len(self.problem.a.integrals()), num_integrals)
+
+
 # =============================================================================
 # ========== ITERATION METHOD CLASS TESTS =====================================
 # =============================================================================